@@ -13,6 +13,7 @@ import uvicorn
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.scraper import HSCodeScraper
+from src.parse_pool import get_parse_service
 from src.utils import setup_logger
 
 # 设置日志
@@ -85,7 +86,7 @@ async def index():
 @app.get("/health")
 async def health():
     """健康检查"""
-    return {'status': 'ok'}
+    return {'status': 'ok', 'parse_pool': get_parse_service().get_stats()}
 
 
 @app.post("/api/query")
@@ -93,7 +94,7 @@ async def query(req: ProductQueryRequest):
     """查询商品 HS 编码"""
     try:
         logger.info(f"查询: {req.product_name}")
-        result = get_scraper().query_by_product_name(req.product_name)
+        result = await get_scraper().query_by_product_name_async(req.product_name)
         
         if result.get('search_success'):
             return {'success': True, 'data': result}
@@ -113,7 +114,7 @@ async def query(req: ProductQueryRequest):
 async def batch_query(req: BatchQueryRequest):
     """批量查询"""
     try:
-        results = get_scraper().batch_query(req.product_names)
+        results = await get_scraper().batch_query_async(req.product_names)
         successful = sum(1 for r in results if r.get('search_success'))
         
         return {
@@ -132,7 +133,7 @@ async def batch_query(req: BatchQueryRequest):
 async def query_by_code(req: HSCodeQueryRequest):
     """根据 HS 编码查询"""
     try:
-        result = get_scraper().query_by_hs_code(req.hs_code)
+        result = await get_scraper().query_by_hs_code_async(req.hs_code)
         
         if result.get('search_success'):
             return {'success': True, 'data': result}
@@ -150,6 +151,8 @@ async def query_by_code(req: HSCodeQueryRequest):
 
 @app.on_event("startup")
 async def startup():
+    # HTML解析在子进程中执行，不阻塞事件循环
+    get_parse_service().start()
     logger.info("API 服务启动 - http://0.0.0.0:8000/docs")
 
 
@@ -157,7 +160,9 @@ async def startup():
 async def shutdown():
     global scraper
     if scraper:
+        await scraper.aclose()
         scraper.close()
+    get_parse_service().shutdown()
     logger.info("API 服务关闭")
 
 
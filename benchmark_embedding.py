@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+嵌入模型推理后端基准测试
+
+对比 torch 和 onnx (float32 / int8 量化) 推理后端:
+1. 一致性: 各后端向量与 torch 后端的最大误差、最小余弦相似度,
+   以及对测试页面中每个查询的候选排序第一名是否相同
+2. 延迟: 单个文本 (一次查询) 和一页候选 (批量) 的编码耗时分位数
+3. 加载耗时 (含依赖导入和模型加载)
+
+测试文本取自 fixtures/pages/ 中的搜索词、候选商品名称和详情页商品名称。
+编码直接调用推理后端,不经过嵌入向量缓存和磁盘存储。
+
+用法:
+    python benchmark_embedding.py --export
+    python benchmark_embedding.py
+    python benchmark_embedding.py --rounds 50 --json results.json
+
+创建日期: 2026-10-16
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.embedding_backends import OnnxEncoder, TorchEncoder, export_onnx_model, onnx_model_dir
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+DEFAULT_MODEL = "BAAI/bge-small-zh-v1.5"
+
+
+def load_texts() -> tuple:
+    """
+    从测试页面读取查询和候选
+
+    Returns:
+        ([(查询, [候选名称, ...]), ...], 全部文本列表)
+    """
+    queries, texts = [], []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*', '*', '*.json'))):
+        with open(path, encoding='utf-8') as f:
+            meta = json.load(f)
+        expected = meta.get('expected')
+        if isinstance(expected, list):
+            names = [item['name'] for item in expected if item.get('name')]
+            if names:
+                queries.append((meta['query'], names))
+                texts.extend([meta['query']] + names)
+        elif expected and expected.get('product_name'):
+            texts.append(expected['product_name'])
+    return queries, list(dict.fromkeys(texts))
+
+
+def create_backends(model_name: str) -> dict:
+    """加载可用的推理后端,返回 {名称: (编码器, 加载耗时秒)}"""
+    backends = {}
+    factories = [
+        ('torch', lambda: TorchEncoder(model_name)),
+        ('onnx', lambda: OnnxEncoder(onnx_model_dir(model_name), quantized=False)),
+        ('onnx-int8', lambda: OnnxEncoder(onnx_model_dir(model_name), quantized=True)),
+    ]
+    for name, factory in factories:
+        start = time.perf_counter()
+        try:
+            encoder = factory()
+        except (ImportError, FileNotFoundError) as e:
+            print(f"  ⚠️ 跳过 {name}: {e}")
+            continue
+        backends[name] = (encoder, time.perf_counter() - start)
+    return backends
+
+
+def percentile(values: list, p: int) -> float:
+    """分位数（毫秒）"""
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[p - 1]
+
+
+def measure(encoder, queries: list, texts: list, rounds: int) -> dict:
+    """测量单个文本和一页候选的编码耗时"""
+    single, page = [], []
+    for _ in range(rounds):
+        for text in texts:
+            start = time.perf_counter()
+            encoder.encode([text])
+            single.append((time.perf_counter() - start) * 1000)
+        for query, names in queries:
+            start = time.perf_counter()
+            encoder.encode([query] + names)
+            page.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'single_p50_ms': percentile(single, 50),
+        'single_p99_ms': percentile(single, 99),
+        'page_p50_ms': percentile(page, 50),
+        'page_p99_ms': percentile(page, 99),
+    }
+
+
+def compare(encoder, baseline, queries: list, texts: list) -> dict:
+    """与基线后端对比向量误差和候选排序"""
+    vectors = encoder.encode(texts)
+    expected = baseline.encode(texts)
+
+    same_top1 = 0
+    for query, names in queries:
+        embeddings, reference = encoder.encode([query] + names), baseline.encode([query] + names)
+        scores = embeddings[1:] @ embeddings[0]
+        reference_scores = reference[1:] @ reference[0]
+        same_top1 += int(np.argmax(scores) == np.argmax(reference_scores))
+
+    return {
+        'max_abs_diff': float(np.abs(vectors - expected).max()),
+        'min_cosine': float((vectors * expected).sum(axis=1).min()),
+        'top1_agreement': same_top1 / len(queries) if queries else 1.0
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='嵌入模型推理后端基准测试')
+    arg_parser.add_argument('--model', default=DEFAULT_MODEL, help='模型名称')
+    arg_parser.add_argument('--export', action='store_true', help='先把模型导出为 ONNX (需要 pip install .[onnx])')
+    arg_parser.add_argument('--no-quantize', action='store_true', help='导出时不生成 int8 量化模型')
+    arg_parser.add_argument('--rounds', type=int, default=10, help='计时轮数')
+    arg_parser.add_argument('--json', metavar='PATH', help='把结果保存为JSON')
+    args = arg_parser.parse_args()
+
+    # 计时时不输出逐条日志
+    import logging
+    logging.disable(logging.WARNING)
+
+    if args.export:
+        path = export_onnx_model(args.model, quantize=not args.no_quantize)
+        print(f"已导出到 {path}")
+
+    queries, texts = load_texts()
+    print(f"\n模型: {args.model}, {len(texts)} 个文本, {len(queries)} 组查询/候选, {args.rounds} 轮")
+
+    backends = create_backends(args.model)
+    if 'torch' not in backends:
+        raise SystemExit("torch 后端不可用,无法作为对照基线")
+
+    baseline = backends['torch'][0]
+    print(f"\n  {'后端':<12}{'加载 s':>8}{'单条p50':>9}{'单条p99':>9}{'整页p50':>9}{'整页p99':>9}"
+          f"{'最大误差':>11}{'最小余弦':>10}{'首位一致':>9}")
+
+    report = {}
+    for name, (encoder, load_seconds) in backends.items():
+        result = {'load_s': load_seconds}
+        result.update(measure(encoder, queries, texts, args.rounds))
+        result.update(compare(encoder, baseline, queries, texts))
+        report[name] = result
+
+        print(
+            f"  {name:<12}{result['load_s']:>8.2f}{result['single_p50_ms']:>9.2f}{result['single_p99_ms']:>9.2f}"
+            f"{result['page_p50_ms']:>9.2f}{result['page_p99_ms']:>9.2f}"
+            f"{result['max_abs_diff']:>11.2e}{result['min_cosine']:>10.4f}{result['top1_agreement']:>9.0%}"
+        )
+    print("\n  (耗时单位: 毫秒; 误差和余弦为与 torch 后端向量的对比)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'model': args.model, 'results': report}, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存到 {args.json}")
+
+
+if __name__ == "__main__":
+    main()
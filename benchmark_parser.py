@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+HTML解析器基准测试
+
+使用 fixtures/pages/ 下保存的页面离线测量两个站点解析器的
+parse_search_results 和 parse_detail_page:
+1. 逐页检查每个解析后端的输出与基准输出 (expected) 完全一致
+2. 统计吞吐量 (页/秒)、单页耗时分位数 (p50/p90/p99) 和内存峰值
+3. 以 BeautifulSoup 后端为基线输出加速比
+
+页面目录结构: fixtures/pages/<站点>/<search|detail>/<名称>.html,
+同名 .json 记录页面来源 (source)、解析参数 (query/url/encoding) 和基准输出 (expected)。
+source 为 synthetic 的页面是按页面布局编写的合成页面,只用于检查输出一致;
+反映生产环境的耗时应使用 --fetch 下载的真实页面 (source 为 captured) 并加 --source captured 测量。
+
+用法:
+    python benchmark_parser.py
+    python benchmark_parser.py --site hsciq --kind detail --rounds 50
+    python benchmark_parser.py --json results.json
+    python benchmark_parser.py --site i5a6 --fetch 0808100000 8471300000
+    python benchmark_parser.py --site hsciq --fetch-search apple=苹果
+    python benchmark_parser.py --source captured
+    python benchmark_parser.py --update-golden
+
+内存峰值由 tracemalloc 统计,只包含 Python 堆上的分配 (不含 libxml2 的C层内存)。
+
+创建日期: 2026-10-16
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from urllib.parse import quote
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import BASE_URL, HEADERS, DETAIL_URL_TEMPLATE
+from src.parser import DataParser
+from src.parser_hsciq import HTMLParserHSCIQ
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+
+# 站点: (解析器类, 详情页URL模板, 搜索页URL模板)
+SITES = {
+    'hsciq': (
+        HTMLParserHSCIQ,
+        'https://hsciq.com/HSCN/Code/{code}',
+        'https://hsciq.com/HSCN/Search?keywords={query}&viewtype=1&filterFailureCode=true'
+    ),
+    'i5a6': (
+        DataParser,
+        DETAIL_URL_TEMPLATE.replace('{hs_code}', '{code}'),
+        f"{BASE_URL}/hscode/key/{{query}}"
+    ),
+}
+KINDS = ('search', 'detail')
+SOURCES = ('synthetic', 'captured')
+
+# 解析后端,第一个为计算加速比和生成基准输出的基线
+BACKENDS = ('beautifulsoup', 'lxml')
+
+
+def parse_page(parser, site: str, kind: str, html: bytes, meta: dict):
+    """按页面类型调用解析器的公开接口"""
+    encoding = meta.get('encoding')
+    if kind == 'search':
+        return parser.parse_search_results(html, meta['query'], encoding=encoding)
+    if site == 'hsciq':
+        return parser.parse_detail_page(html, meta['url'], encoding=encoding)
+    return parser.parse_detail_page(html, encoding=encoding)
+
+
+def to_plain(result):
+    """把解析结果（记录或记录列表）转换为可保存为JSON的字典"""
+    if isinstance(result, list):
+        return [item.to_dict() for item in result]
+    return result.to_dict()
+
+
+def load_fixtures(site: str, kind: str, source: str = None) -> list:
+    """
+    读取保存的页面
+
+    Args:
+        site: 站点
+        kind: 页面类型
+        source: 只读取该来源的页面 (synthetic / captured),默认全部
+
+    Returns:
+        [(名称, HTML字节, 元数据), ...]
+    """
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, site, kind, '*.html'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path, 'rb') as f:
+            html = f.read()
+        with open(os.path.splitext(path)[0] + '.json', encoding='utf-8') as f:
+            meta = json.load(f)
+        if source is None or meta.get('source') == source:
+            fixtures.append((name, html, meta))
+    return fixtures
+
+
+def save_fixture(site: str, kind: str, name: str, html: bytes, meta: dict) -> str:
+    """保存页面和元数据,基准输出使用基线后端的解析结果"""
+    directory = os.path.join(FIXTURES_DIR, site, kind)
+    os.makedirs(directory, exist_ok=True)
+
+    parser = SITES[site][0](backend=BACKENDS[0])
+    meta['expected'] = to_plain(parse_page(parser, site, kind, html, meta))
+
+    path = os.path.join(directory, f"{name}.html")
+    with open(path, 'wb') as f:
+        f.write(html)
+    with open(os.path.join(directory, f"{name}.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def fetch_pages(site: str, codes: list, queries: list) -> None:
+    """下载详情页和搜索页到 fixtures/pages/<站点>/ (经过页面缓存和站点限速)"""
+    from src.http_client import AsyncHTTPClient, run_sync
+
+    _, detail_template, search_template = SITES[site]
+    client = AsyncHTTPClient(headers=HEADERS)
+    targets = [('detail', code, detail_template.format(code=code), {}) for code in codes]
+    for item in queries:
+        name, _, query = item.partition('=')
+        if not query:
+            raise SystemExit(f"--fetch-search 参数格式应为 名称=关键词: {item}")
+        targets.append(('search', name, search_template.format(query=quote(query)), {'query': query}))
+
+    try:
+        for kind, name, url, meta in targets:
+            response = run_sync(client.request('GET', url))
+            response.raise_for_status()
+            meta['source'] = 'captured'
+            meta['captured_at'] = datetime.date.today().isoformat()
+            if kind == 'detail':
+                meta['url'] = url
+            meta['encoding'] = client.encoding_for(response)
+            path = save_fixture(site, kind, name, response.content, meta)
+            print(f"已保存 {url} -> {path}")
+    finally:
+        client.close()
+
+
+def update_golden(site: str, kind: str) -> None:
+    """使用基线后端重新生成基准输出"""
+    for name, html, meta in load_fixtures(site, kind):
+        save_fixture(site, kind, name, html, meta)
+    print(f"已更新 {site}/{kind} 的基准输出")
+
+
+def check_outputs(parser, site: str, kind: str, fixtures: list) -> list:
+    """返回输出与基准不一致的页面名称"""
+    mismatches = []
+    for name, html, meta in fixtures:
+        # 经过 JSON 往返后比较,与保存的基准输出类型一致
+        actual = json.loads(json.dumps(to_plain(parse_page(parser, site, kind, html, meta))))
+        if actual != meta.get('expected'):
+            mismatches.append(name)
+    return mismatches
+
+
+def measure(parser, site: str, kind: str, fixtures: list, rounds: int) -> dict:
+    """测量吞吐量、单页耗时分位数和内存峰值"""
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for _, html, meta in fixtures:
+            page_start = time.perf_counter()
+            parse_page(parser, site, kind, html, meta)
+            latencies.append((time.perf_counter() - page_start) * 1000)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _, html, meta in fixtures:
+        parse_page(parser, site, kind, html, meta)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'pages_per_sec': len(latencies) / elapsed,
+        'p50_ms': percentiles[49],
+        'p90_ms': percentiles[89],
+        'p99_ms': percentiles[98],
+        'peak_kb': peak / 1024
+    }
+
+
+def run_benchmark(site: str, kind: str, rounds: int, source: str = None) -> dict:
+    """
+    运行一个站点、一种页面的对照和计时
+
+    Returns:
+        {后端: {指标..., 'mismatches': [...]}, 'pages': {来源: 页面数}},没有页面时返回空字典
+    """
+    fixtures = load_fixtures(site, kind, source)
+    if not fixtures:
+        print(f"\n[{site}/{kind}] ⚠️ {os.path.join(FIXTURES_DIR, site, kind)} 下没有{source or ''}页面")
+        return {}
+
+    pages = {name: sum(1 for _, _, meta in fixtures if meta.get('source') == name) for name in SOURCES}
+    print(f"\n[{site}/{kind}] {len(fixtures)} 个页面 (合成 {pages['synthetic']}, 真实 {pages['captured']}), {rounds} 轮")
+    if pages['synthetic']:
+        print("  ⚠️ 包含合成页面,耗时不代表生产环境,见 fixtures/pages/README.md")
+    print(f"  {'后端':<14}{'页/秒':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'峰值 KB':>10}{'加速比':>8}")
+
+    results = {}
+    for backend in BACKENDS:
+        parser = SITES[site][0](backend=backend)
+        result = measure(parser, site, kind, fixtures, rounds)
+        result['mismatches'] = check_outputs(parser, site, kind, fixtures)
+        results[backend] = result
+
+        speedup = result['pages_per_sec'] / results[BACKENDS[0]]['pages_per_sec']
+        print(
+            f"  {backend:<14}{result['pages_per_sec']:>10.0f}{result['p50_ms']:>10.3f}"
+            f"{result['p90_ms']:>10.3f}{result['p99_ms']:>10.3f}{result['peak_kb']:>10.0f}{speedup:>7.1f}x"
+        )
+        for name in result['mismatches']:
+            print(f"  ❌ {backend} 输出与基准不一致: {name}")
+
+    results['pages'] = pages
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='HTML解析器基准测试')
+    arg_parser.add_argument('--site', choices=sorted(SITES), help='站点 (默认全部)')
+    arg_parser.add_argument('--kind', choices=KINDS, help='页面类型 (默认全部)')
+    arg_parser.add_argument('--rounds', type=int, default=20, help='计时轮数')
+    arg_parser.add_argument('--source', choices=SOURCES, help='只测量该来源的页面 (默认全部)')
+    arg_parser.add_argument('--json', metavar='PATH', help='把结果保存为JSON,便于对比优化前后')
+    arg_parser.add_argument('--fetch', nargs='+', metavar='HS_CODE', help='下载这些HS编码的详情页 (需要 --site)')
+    arg_parser.add_argument('--fetch-search', nargs='+', metavar='名称=关键词', help='下载搜索页 (需要 --site)')
+    arg_parser.add_argument('--update-golden', action='store_true', help='用基线后端重新生成基准输出')
+    args = arg_parser.parse_args()
+
+    # 计时时不输出逐页日志
+    import logging
+    logging.disable(logging.WARNING)
+
+    sites = [args.site] if args.site else sorted(SITES)
+    kinds = [args.kind] if args.kind else list(KINDS)
+
+    if args.fetch or args.fetch_search:
+        if not args.site:
+            arg_parser.error('下载页面时需要指定 --site')
+        fetch_pages(args.site, args.fetch or [], args.fetch_search or [])
+
+    if args.update_golden:
+        for site in sites:
+            for kind in kinds:
+                update_golden(site, kind)
+
+    report = {}
+    for site in sites:
+        for kind in kinds:
+            results = run_benchmark(site, kind, args.rounds, args.source)
+            if results:
+                report[f"{site}/{kind}"] = results
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存到 {args.json}")
+
+    ok = all(
+        not results[backend]['mismatches']
+        for results in report.values() for backend in BACKENDS
+    )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
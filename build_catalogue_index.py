@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+生成HS编码目录语义索引
+
+读取完整税则目录文件,用当前配置的嵌入模型和推理后端编码全部商品名称和描述,
+保存到 CATALOGUE_INDEX_DIR。爬虫查询商品名称时先在索引中检索,
+高置信度的编码直接获取详情页,不再请求搜索页。
+
+目录文件格式 (UTF-8):
+    CSV:   表头为 hs_code,product_name,description (description 可省略)
+    JSONL: 每行一个对象,字段同上
+
+用法:
+    python build_catalogue_index.py data/catalogue/hs_codes.csv
+    python build_catalogue_index.py hs_codes.jsonl --backend onnx
+    python build_catalogue_index.py hs_codes.csv --query 鲜苹果 --query 笔记本电脑
+
+更换模型或推理后端后需要重新生成（索引按 模型 + 推理后端 分别保存）。
+
+创建日期: 2026-10-16
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.catalogue_index import CatalogueIndex, catalogue_index_path, read_catalogue
+from src.embedding_matcher import EmbeddingMatcher
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='生成HS编码目录语义索引')
+    arg_parser.add_argument('catalogue', help='税则目录文件 (CSV 或 JSONL)')
+    arg_parser.add_argument('--model', default="BAAI/bge-small-zh-v1.5", help='嵌入模型名称')
+    arg_parser.add_argument('--backend', choices=['torch', 'onnx'], help='推理后端 (默认使用 EMBEDDING_BACKEND)')
+    arg_parser.add_argument('--batch-size', type=int, default=256, help='每次编码的文本数')
+    arg_parser.add_argument('--query', action='append', default=[], help='生成后检索这些商品名称,检查结果')
+    args = arg_parser.parse_args()
+
+    entries = read_catalogue(args.catalogue)
+    if not entries:
+        raise SystemExit(f"目录文件中没有有效条目: {args.catalogue}")
+    print(f"读取 {len(entries)} 个编码: {args.catalogue}")
+
+    matcher = EmbeddingMatcher(model_name=args.model, backend=args.backend, enable_store=False)
+
+    start = time.perf_counter()
+    index = CatalogueIndex.build(entries, matcher, batch_size=args.batch_size)
+    print(f"编码 {len(index.row_codes)} 条名称和描述, 耗时 {time.perf_counter() - start:.1f} 秒")
+
+    path = catalogue_index_path(matcher.encoder.cache_name)
+    index.save(path)
+    print(f"索引已保存: {path}.npy ({index.matrix.nbytes / 1024 / 1024:.1f} MB)")
+
+    for query in args.query:
+        start = time.perf_counter()
+        query_vector = matcher.encode([query])[0]
+        results = index.search(query_vector, top_k=5)
+        print(f"\n{query} ({(time.perf_counter() - start) * 1000:.1f} 毫秒):")
+        for item in results:
+            print(f"  {item.score:.4f}  {item.hs_code}  {item.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,12 +10,112 @@ DETAIL_URL_TEMPLATE = f"{BASE_URL}/hscode/detail/{{hs_code}}"
 # 请求配置
 REQUEST_TIMEOUT = 10  # 请求超时时间（秒）
 MAX_RETRIES = 3  # 最大重试次数
-RETRY_DELAY = 2  # 重试延迟（秒）
-REQUEST_DELAY = 1  # 请求间隔（秒），避免频繁请求
+RETRY_DELAY = 2  # 重试基础延迟（秒）,第n次重试在 [0, RETRY_DELAY × 2^n] 内随机等待
+RETRY_MAX_DELAY = 30  # 单次重试最长等待（秒）; 服务端 Retry-After 超过该值时直接放弃重试
+RETRY_BUDGET_RATIO = 0.2  # 重试预算: 统计窗口内重试次数不超过正常请求数的该比例
+RETRY_BUDGET_MIN_RETRIES = 10  # 统计窗口内至少允许的重试次数（低流量时保证可以重试）
+RETRY_BUDGET_WINDOW = 60  # 重试预算统计窗口（秒）
+REQUEST_DELAY = 1  # 未单独配置限速的站点的默认请求间隔（秒）
+
+# 按站点的令牌桶限速配置
+# rate: 每秒补充的令牌数（长期平均请求速率）
+# burst: 桶容量，空闲后允许连续发出的请求数，只有令牌用完时才需要等待
+RATE_LIMITS = {
+    'hsciq.com': {'rate': 1.0, 'burst': 3},
+    'i5a6.com': {'rate': 1.0, 'burst': 3},
+}
+
+# 并发配置
+BATCH_MAX_WORKERS = 4  # 批量查询时同时进行的商品查询数量
+SPECULATIVE_DETAIL_FETCH_K = 1  # 同时预取的候选详情页数量，1 表示逐个获取
+
+# 主备数据源对冲配置（MCP 服务器）
+FALLBACK_HEDGING = False  # 主数据源响应过慢时提前并行启动备用数据源，先返回有效结果者胜出
+HEDGE_LATENCY_PERCENTILE = 0.9  # 主数据源耗时超过历史该分位数时启动备用数据源
+HEDGE_MIN_SAMPLES = 20  # 样本数不足时使用默认等待时间
+HEDGE_DEFAULT_DELAY = 8.0  # 默认等待时间（秒）
+HEDGE_LATENCY_WINDOW = 200  # 参与分位数计算的最近主数据源耗时样本数
 
 # 搜索配置
 MAX_SEARCH_ATTEMPTS = 5  # 分词后最大搜索尝试次数
 MIN_SIMILARITY_SCORE = 0.5  # 最小相似度分数（0-1）
+KEYWORD_FANOUT = False  # 是否并发搜索所有关键词并汇总候选统一打分（默认逐个关键词尝试）
+FANOUT_EARLY_STOP_SCORE = 0.95  # 并发搜索时出现不低于该分数的候选即取消其余搜索，None 表示等待全部完成
+
+# HTTP页面缓存配置（磁盘持久化，跨进程和重启复用）
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_PATH = "data/cache/http_cache.sqlite3"
+# 按URL匹配的缓存有效期（秒），按顺序匹配第一个正则；过期后用 ETag/Last-Modified 重新验证
+HTTP_CACHE_TTLS = [
+    (r'/HSCN/Code/\d+', 30 * 24 * 3600),      # HSCIQ 详情页（税则约每年调整一次）
+    (r'/hscode/detail/\d+', 30 * 24 * 3600),  # i5a6 详情页
+    (r'/HSCN/Search', 7 * 24 * 3600),          # HSCIQ 搜索页
+    (r'/hscode/key/', 7 * 24 * 3600),          # i5a6 搜索页
+]
+HTTP_CACHE_DEFAULT_TTL = 24 * 3600
+# 过期条目的清理：没有 ETag/Last-Modified 的条目过期即删除，有验证头的条目再保留该时长（秒）用于条件请求
+HTTP_CACHE_STALE_RETENTION = 7 * 24 * 3600
+
+# 详情记录缓存配置（进程内共享，按10位HS编码缓存解析后的详情）
+DETAIL_CACHE_SIZE = 5000  # 最多缓存的详情记录数
+DETAIL_CACHE_TTL = 24 * 3600  # 记录有效期（秒）
+
+# 嵌入向量缓存配置（进程内 LRU，按文本缓存语义匹配模型的编码结果）
+EMBEDDING_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 缓存占用的内存上限（字节，含文本键）
+EMBEDDING_CACHE_FLOAT16 = False  # 以 float16 保存向量，内存减半，余弦相似度误差约 1e-3
+
+# 嵌入向量磁盘存储配置（内存映射的向量矩阵 + SQLite 文本索引，跨进程和重启复用，每个模型一组文件）
+EMBEDDING_STORE_ENABLED = True
+EMBEDDING_STORE_DIR = "data/cache/embeddings"
+
+# 语义匹配模型推理后端：'torch'（SentenceTransformer + PyTorch）或 'onnx'（ONNX Runtime + tokenizers）
+# onnx 需要 pip install .[onnx]，并先用 python benchmark_embedding.py --export 导出模型；不可用时回退到 torch
+EMBEDDING_BACKEND = 'torch'
+EMBEDDING_ONNX_DIR = "data/models/onnx"  # 导出的 ONNX 模型目录，每个模型一个子目录
+EMBEDDING_ONNX_QUANTIZED = True  # 使用 int8 动态量化的模型 (model_int8.onnx)，否则使用 float32 模型 (model.onnx)
+
+# HS编码目录语义索引配置（离线预先编码全部税则商品名称，用 python build_catalogue_index.py 生成）
+# 查询时先在索引中按向量点积检索（查询文本在线程池中编码），命中的编码按商品名称重新打分后与在线搜索的候选一起排序
+CATALOGUE_INDEX_ENABLED = True  # 索引文件不存在时自动跳过
+CATALOGUE_INDEX_DIR = "data/catalogue"
+CATALOGUE_TOP_K = 10  # 检索返回的候选编码数
+# 索引相似度不低于该值的编码直接获取详情页、跳过在线搜索；阈值尚未用真实查询校准，默认为 None（不跳过）
+CATALOGUE_DIRECT_SCORE = None
+
+# 连接池配置（每个爬虫对应一个上游站点，各自持有独立的连接池）
+# None 表示按并发配置自动计算：批量并发数 × 单次查询内的并行请求数
+HTTP_POOL_SIZE = None
+HTTP_KEEPALIVE_EXPIRY = 60  # 空闲连接保持时间（秒）
+HTTP2_ENABLED = False  # 启用 HTTP/2 多路复用（需要安装 h2: pip install httpx[http2]）
+HTTP_PREWARM = True  # 创建爬虫时提前建立连接（DNS解析 + TLS握手）
+HTTP_PREWARM_CONNECTIONS = 1  # 预热的连接数
+
+# 解析配置
+# HTML解析后端：'lxml'（最快，详情页使用单次遍历解析）或 'beautifulsoup'（原实现，便于调试和对照结果）
+HTML_PARSER_BACKEND = 'lxml'
+# 搜索结果页先只解析结果区域（下列标签及其子树；lxml 后端只为第一个区域开始标签到最后一个结束标签之间的片段建树），
+# 未找到结果时再解析完整页面；
+# 开启后侧栏热门链接等区域外的编码不再作为候选（示例页面 hsciq/apple 为 8 个候选，完整页面为 11 个）
+SEARCH_RESTRICTED_PARSE = True
+SEARCH_RESULT_REGION_TAGS = ['table']
+# 详情页解析前按起止标记裁剪区域：从第一个起始标记所在的标签到最后一个结束标记，标记缺失时解析完整页面；
+# 裁剪结果不完整时（HSCIQ 缺少商品名称，i5a6 既未解析成功也不是已作废页面）重新解析完整页面
+HTML_TRIM_ENABLED = True
+HTML_TRIM_MARKERS = {
+    # 主栏（编码标题和各小节卡片）~ 最后一个小节的表格，去掉 head、导航、相关编码、侧栏和页脚
+    'hsciq_detail': ('class="col-main"', '</table>'),
+    'i5a6_detail': ('class="col-main"', '</table>'),
+}
+# 没有结果区域（SEARCH_RESULT_REGION_TAGS）也没有详情链接的搜索页按页面结构识别为无结果，直接返回空结果，
+# 不再构建文档树、回退到完整解析和文本扫描（src/page_fingerprint.py）。
+# 另可配置无结果页面的固定文案：包含任一文案且没有结果区域时同样直接返回空结果（侧栏中的编码链接不作为候选）。
+# 只应填写从真实无结果页面核对过的文字；尚未核对，默认为空（只按结构识别）
+SEARCH_EMPTY_MARKERS = {
+    'i5a6_search': [],
+    'hsciq_search': [],
+}
+# API 服务的HTML解析进程池子进程数（None 表示CPU核心数），命令行和 MCP 服务在当前线程解析
+PARSE_POOL_WORKERS = None
 
 # 请求头配置
 HEADERS = {
@@ -49,13 +49,14 @@ def query_single(product_name: str, save: bool = True) -> dict:
         scraper.close()
 
 
-def query_batch(product_names: List[str], save: bool = True) -> List[dict]:
+def query_batch(product_names: List[str], save: bool = True, max_workers: int = None) -> List[dict]:
     """
     批量商品查询
     
     Args:
         product_names: 商品名称列表
         save: 是否保存结果
+        max_workers: 最大并发查询数（默认使用配置 BATCH_MAX_WORKERS）
         
     Returns:
         查询结果列表
@@ -64,8 +65,16 @@ def query_batch(product_names: List[str], save: bool = True) -> List[dict]:
     storage = DataStorage()
     
     try:
-        # 批量查询
-        results = scraper.batch_query(product_names)
+        # 批量查询（并发执行，实时显示进度）
+        def show_progress(done: int, total: int, name: str, result: dict):
+            status = '✓' if result.get('search_success') else '✗'
+            print(f"[{done}/{total}] {status} {name} {result.get('hs_code', '')}")
+        
+        results = scraper.batch_query(
+            product_names,
+            max_workers=max_workers,
+            progress_callback=show_progress
+        )
         
         # 显示结果
         print(f"\n批量查询完成，共 {len(results)} 个商品")
@@ -83,13 +92,14 @@ def query_batch(product_names: List[str], save: bool = True) -> List[dict]:
         scraper.close()
 
 
-def query_from_file(input_file: str, save: bool = True) -> List[dict]:
+def query_from_file(input_file: str, save: bool = True, max_workers: int = None) -> List[dict]:
     """
     从文件读取商品名称并批量查询
     
     Args:
         input_file: 输入文件路径（每行一个商品名称）
         save: 是否保存结果
+        max_workers: 最大并发查询数
         
     Returns:
         查询结果列表
@@ -101,7 +111,7 @@ def query_from_file(input_file: str, save: bool = True) -> List[dict]:
     print(f"从文件 {input_file} 读取了 {len(product_names)} 个商品名称")
     
     # 批量查询
-    return query_batch(product_names, save)
+    return query_batch(product_names, save, max_workers)
 
 
 def main():
@@ -120,6 +130,9 @@ def main():
   # 从文件批量查询
   python main.py -f data/input/products.txt
   
+  # 从文件批量查询，8个并发
+  python main.py -f data/input/products.txt -w 8
+  
   # 查询但不保存
   python main.py -s "电脑" --no-save
         '''
@@ -149,6 +162,12 @@ def main():
         action='store_true',
         help='不保存查询结果'
     )
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=None,
+        help='批量查询的最大并发数（默认使用配置 BATCH_MAX_WORKERS）'
+    )
     
     args = parser.parse_args()
     
@@ -159,11 +178,11 @@ def main():
         
         # 批量查询
         elif args.batch:
-            query_batch(args.batch, save=not args.no_save)
+            query_batch(args.batch, save=not args.no_save, max_workers=args.workers)
         
         # 从文件查询
         elif args.file:
-            query_from_file(args.file, save=not args.no_save)
+            query_from_file(args.file, save=not args.no_save, max_workers=args.workers)
         
         logger.info("查询完成")
         
@@ -9,11 +9,16 @@
 数据源策略:
 - 主数据源: hsciq.com (支持嵌入向量相似度匹配,准确度更高)
 - 备用数据源: i5a6.com (主数据源失败时自动切换)
+- 对冲模式 (FALLBACK_HEDGING): 主数据源耗时超过历史分位数时并行启动备用数据源,
+  先返回有效结果者胜出,另一方被取消
 """
 
 import sys
 import os
-from typing import Any
+import asyncio
+import time
+from collections import deque
+from typing import Any, Optional
 import logging
 
 # 添加项目根目录到路径
@@ -24,6 +29,16 @@ import mcp.types as types
 from src.scraper import HSCodeScraper  # i5a6.com 爬虫
 from src.scraper_hsciq import HSCodeScraperHSCIQ  # hsciq.com 爬虫
 from src.storage import DataStorage
+from src.utils import run_bounded
+from src.html_trim import get_trim_stats
+from config.settings import (
+    BATCH_MAX_WORKERS,
+    FALLBACK_HEDGING,
+    HEDGE_LATENCY_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_LATENCY_WINDOW
+)
 
 # 配置日志
 logging.basicConfig(
@@ -46,10 +61,16 @@ query_stats = {
     'primary_success': 0,
     'fallback_success': 0,
     'total_failures': 0,
+    'hedged_queries': 0,
     'primary_source': 'hsciq.com',
     'fallback_source': 'i5a6.com'
 }
 
+# 主数据源最近的查询耗时（秒），用于计算对冲等待时间
+primary_latencies = deque(maxlen=HEDGE_LATENCY_WINDOW)
+# 第一次主数据源查询完成前为 True: 冷启动期间发起的查询包含连接建立、模型加载等耗时，不记录
+primary_cold = True
+
 
 def get_primary_scraper() -> HSCodeScraperHSCIQ:
     """获取主爬虫实例（延迟初始化）"""
@@ -69,10 +90,142 @@ def get_fallback_scraper() -> HSCodeScraper:
     return scraper_fallback
 
 
-def query_with_fallback(query_func_name: str, *args, **kwargs) -> dict[str, Any]:
+def get_hedge_delay() -> float:
+    """
+    计算启动备用数据源前的等待时间
+    
+    Returns:
+        主数据源历史耗时的 HEDGE_LATENCY_PERCENTILE 分位数,样本不足时返回默认值
+    """
+    if len(primary_latencies) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    
+    samples = sorted(primary_latencies)
+    index = min(len(samples) - 1, int(HEDGE_LATENCY_PERCENTILE * len(samples)))
+    return samples[index]
+
+
+async def _query_source(scraper, query_func_name: str, *args, **kwargs) -> Optional[dict[str, Any]]:
+    """
+    调用单个数据源的异步查询方法
+    
+    Returns:
+        查询结果,发生异常时返回None
+    """
+    try:
+        query_method = getattr(scraper, f"{query_func_name}_async")
+        return await query_method(*args, **kwargs)
+    except Exception as e:
+        logger.error(f"数据源查询异常: {e}", exc_info=True)
+        return None
+
+
+async def _timed_primary_query(query_func_name: str, *args, **kwargs) -> Optional[dict[str, Any]]:
+    """
+    查询主数据源并记录耗时
+    
+    被对冲取消的查询同样记录取消时的耗时: 这些正是慢尾样本 (不短于对冲等待时间),
+    只记录正常完成的查询会拉低分位数,使对冲越来越早触发;
+    冷启动期间发起的查询耗时偏高,不记录。
+    """
+    global primary_cold
+    scraper = get_primary_scraper()
+    cold = primary_cold
+    
+    start = time.monotonic()
+    try:
+        result = await _query_source(scraper, query_func_name, *args, **kwargs)
+        primary_cold = False
+        return result
+    finally:
+        if not cold:
+            primary_latencies.append(time.monotonic() - start)
+
+
+async def query_with_hedging(query_func_name: str, *args, **kwargs) -> dict[str, Any]:
+    """
+    对冲模式查询: 主数据源超过历史耗时分位数仍未返回时,并行启动备用数据源
+    
+    先返回有效结果 (search_success) 的一方胜出,另一方被取消;
+    主数据源在等待时间内失败时直接查询备用数据源。
+    
+    Args:
+        query_func_name: 查询方法名称 (如 'query_by_product_name')
+        *args, **kwargs: 传递给查询方法的参数
+        
+    Returns:
+        查询结果，包含 data_source 和 query_method 字段
+    """
+    sources = {
+        'primary': ('hsciq.com', 'primary_success'),
+        'fallback': ('i5a6.com', 'fallback_success'),
+    }
+    
+    delay = get_hedge_delay()
+    primary = asyncio.ensure_future(_timed_primary_query(query_func_name, *args, **kwargs))
+    tasks = {primary: 'primary'}
+    
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if not done:
+        logger.info(f"主数据源 {delay:.2f}秒 内未返回,并行启动备用数据源")
+        query_stats['hedged_queries'] += 1
+    elif not (primary.result() or {}).get('search_success', False):
+        logger.warning("主数据源查询失败,切换到备用数据源")
+    
+    if not done or not (primary.result() or {}).get('search_success', False):
+        fallback = asyncio.ensure_future(
+            _query_source(get_fallback_scraper(), query_func_name, *args, **kwargs)
+        )
+        tasks[fallback] = 'fallback'
+    
+    last_result = None
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result is None:
+                    continue
+                
+                method = tasks[task]
+                if result.get('search_success', False):
+                    data_source, stat_key = sources[method]
+                    query_stats[stat_key] += 1
+                    result['data_source'] = data_source
+                    result['query_method'] = method
+                    logger.info(f"{data_source} 查询成功 ({method})")
+                    return result
+                
+                if method == 'fallback' or last_result is None:
+                    last_result = result
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    # 所有数据源都失败
+    query_stats['total_failures'] += 1
+    if last_result is None:
+        return {
+            'search_success': False,
+            'error_message': "所有数据源查询失败",
+            'data_source': 'none',
+            'query_method': 'failed'
+        }
+    
+    last_result['data_source'] = 'none'
+    last_result['query_method'] = 'failed'
+    return last_result
+
+
+async def query_with_fallback(query_func_name: str, *args, **kwargs) -> dict[str, Any]:
     """
     主备模式查询函数
     
+    通过爬虫的异步接口 (`<query_func_name>_async`) 执行查询,不阻塞 MCP 事件循环
+    
     Args:
         query_func_name: 查询方法名称 (如 'query_by_product_name')
         *args, **kwargs: 传递给查询方法的参数
@@ -83,12 +236,15 @@ def query_with_fallback(query_func_name: str, *args, **kwargs) -> dict[str, Any]
     global query_stats
     query_stats['total_queries'] += 1
     
+    if FALLBACK_HEDGING:
+        return await query_with_hedging(query_func_name, *args, **kwargs)
+    
     # 尝试主数据源 (HSCIQ)
     try:
         logger.info(f"使用主数据源查询: {query_func_name}({args}, {kwargs})")
         primary_scraper = get_primary_scraper()
-        query_method = getattr(primary_scraper, query_func_name)
-        result = query_method(*args, **kwargs)
+        query_method = getattr(primary_scraper, f"{query_func_name}_async")
+        result = await query_method(*args, **kwargs)
         
         if result.get('search_success', False):
             # 主数据源成功
@@ -107,8 +263,8 @@ def query_with_fallback(query_func_name: str, *args, **kwargs) -> dict[str, Any]
     try:
         logger.info(f"切换到备用数据源查询")
         fallback_scraper = get_fallback_scraper()
-        query_method = getattr(fallback_scraper, query_func_name)
-        result = query_method(*args, **kwargs)
+        query_method = getattr(fallback_scraper, f"{query_func_name}_async")
+        result = await query_method(*args, **kwargs)
         
         if result.get('search_success', False):
             # 备用数据源成功
@@ -136,7 +292,7 @@ def query_with_fallback(query_func_name: str, *args, **kwargs) -> dict[str, Any]
 
 
 @mcp.tool()
-def query_hs_code(product_name: str) -> dict[str, Any]:
+async def query_hs_code(product_name: str) -> dict[str, Any]:
     """根据商品名称查询HS编码及完整申报信息（支持主备数据源自动切换）
     
     查询策略:
@@ -184,13 +340,15 @@ def query_hs_code(product_name: str) -> dict[str, Any]:
             "query_method": "primary"
         }
     """
-    return query_with_fallback('query_by_product_name', product_name)
+    return await query_with_fallback('query_by_product_name', product_name)
 
 
 @mcp.tool()
-def batch_query_hs_codes(product_names: list[str]) -> dict[str, Any]:
+async def batch_query_hs_codes(product_names: list[str]) -> dict[str, Any]:
     """批量查询多个商品的HS编码（每个商品支持主备数据源自动切换）
     
+    多个商品并发查询（并发数由 BATCH_MAX_WORKERS 配置），结果顺序与输入一致
+    
     Args:
         product_names: 商品名称列表，例如：["苹果", "香蕉", "橙子"]
         
@@ -229,10 +387,10 @@ def batch_query_hs_codes(product_names: list[str]) -> dict[str, Any]:
             ]
         }
     """
-    results = []
-    for product_name in product_names:
-        result = query_with_fallback('query_by_product_name', product_name)
-        results.append(result)
+    async def query_one(product_name: str) -> dict[str, Any]:
+        return await query_with_fallback('query_by_product_name', product_name)
+    
+    results = await run_bounded(product_names, query_one, BATCH_MAX_WORKERS)
     
     successful = sum(1 for r in results if r.get('search_success', False))
     failed = len(results) - successful
@@ -250,7 +408,7 @@ def batch_query_hs_codes(product_names: list[str]) -> dict[str, Any]:
 
 
 @mcp.tool()
-def query_by_code(hs_code: str) -> dict[str, Any]:
+async def query_by_code(hs_code: str) -> dict[str, Any]:
     """根据已知的HS编码查询详细信息（支持主备数据源自动切换）
     
     Args:
@@ -270,7 +428,7 @@ def query_by_code(hs_code: str) -> dict[str, Any]:
             ...
         }
     """
-    return query_with_fallback('query_by_hs_code', hs_code)
+    return await query_with_fallback('query_by_hs_code', hs_code)
 
 
 @mcp.tool()
@@ -282,8 +440,10 @@ def get_query_stats() -> dict[str, Any]:
     - 主数据源成功次数
     - 备用数据源成功次数
     - 总失败次数
+    - 对冲查询次数（启动了备用数据源的查询）
     - 成功率
     - 主数据源成功率
+    - 详情页区域裁剪的成功率和裁剪前后字节数
     
     Returns:
         统计信息字典
@@ -308,7 +468,8 @@ def get_query_stats() -> dict[str, Any]:
         **query_stats,
         'success_rate': success / total if total > 0 else 0.0,
         'primary_success_rate': query_stats['primary_success'] / total if total > 0 else 0.0,
-        'fallback_success_rate': query_stats['fallback_success'] / total if total > 0 else 0.0
+        'fallback_success_rate': query_stats['fallback_success'] / total if total > 0 else 0.0,
+        'html_trim': get_trim_stats()
     }
 
 
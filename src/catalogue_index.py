@@ -0,0 +1,209 @@
+"""
+HS编码目录语义索引模块
+
+离线把完整税则目录（约1.3万个10位编码）的商品名称和描述编码为归一化向量,
+查询时只需编码一次查询文本,与全部向量做一次矩阵点积即可得到前K个编码,不需要网络请求:
+- 目录文件: CSV（表头 hs_code,product_name[,description]）或 JSONL（同名字段）
+- 名称和描述各占一行向量,检索时按编码去重,保留最高分
+- 索引文件: <模型>.npy（float32 向量矩阵,加载时内存映射）+ <模型>.json（编码、名称、行对应的编码）
+- 向量与推理后端对应（同 EmbeddingMatcher 的磁盘存储）,更换模型或后端后需要重新生成
+
+创建日期: 2026-10-16
+"""
+import csv
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import CATALOGUE_INDEX_DIR, CATALOGUE_TOP_K
+from src.detail_cache import normalize_hs_code
+from src.records import SearchCandidate
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def catalogue_index_path(cache_name: str, directory: str = CATALOGUE_INDEX_DIR) -> str:
+    """返回索引文件路径（不含扩展名）"""
+    return os.path.join(directory, re.sub(r'[^\w.-]+', '__', cache_name))
+
+
+def read_catalogue(path: str) -> List[Tuple[str, str, str]]:
+    """
+    读取税则目录文件
+
+    Args:
+        path: CSV 或 JSONL 文件路径（UTF-8）
+
+    Returns:
+        [(10位编码, 商品名称, 描述), ...],跳过编码或名称为空的行
+    """
+    with open(path, encoding='utf-8-sig') as f:
+        if path.endswith('.jsonl'):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    entries = []
+    for row in rows:
+        hs_code = normalize_hs_code(str(row.get('hs_code', '')))
+        name = (row.get('product_name') or '').strip()
+        if hs_code and name:
+            entries.append((hs_code, name, (row.get('description') or '').strip()))
+    return entries
+
+
+class CatalogueIndex:
+    """HS编码目录向量索引"""
+
+    def __init__(self, codes: List[str], names: List[str], row_codes: np.ndarray, matrix: np.ndarray):
+        """
+        Args:
+            codes: 编码列表
+            names: 与 codes 对应的商品名称
+            row_codes: 每行向量对应的编码下标
+            matrix: 归一化向量矩阵,形状为 (行数, 维度)
+        """
+        self.codes = codes
+        self.names = names
+        self.row_codes = row_codes
+        self.matrix = matrix
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @classmethod
+    def build(cls, entries: List[Tuple[str, str, str]], matcher, batch_size: int = 256) -> 'CatalogueIndex':
+        """
+        编码目录条目
+
+        Args:
+            entries: read_catalogue 的返回值
+            matcher: EmbeddingMatcher 实例
+            batch_size: 每次编码的文本数
+
+        Returns:
+            CatalogueIndex
+        """
+        codes, names, texts, row_codes = [], [], [], []
+        for hs_code, name, description in entries:
+            index = len(codes)
+            codes.append(hs_code)
+            names.append(name)
+            for text in dict.fromkeys(filter(None, (name, description))):
+                texts.append(text)
+                row_codes.append(index)
+
+        # 直接调用推理后端,目录文本不进入查询用的缓存和磁盘存储
+        matrix = np.concatenate([
+            matcher.encoder.encode(texts[start:start + batch_size], batch_size=batch_size)
+            for start in range(0, len(texts), batch_size)
+        ]).astype(np.float32)
+        return cls(codes, names, np.array(row_codes, dtype=np.int32), matrix)
+
+    def save(self, path: str):
+        """
+        保存索引
+
+        Args:
+            path: catalogue_index_path 的返回值
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.save(path + '.npy', self.matrix)
+        with open(path + '.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'codes': self.codes,
+                'names': self.names,
+                'row_codes': self.row_codes.tolist()
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> 'CatalogueIndex':
+        """
+        加载索引（向量矩阵内存映射）
+
+        Args:
+            path: catalogue_index_path 的返回值
+
+        Returns:
+            CatalogueIndex
+        """
+        with open(path + '.json', encoding='utf-8') as f:
+            meta = json.load(f)
+        matrix = np.load(path + '.npy', mmap_mode='r')
+        return cls(meta['codes'], meta['names'], np.array(meta['row_codes'], dtype=np.int32), matrix)
+
+    def search(self, query_vector: np.ndarray, top_k: int = CATALOGUE_TOP_K) -> List[SearchCandidate]:
+        """
+        检索与查询向量最相似的编码
+
+        Args:
+            query_vector: 归一化的查询向量
+            top_k: 返回的编码数
+
+        Returns:
+            候选列表（url 为空,由爬虫按站点填写）,按相似度降序排列
+        """
+        if not len(self.codes) or top_k <= 0:
+            return []
+
+        scores = self.matrix @ query_vector.astype(np.float32)
+
+        # 先取足够多的行,按编码去重后再截取前 top_k 个
+        limit = min(len(scores), top_k * 4)
+        rows = np.argpartition(-scores, limit - 1)[:limit]
+        rows = rows[np.argsort(-scores[rows], kind='stable')]
+
+        results: Dict[int, float] = {}
+        for row in rows:
+            code_index = int(self.row_codes[row])
+            if code_index not in results:
+                results[code_index] = float(scores[row])
+                if len(results) == top_k:
+                    break
+
+        return [
+            SearchCandidate(self.codes[index], self.names[index], '', score)
+            for index, score in results.items()
+        ]
+
+
+# 进程内按推理后端共享的索引（不存在时记为 None,不重复查找文件）
+_indexes: Dict[str, Optional[CatalogueIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_catalogue_index(cache_name: str) -> Optional[CatalogueIndex]:
+    """
+    获取推理后端对应的目录索引
+
+    Args:
+        cache_name: 编码器的 cache_name（模型名称和推理后端）
+
+    Returns:
+        CatalogueIndex 实例,索引文件不存在或加载失败时返回None
+    """
+    with _indexes_lock:
+        if cache_name not in _indexes:
+            path = catalogue_index_path(cache_name)
+            index = None
+            if os.path.exists(path + '.npy'):
+                try:
+                    index = CatalogueIndex.load(path)
+                    logger.info(f"HS编码目录索引已加载: {path} ({len(index)} 个编码)")
+                except Exception as e:
+                    logger.error(f"HS编码目录索引加载失败: {e}")
+            else:
+                logger.info(f"未找到HS编码目录索引 ({path}.npy),查询只使用在线搜索")
+            _indexes[cache_name] = index
+
+    return _indexes[cache_name]
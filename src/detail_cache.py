@@ -0,0 +1,177 @@
+"""
+HS编码详情记录缓存模块
+
+按"数据源 + 规范化的10位HS编码"缓存已解析的详情记录:
+- 只缓存10位编码; 8位编码的页面不进入缓存,避免与其下10位子目的记录混用
+- 进程内全局共享,API、MCP服务器和命令行创建的所有爬虫实例共用
+- 在 get_product_detail / get_hs_code_detail 发起请求之前查询,
+  热门编码只需下载和解析一次
+- LRU 淘汰 + 有效期
+- 记录为不可变的 HSRecord,读写时直接共享,不再深拷贝
+
+创建日期: 2026-10-16
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import DETAIL_CACHE_SIZE, DETAIL_CACHE_TTL
+from src.utils import setup_logger
+from src.records import HSRecord
+
+logger = setup_logger(__name__)
+
+_DETAIL_URL_PATTERN = re.compile(r'/(?:HSCN/Code|hscode/detail)/(\d{10})(?!\d)')
+
+# 缓存键使用的编码位数
+_HS_CODE_DIGITS = 10
+
+
+def normalize_hs_code(hs_code: str) -> str:
+    """
+    规范化HS编码为纯数字形式
+
+    例如 "08081000.00"、"0808 1000 00" 都规范为 "0808100000"
+
+    Args:
+        hs_code: 原始HS编码
+
+    Returns:
+        只包含数字的编码字符串
+    """
+    return re.sub(r'\D', '', hs_code or '')
+
+
+def hs_code_from_url(url: str) -> str:
+    """
+    从详情页URL中提取规范化的HS编码
+
+    Args:
+        url: 详情页URL
+
+    Returns:
+        10位HS编码,无法识别或不是10位编码时返回空字符串
+    """
+    match = _DETAIL_URL_PATTERN.search(url or '')
+    return match.group(1) if match else ''
+
+
+class DetailCache:
+    """线程安全的详情记录 LRU 缓存"""
+
+    def __init__(self, max_size: int = DETAIL_CACHE_SIZE, ttl: float = DETAIL_CACHE_TTL):
+        """
+        初始化缓存
+
+        Args:
+            max_size: 最多缓存的记录数
+            ttl: 记录有效期（秒）
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._records: 'OrderedDict[Tuple[str, str], Tuple[float, HSRecord]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source: str, hs_code: str) -> Optional[HSRecord]:
+        """
+        读取详情记录
+
+        Args:
+            source: 数据源标识 (如 'hsciq.com')
+            hs_code: HS编码（任意格式）
+
+        Returns:
+            详情记录,未命中、已过期或不是10位编码时返回None
+        """
+        key = (source, normalize_hs_code(hs_code))
+
+        with self._lock:
+            if len(key[1]) != _HS_CODE_DIGITS:
+                self.misses += 1
+                return None
+
+            item = self._records.get(key)
+            if item is None or time.time() - item[0] > self.ttl:
+                if item is not None:
+                    del self._records[key]
+                self.misses += 1
+                return None
+
+            self._records.move_to_end(key)
+            self.hits += 1
+            record = item[1]
+
+        logger.debug(f"详情缓存命中: {source} {key[1]}")
+        return record
+
+    def put(self, source: str, hs_code: str, record: HSRecord):
+        """
+        写入详情记录
+
+        Args:
+            source: 数据源标识
+            hs_code: HS编码（任意格式,规范化后不是10位时不缓存）
+            record: 解析后的详情记录
+        """
+        key = (source, normalize_hs_code(hs_code))
+        if len(key[1]) != _HS_CODE_DIGITS:
+            return
+
+        with self._lock:
+            self._records[key] = (time.time(), record)
+            self._records.move_to_end(key)
+            while len(self._records) > self.max_size:
+                self._records.popitem(last=False)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._records.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict:
+        """
+        获取缓存统计信息
+
+        Returns:
+            统计字典
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._records),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total > 0 else 0.0
+            }
+
+
+# 进程内全局共享的缓存实例
+_global_cache: Optional[DetailCache] = None
+_global_cache_lock = threading.Lock()
+
+
+def get_detail_cache() -> DetailCache:
+    """
+    获取全局详情记录缓存单例
+
+    Returns:
+        DetailCache 实例
+    """
+    global _global_cache
+
+    with _global_cache_lock:
+        if _global_cache is None:
+            _global_cache = DetailCache()
+
+    return _global_cache
@@ -0,0 +1,298 @@
+"""
+嵌入模型推理后端模块
+
+EmbeddingMatcher 通过统一的编码器接口调用模型,底层可切换:
+- torch: SentenceTransformer + PyTorch（默认,与之前的实现相同）
+- onnx:  ONNX Runtime 运行导出的模型图（可选 int8 动态量化）+ tokenizers 快速分词器,
+         不需要导入 PyTorch,CPU 上对商品名这类短文本延迟更低
+
+两种后端的 encode 输入文本列表,输出 L2 归一化的 float32 矩阵。
+依赖均在创建编码器时才导入; onnx 需要 pip install .[onnx],
+并先用 export_onnx_model（python benchmark_embedding.py --export）导出模型。
+
+创建日期: 2026-10-16
+"""
+import inspect
+import json
+import os
+import re
+from typing import List, Optional
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import EMBEDDING_BACKEND, EMBEDDING_ONNX_DIR, EMBEDDING_ONNX_QUANTIZED
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+# 导出目录中的文件
+ONNX_MODEL_FILE = 'model.onnx'
+ONNX_INT8_MODEL_FILE = 'model_int8.onnx'
+ONNX_CONFIG_FILE = 'onnx_config.json'
+
+
+def onnx_model_dir(model_name: str, root: str = EMBEDDING_ONNX_DIR) -> str:
+    """返回模型导出后所在的目录"""
+    return os.path.join(root, re.sub(r'[^\w.-]+', '__', model_name))
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    """L2 归一化（与 SentenceTransformer 的 normalize_embeddings 相同）"""
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+
+class TorchEncoder:
+    """SentenceTransformer (PyTorch) 编码器"""
+
+    name = 'torch'
+
+    def __init__(self, model_name: str, cache_dir: Optional[str] = None):
+        """
+        加载模型
+
+        Args:
+            model_name: 预训练模型名称
+            cache_dir: 模型缓存目录,默认使用 HuggingFace 默认缓存
+        """
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(
+            model_name,
+            cache_folder=cache_dir,
+            device='cpu'  # 使用 CPU,如果有 GPU 可改为 'cuda'
+        )
+        self.embedding_dim = self.model.get_sentence_embedding_dimension()
+
+    @property
+    def cache_name(self) -> str:
+        """区分向量来源的名称（用于磁盘存储）"""
+        return self.model_name
+
+    def encode(self, texts: List[str], batch_size: int = 32, show_progress: bool = False) -> np.ndarray:
+        """
+        编码文本
+
+        Args:
+            texts: 文本列表
+            batch_size: 批处理大小
+            show_progress: 是否显示进度条
+
+        Returns:
+            归一化的向量矩阵,形状为 (len(texts), embedding_dim)
+        """
+        if not texts:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=show_progress,
+            convert_to_numpy=True,
+            normalize_embeddings=True  # L2 归一化,用于余弦相似度
+        )
+
+
+class OnnxEncoder:
+    """ONNX Runtime 编码器"""
+
+    name = 'onnx'
+
+    def __init__(self, model_dir: str, quantized: bool = EMBEDDING_ONNX_QUANTIZED):
+        """
+        加载导出的模型和分词器
+
+        Args:
+            model_dir: export_onnx_model 的输出目录
+            quantized: 是否使用 int8 量化模型
+
+        Raises:
+            ImportError: 未安装 onnxruntime / tokenizers
+            FileNotFoundError: 模型尚未导出
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE)
+        config_path = os.path.join(model_dir, ONNX_CONFIG_FILE)
+        if not os.path.exists(model_path) or not os.path.exists(config_path):
+            raise FileNotFoundError(f"未找到导出的 ONNX 模型: {model_path}")
+
+        with open(config_path, encoding='utf-8') as f:
+            config = json.load(f)
+
+        self.model_name = config['model_name']
+        self.embedding_dim = config['dim']
+        self.pooling = config['pooling']
+        self.quantized = quantized
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self._input_names = {item.name for item in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, 'tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=config['max_length'])
+        self.tokenizer.enable_padding(pad_id=config['pad_id'], pad_token=config['pad_token'])
+
+    @property
+    def cache_name(self) -> str:
+        """区分向量来源的名称（量化模型的向量与原模型略有差异,单独存储）"""
+        return f"{self.model_name}@onnx-int8" if self.quantized else f"{self.model_name}@onnx"
+
+    def encode(self, texts: List[str], batch_size: int = 32, show_progress: bool = False) -> np.ndarray:
+        """
+        编码文本（show_progress 不适用,仅为与 TorchEncoder 保持相同的参数）
+
+        Args:
+            texts: 文本列表
+            batch_size: 批处理大小
+            show_progress: 未使用
+
+        Returns:
+            归一化的向量矩阵,形状为 (len(texts), embedding_dim)
+        """
+        if not texts:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {
+                'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+                'attention_mask': attention_mask
+            }
+            if 'token_type_ids' in self._input_names:
+                feeds['token_type_ids'] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+            hidden = self.session.run(None, feeds)[0]
+            if self.pooling == 'cls':
+                pooled = hidden[:, 0]
+            else:
+                mask = attention_mask[..., None].astype(hidden.dtype)
+                pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            batches.append(pooled)
+
+        return _normalize(np.concatenate(batches).astype(np.float32))
+
+
+def create_encoder(model_name: str, backend: Optional[str] = None, cache_dir: Optional[str] = None):
+    """
+    创建编码器
+
+    Args:
+        model_name: 预训练模型名称
+        backend: 'torch' 或 'onnx',默认使用 EMBEDDING_BACKEND
+        cache_dir: torch 后端的模型缓存目录
+
+    Returns:
+        TorchEncoder 或 OnnxEncoder（onnx 不可用时回退到 torch）
+    """
+    backend = (backend or EMBEDDING_BACKEND).lower()
+    if backend == 'onnx':
+        try:
+            return OnnxEncoder(onnx_model_dir(model_name))
+        except (ImportError, FileNotFoundError) as e:
+            logger.warning(f"ONNX 推理后端不可用,使用 torch (pip install .[onnx] 并导出模型): {e}")
+    elif backend != 'torch':
+        raise ValueError(f"不支持的嵌入模型推理后端: {backend},可选: torch, onnx")
+
+    return TorchEncoder(model_name, cache_dir=cache_dir)
+
+
+def _pooling_mode(pooling) -> str:
+    """读取 SentenceTransformer 池化层的方式（OnnxEncoder 支持 cls 和 mean）"""
+    config = pooling.get_config_dict()
+    mode = config.get('pooling_mode')  # sentence-transformers 6.x
+    if mode is None:
+        mode = 'cls' if config.get('pooling_mode_cls_token') else \
+            'mean' if config.get('pooling_mode_mean_tokens') else None
+    if mode not in ('cls', 'mean'):
+        raise ValueError(f"不支持导出的池化方式: {config}")
+    return mode
+
+
+def export_onnx_model(model_name: str, output_dir: Optional[str] = None, quantize: bool = True,
+                      cache_dir: Optional[str] = None) -> str:
+    """
+    把 SentenceTransformer 模型导出为 ONNX（需要 torch、onnx 和 onnxruntime）
+
+    输出目录包含 model.onnx、可选的 model_int8.onnx（权重 int8 动态量化）、
+    tokenizer.json 和记录池化方式等参数的 onnx_config.json。
+
+    Args:
+        model_name: 预训练模型名称
+        output_dir: 输出目录,默认 onnx_model_dir(model_name)
+        quantize: 是否同时生成 int8 量化模型
+        cache_dir: 模型缓存目录
+
+    Returns:
+        输出目录
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = output_dir or onnx_model_dir(model_name)
+    os.makedirs(output_dir, exist_ok=True)
+
+    st_model = SentenceTransformer(model_name, cache_folder=cache_dir, device='cpu')
+    transformer, pooling = st_model[0], st_model[1]
+    tokenizer = transformer.tokenizer
+    tokenizer.save_pretrained(output_dir)
+
+    sample = tokenizer(['鲜苹果'], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+
+    class _HiddenStates(torch.nn.Module):
+        """只输出最后一层隐藏状态,池化和归一化在 OnnxEncoder 中完成"""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs)), return_dict=False)[0]
+
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+
+    # 新版 torch 默认使用 dynamo 导出器（需要 onnxscript）,这里使用 TorchScript 导出器
+    export_options = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        export_options['dynamo'] = False
+
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            _HiddenStates(transformer.auto_model.eval()),
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            **export_options
+        )
+    logger.info(f"已导出 ONNX 模型: {model_path}")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        int8_path = os.path.join(output_dir, ONNX_INT8_MODEL_FILE)
+        quantize_dynamic(model_path, int8_path, weight_type=QuantType.QInt8)
+        logger.info(f"已生成 int8 量化模型: {int8_path}")
+
+    with open(os.path.join(output_dir, ONNX_CONFIG_FILE), 'w', encoding='utf-8') as f:
+        json.dump({
+            'model_name': model_name,
+            'dim': st_model.get_sentence_embedding_dimension(),
+            'pooling': _pooling_mode(pooling),
+            'max_length': st_model.max_seq_length,
+            'pad_id': tokenizer.pad_token_id,
+            'pad_token': tokenizer.pad_token
+        }, f, ensure_ascii=False, indent=2)
+
+    return output_dir
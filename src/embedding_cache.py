@@ -0,0 +1,141 @@
+"""
+嵌入向量缓存模块
+
+按文本缓存语义匹配模型的编码结果:
+- LRU 淘汰: 命中时移到队尾,常用商品名不会因为写入早而被淘汰
+- 同时按条目数和内存字节数（向量 + 文本键）限制大小
+- 可选以 float16 保存向量,内存减半,读取时还原为 float32
+- 直接以预处理后的文本作为键（字符串哈希由 Python 缓存）,不再逐次计算 MD5
+
+写入时复制向量,不会引用模型一次批量编码得到的整个矩阵。
+
+创建日期: 2026-10-16
+"""
+import sys
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import EMBEDDING_CACHE_MAX_BYTES, EMBEDDING_CACHE_FLOAT16
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class EmbeddingCache:
+    """线程安全的嵌入向量 LRU 缓存"""
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 use_float16: Optional[bool] = None):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 最多缓存的文本数,None 表示只按字节数限制
+            max_bytes: 内存上限（字节）,默认 EMBEDDING_CACHE_MAX_BYTES
+            use_float16: 是否以 float16 保存向量,默认 EMBEDDING_CACHE_FLOAT16
+        """
+        self.max_entries = max_entries
+        self.max_bytes = EMBEDDING_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.use_float16 = EMBEDDING_CACHE_FLOAT16 if use_float16 is None else use_float16
+        self._dtype = np.float16 if self.use_float16 else np.float32
+
+        self._vectors: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    @staticmethod
+    def _entry_size(text: str, vector: np.ndarray) -> int:
+        """条目占用的字节数（向量数据 + 文本键）"""
+        return vector.nbytes + sys.getsizeof(text)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        读取嵌入向量
+
+        Args:
+            text: 预处理后的文本
+
+        Returns:
+            float32 向量,未命中返回None
+        """
+        with self._lock:
+            vector = self._vectors.get(text)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._vectors.move_to_end(text)
+            self.hits += 1
+
+        return vector.astype(np.float32) if self.use_float16 else vector
+
+    def put(self, text: str, embedding: np.ndarray):
+        """
+        写入嵌入向量,超出条目数或内存上限时淘汰最久未使用的条目
+
+        Args:
+            text: 预处理后的文本
+            embedding: 嵌入向量
+        """
+        vector = np.array(embedding, dtype=self._dtype)
+        size = self._entry_size(text, vector)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._vectors.pop(text, None)
+            if old is not None:
+                self._bytes -= self._entry_size(text, old)
+
+            self._vectors[text] = vector
+            self._bytes += size
+
+            while self._vectors and (
+                self._bytes > self.max_bytes or
+                (self.max_entries is not None and len(self._vectors) > self.max_entries)
+            ):
+                evicted_text, evicted = self._vectors.popitem(last=False)
+                self._bytes -= self._entry_size(evicted_text, evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """清空缓存和统计"""
+        with self._lock:
+            self._vectors.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get_stats(self) -> Dict:
+        """
+        获取缓存统计信息
+
+        Returns:
+            统计字典
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._vectors),
+                'max_size': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'dtype': np.dtype(self._dtype).name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total > 0 else 0.0,
+                'total_requests': total
+            }
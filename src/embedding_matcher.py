@@ -6,16 +6,24 @@
 
 创建日期: 2025-11-26
 更新日期: 2025-11-26 - 添加嵌入向量缓存机制
+更新日期: 2026-10-16 - 缓存改为按内存上限的 LRU 缓存 (src/embedding_cache.py)
+更新日期: 2026-10-16 - 内存缓存之下增加跨进程共享的磁盘存储 (src/embedding_store.py)
+更新日期: 2026-10-16 - 模型推理可切换为 ONNX Runtime 后端 (src/embedding_backends.py)
+更新日期: 2026-10-16 - 添加离线HS编码目录检索 (src/catalogue_index.py)
 """
 
 import logging
 from typing import List, Tuple, Optional, Dict
-from functools import lru_cache
-import hashlib
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from config.settings import CATALOGUE_TOP_K
+from src.catalogue_index import get_catalogue_index
+from src.embedding_backends import create_encoder
+from src.embedding_cache import EmbeddingCache
+from src.embedding_store import get_embedding_store
+from src.records import SearchCandidate
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,7 +33,11 @@ class EmbeddingMatcher:
     def __init__(self, model_name: str = "BAAI/bge-small-zh-v1.5", 
                  cache_dir: Optional[str] = None,
                  enable_cache: bool = True,
-                 cache_size: int = 1000):
+                 cache_size: Optional[int] = None,
+                 cache_max_bytes: Optional[int] = None,
+                 cache_float16: Optional[bool] = None,
+                 enable_store: bool = True,
+                 backend: Optional[str] = None):
         """
         初始化嵌入模型
         
@@ -36,49 +48,44 @@ class EmbeddingMatcher:
                 - BAAI/bge-large-zh-v1.5: 中文大型模型 (最准确,最慢)
             cache_dir: 模型缓存目录,默认使用 HuggingFace 默认缓存
             enable_cache: 是否启用嵌入向量缓存 (默认True)
-            cache_size: 缓存大小,最多缓存多少个文本的嵌入向量 (默认1000)
+            cache_size: 最多缓存多少个文本的嵌入向量,默认 None 表示只按内存上限 (cache_max_bytes) 限制
+            cache_max_bytes: 缓存内存上限(字节),默认 EMBEDDING_CACHE_MAX_BYTES
+            cache_float16: 是否以 float16 保存缓存向量,默认 EMBEDDING_CACHE_FLOAT16
+            enable_store: 是否使用磁盘存储 (需同时启用缓存和 EMBEDDING_STORE_ENABLED)
+            backend: 推理后端 'torch' 或 'onnx',默认使用 EMBEDDING_BACKEND
         """
         logger.info(f"正在加载嵌入模型: {model_name}")
         
         try:
-            # 加载预训练模型
-            self.model = SentenceTransformer(
-                model_name,
-                cache_folder=cache_dir,
-                device='cpu'  # 使用 CPU,如果有 GPU 可改为 'cuda'
-            )
+            # 加载预训练模型（torch 或 onnx 推理后端）
+            self.encoder = create_encoder(model_name, backend=backend, cache_dir=cache_dir)
             
             # 获取嵌入维度
-            self.embedding_dim = self.model.get_sentence_embedding_dimension()
+            self.embedding_dim = self.encoder.embedding_dim
             
             # 缓存配置
             self.enable_cache = enable_cache
             self.cache_size = cache_size
-            self._embedding_cache: Dict[str, np.ndarray] = {}
-            self._cache_hits = 0
-            self._cache_misses = 0
+            self._cache = EmbeddingCache(
+                max_entries=cache_size,
+                max_bytes=cache_max_bytes,
+                use_float16=cache_float16
+            )
+            self._store = get_embedding_store(self.encoder.cache_name, self.embedding_dim) \
+                if enable_cache and enable_store else None
             
-            logger.info(f"模型加载成功,嵌入维度: {self.embedding_dim}")
+            logger.info(f"模型加载成功,推理后端: {self.encoder.name},嵌入维度: {self.embedding_dim}")
             if self.enable_cache:
-                logger.info(f"嵌入向量缓存已启用,缓存大小: {self.cache_size}")
+                logger.info(
+                    f"嵌入向量缓存已启用,条目上限: {self.cache_size or '不限'}, "
+                    f"内存上限: {self._cache.max_bytes / 1024 / 1024:.0f}MB, "
+                    f"向量类型: {self._cache.get_stats()['dtype']}"
+                )
             
         except Exception as e:
             logger.error(f"模型加载失败: {e}")
             raise
     
-    def _get_cache_key(self, text: str) -> str:
-        """
-        生成文本的缓存键
-        
-        Args:
-            text: 输入文本
-            
-        Returns:
-            缓存键(文本的MD5哈希)
-        """
-        # 使用MD5哈希避免文本过长
-        return hashlib.md5(text.encode('utf-8')).hexdigest()
-    
     def _get_from_cache(self, text: str) -> Optional[np.ndarray]:
         """
         从缓存中获取嵌入向量
@@ -92,16 +99,12 @@ class EmbeddingMatcher:
         if not self.enable_cache:
             return None
         
-        cache_key = self._get_cache_key(text)
-        if cache_key in self._embedding_cache:
-            self._cache_hits += 1
-            current_hit_rate = self.get_cache_hit_rate()
-            logger.debug(f"✓ 缓存命中: '{text[:20]}...' (键: {cache_key[:8]}..., 命中率: {current_hit_rate:.2%})")
-            return self._embedding_cache[cache_key]
-        
-        self._cache_misses += 1
-        logger.debug(f"✗ 缓存未命中: '{text[:20]}...' (键: {cache_key[:8]}...)")
-        return None
+        embedding = self._cache.get(text)
+        if embedding is not None:
+            logger.debug(f"✓ 缓存命中: '{text[:20]}...' (命中率: {self.get_cache_hit_rate():.2%})")
+        else:
+            logger.debug(f"✗ 缓存未命中: '{text[:20]}...'")
+        return embedding
     
     def _put_to_cache(self, text: str, embedding: np.ndarray):
         """
@@ -114,16 +117,9 @@ class EmbeddingMatcher:
         if not self.enable_cache:
             return
         
-        # 如果缓存已满,删除最早的项(FIFO策略)
-        if len(self._embedding_cache) >= self.cache_size:
-            # 删除第一个键
-            first_key = next(iter(self._embedding_cache))
-            del self._embedding_cache[first_key]
-            logger.debug(f"⚠ 缓存已满,删除最早项 (当前大小: {len(self._embedding_cache)}/{self.cache_size})")
-        
-        cache_key = self._get_cache_key(text)
-        self._embedding_cache[cache_key] = embedding
-        logger.debug(f"✓ 已存入缓存: '{text[:20]}...' (键: {cache_key[:8]}..., 大小: {len(self._embedding_cache)}/{self.cache_size})")
+        # 超出条目数或内存上限时淘汰最久未使用的项(LRU策略)
+        self._cache.put(text, embedding)
+        logger.debug(f"✓ 已存入缓存: '{text[:20]}...' (大小: {len(self._cache)}/{self.cache_size or '不限'})")
     
     def get_cache_stats(self) -> Dict[str, any]:
         """
@@ -134,12 +130,8 @@ class EmbeddingMatcher:
         """
         return {
             'enabled': self.enable_cache,
-            'size': len(self._embedding_cache),
-            'max_size': self.cache_size,
-            'hits': self._cache_hits,
-            'misses': self._cache_misses,
-            'hit_rate': self.get_cache_hit_rate(),
-            'total_requests': self._cache_hits + self._cache_misses
+            **self._cache.get_stats(),
+            'store': self._store.get_stats() if self._store is not None else None
         }
     
     def get_cache_hit_rate(self) -> float:
@@ -149,14 +141,11 @@ class EmbeddingMatcher:
         Returns:
             命中率 (0-1之间)
         """
-        total = self._cache_hits + self._cache_misses
-        return self._cache_hits / total if total > 0 else 0.0
+        return self._cache.get_stats()['hit_rate']
     
     def clear_cache(self):
         """清空缓存"""
-        self._embedding_cache.clear()
-        self._cache_hits = 0
-        self._cache_misses = 0
+        self._cache.clear()
         logger.info("嵌入向量缓存已清空")
     
     def encode(self, texts: List[str], batch_size: int = 32, show_progress: bool = False) -> np.ndarray:
@@ -192,24 +181,42 @@ class EmbeddingMatcher:
             else:
                 texts_to_encode.append(text)
                 text_indices.append(i)
-                logger.debug(f"  [{i}] 需要编码: '{text[:30]}...'")
+        
+        # 内存缓存未命中的文本再查磁盘存储（其他进程或之前运行时编码过的文本）
+        if texts_to_encode and self._store is not None:
+            stored = self._store.get_many(texts_to_encode)
+            remaining = [(i, text) for i, text in zip(text_indices, texts_to_encode) if text not in stored]
+            for i, text in zip(text_indices, texts_to_encode):
+                if text in stored:
+                    embeddings_list.append((i, stored[text]))
+                    self._put_to_cache(text, stored[text])
+            text_indices = [i for i, _ in remaining]
+            texts_to_encode = [text for _, text in remaining]
+            if stored:
+                logger.debug(f"磁盘存储命中 {len(stored)} 个文本")
+        
+        for i, text in zip(text_indices, texts_to_encode):
+            logger.debug(f"  [{i}] 需要编码: '{text[:30]}...'")
         
         # 编码未缓存的文本
         if texts_to_encode:
             logger.debug(f"开始编码 {len(texts_to_encode)} 个未缓存的文本...")
-            new_embeddings = self.model.encode(
+            new_embeddings = self.encoder.encode(
                 texts_to_encode,
                 batch_size=batch_size,
-                show_progress_bar=show_progress,
-                convert_to_numpy=True,
-                normalize_embeddings=True  # L2 归一化,用于余弦相似度
+                show_progress=show_progress
             )
             logger.debug(f"编码完成,向量维度: {new_embeddings.shape}")
             
-            # 存入缓存
+            # 存入缓存和磁盘存储
             for text, embedding in zip(texts_to_encode, new_embeddings):
                 self._put_to_cache(text, embedding)
                 logger.debug(f"  已缓存: '{text[:30]}...'")
+            if self._store is not None:
+                try:
+                    self._store.put_many(texts_to_encode, new_embeddings)
+                except Exception as e:
+                    logger.warning(f"写入嵌入向量存储失败: {e}")
                 
             # 添加到结果列表
             for idx, embedding in zip(text_indices, new_embeddings):
@@ -255,6 +262,48 @@ class EmbeddingMatcher:
         
         return float(similarity)
     
+    def score_candidates(self, query: str, candidates: List[str]) -> np.ndarray:
+        """
+        计算查询文本与所有候选文本的余弦相似度（一次批量编码）
+        
+        查询和候选在同一次 encode 调用中编码,未缓存的文本只需一次模型前向计算。
+        
+        Args:
+            query: 查询文本
+            candidates: 候选文本列表
+            
+        Returns:
+            相似度分数数组,与 candidates 一一对应
+        """
+        if not candidates:
+            return np.array([])
+        
+        embeddings = self.encode([query] + list(candidates))
+        similarities = cosine_similarity(embeddings[0:1], embeddings[1:])[0]
+        
+        logger.debug(f"批量相似度: '{query[:20]}' vs {len(candidates)} 个候选, 最高分 {similarities.max():.4f}")
+        return similarities
+    
+    def search_catalogue(self, query: str, top_k: int = CATALOGUE_TOP_K) -> List[SearchCandidate]:
+        """
+        在离线HS编码目录索引中检索最相似的编码（不需要网络请求）
+        
+        Args:
+            query: 查询文本
+            top_k: 返回的编码数
+            
+        Returns:
+            [SearchCandidate, ...] 按相似度降序排列,没有当前推理后端的索引时返回空列表
+        """
+        index = get_catalogue_index(self.encoder.cache_name)
+        if index is None or not query or not query.strip():
+            return []
+        
+        results = index.search(self.encode([query])[0], top_k)
+        if results:
+            logger.debug(f"目录检索: '{query[:20]}' -> {results[0].hs_code} ({results[0].score:.4f})")
+        return results
+    
     def find_best_match(
         self,
         query: str,
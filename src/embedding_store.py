@@ -0,0 +1,246 @@
+"""
+嵌入向量磁盘存储模块
+
+在进程内 LRU 缓存之下持久化模型的编码结果,API 的多个 worker、MCP 服务器和
+命令行共用同一份存储,重启后仍然有效:
+- 向量: 按行追加写入的 float32 矩阵文件 (<模型>.f32),读取时内存映射,返回只读视图不复制
+- 索引: SQLite 单文件 (<模型>.sqlite3, WAL 模式) 记录 文本 -> 行号
+- 写入: 在 SQLite 写事务中分配行号,先写向量再提交索引,
+  多个进程同时写入时由事务串行化,索引不会指向未写完的行
+- 每个模型一组文件,模型名称或向量维度不一致时不会混用
+
+创建日期: 2026-10-16
+"""
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Sequence
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import EMBEDDING_STORE_ENABLED, EMBEDDING_STORE_DIR
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+# SQLite 单条语句的参数个数上限较小（旧版本为 999）,批量查询时分段
+_QUERY_CHUNK = 500
+
+
+class EmbeddingStore:
+    """内存映射的嵌入向量存储"""
+
+    def __init__(self, model_name: str, dim: int, directory: str = EMBEDDING_STORE_DIR):
+        """
+        打开（或创建）模型对应的存储
+
+        Args:
+            model_name: 模型名称,用于区分存储文件
+            dim: 向量维度
+            directory: 存储目录
+
+        Raises:
+            ValueError: 已有存储的模型或维度与参数不一致
+        """
+        self.model_name = model_name
+        self.dim = dim
+        self._row_bytes = dim * np.dtype(np.float32).itemsize
+
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, re.sub(r'[^\w.-]+', '__', model_name))
+        self.matrix_path = base + '.f32'
+        self.index_path = base + '.sqlite3'
+
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        # 以追加方式创建向量文件（已存在时不截断）
+        open(self.matrix_path, 'ab').close()
+
+        self._conn = sqlite3.connect(self.index_path, timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors (text TEXT PRIMARY KEY, row INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._check_meta()
+        logger.info(f"嵌入向量存储已打开: {base} ({self._row_count()} 条)")
+
+    def _check_meta(self):
+        """记录或核对模型名称和向量维度"""
+        expected = {'model': self.model_name, 'dim': str(self.dim)}
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            stored = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+            if not stored:
+                self._conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", expected.items())
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+        if stored and stored != expected:
+            raise ValueError(f"嵌入向量存储与当前模型不一致: {stored} != {expected}")
+
+    def _row_count(self) -> int:
+        """索引中的行数"""
+        return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def _mapped_rows(self, needed: int) -> Optional[np.memmap]:
+        """
+        返回覆盖前 needed 行的只读映射,文件被其他进程追加后重新映射
+
+        调用方需持有 self._lock。
+        """
+        if self._matrix is not None and len(self._matrix) >= needed:
+            return self._matrix
+
+        rows = os.path.getsize(self.matrix_path) // self._row_bytes
+        if rows < needed:
+            return None
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode='r', shape=(rows, self.dim))
+        return self._matrix
+
+    def _lookup(self, texts: Sequence[str]) -> Dict[str, int]:
+        """查询文本对应的行号"""
+        found = {}
+        for start in range(0, len(texts), _QUERY_CHUNK):
+            chunk = texts[start:start + _QUERY_CHUNK]
+            found.update(self._conn.execute(
+                f"SELECT text, row FROM vectors WHERE text IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall())
+        return found
+
+    def get_many(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """
+        批量读取嵌入向量
+
+        Args:
+            texts: 预处理后的文本列表
+
+        Returns:
+            {文本: 只读向量视图},只包含已存储的文本
+        """
+        texts = list(dict.fromkeys(texts))
+        if not texts:
+            return {}
+
+        with self._lock:
+            rows = self._lookup(texts)
+            matrix = self._mapped_rows(max(rows.values()) + 1) if rows else None
+            if rows and matrix is None:
+                logger.warning(f"嵌入向量文件短于索引,忽略存储中的向量: {self.matrix_path}")
+                rows = {}
+
+            self.hits += len(rows)
+            self.misses += len(texts) - len(rows)
+            return {text: matrix[row] for text, row in rows.items()}
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray):
+        """
+        批量追加嵌入向量（已存储的文本跳过）
+
+        Args:
+            texts: 预处理后的文本列表
+            embeddings: 形状为 (len(texts), dim) 的向量矩阵
+        """
+        pending = dict(zip(texts, embeddings))
+        if not pending:
+            return
+
+        with self._lock:
+            # 写事务期间其他进程不能分配行号
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for text in self._lookup(list(pending)):
+                    del pending[text]
+                if not pending:
+                    self._conn.execute("COMMIT")
+                    return
+
+                first_row = self._conn.execute(
+                    "SELECT COALESCE(MAX(row) + 1, 0) FROM vectors"
+                ).fetchone()[0]
+                block = np.asarray(list(pending.values()), dtype=np.float32).reshape(-1, self.dim)
+
+                # 先写向量再提交索引; 崩溃留下的未索引数据会被下一次写入覆盖
+                with open(self.matrix_path, 'r+b') as f:
+                    f.seek(first_row * self._row_bytes)
+                    f.write(block.tobytes())
+
+                self._conn.executemany(
+                    "INSERT INTO vectors (text, row) VALUES (?, ?)",
+                    ((text, first_row + i) for i, text in enumerate(pending))
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            self.writes += len(pending)
+
+    def get_stats(self) -> Dict:
+        """
+        获取存储统计信息
+
+        Returns:
+            统计字典
+        """
+        with self._lock:
+            size = self._row_count()
+            total = self.hits + self.misses
+            return {
+                'size': size,
+                'bytes': size * self._row_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'hit_rate': self.hits / total if total > 0 else 0.0
+            }
+
+    def close(self):
+        """关闭索引连接并释放映射"""
+        with self._lock:
+            self._matrix = None
+            self._conn.close()
+
+
+# 进程内按模型共享的存储实例
+_stores: Dict[str, EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(model_name: str, dim: int) -> Optional[EmbeddingStore]:
+    """
+    获取模型对应的全局嵌入向量存储
+
+    Args:
+        model_name: 模型名称
+        dim: 向量维度
+
+    Returns:
+        EmbeddingStore 实例,未启用或打开失败时返回None
+    """
+    if not EMBEDDING_STORE_ENABLED:
+        return None
+
+    with _stores_lock:
+        if model_name not in _stores:
+            try:
+                _stores[model_name] = EmbeddingStore(model_name, dim)
+            except Exception as e:
+                logger.error(f"嵌入向量存储初始化失败,将只使用内存缓存: {e}")
+                return None
+
+    return _stores[model_name]
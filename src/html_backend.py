@@ -0,0 +1,382 @@
+"""
+HTML解析后端模块
+
+两个站点的解析器通过统一的小型选择器接口访问文档,底层可切换:
+- lxml:          直接使用 lxml 构建的元素树（生产环境默认,最快）
+- beautifulsoup: BeautifulSoup(html, 'lxml')（便于调试,与旧实现完全一致）
+
+节点接口沿用 BeautifulSoup 的方法名 (get_text / get / find_all / find_parent /
+find_next_sibling),两种后端对同一页面返回相同的结果。
+受限解析 (parse 的 only 参数) 只为区域标签构建树: lxml 只解析原始内容中第一个区域开始标签到
+最后一个区域结束标签之间的片段,BeautifulSoup 使用 SoupStrainer; 未找到内容时用 expand 重新解析完整页面。
+由 HTML_PARSER_BACKEND 配置选择,或在创建解析器时传入 backend 参数。
+
+创建日期: 2026-10-16
+"""
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Tuple, Union
+import sys
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import HTML_PARSER_BACKEND
+from src.utils import parse_html_tree, lxml_get_text, lxml_next_sibling, resolve_html_encoding
+
+TagNames = Union[str, List[str]]
+AttrMatch = Union[str, Pattern]
+
+
+def _as_names(name: Optional[TagNames]) -> Optional[tuple]:
+    """统一标签名参数为元组,None 表示任意标签"""
+    if name is None:
+        return None
+    return (name,) if isinstance(name, str) else tuple(name)
+
+
+def _attr_matches(value: Optional[str], expected: AttrMatch) -> bool:
+    """属性值匹配: 正则使用 search,字符串要求相等（与 BeautifulSoup 一致）"""
+    if value is None:
+        return False
+    if isinstance(expected, str):
+        return value == expected
+    return expected.search(value) is not None
+
+
+@lru_cache(maxsize=8)
+def _region_tag_patterns(tags: Tuple[str, ...], as_bytes: bool) -> Tuple[Pattern, Pattern]:
+    """区域开始标签和结束标签的正则"""
+    names = '|'.join(re.escape(tag) for tag in tags)
+    start, end = '<(?:%s)[\\s>]' % names, '</(?:%s)\\s*>' % names
+    if as_bytes:
+        start, end = start.encode('ascii'), end.encode('ascii')
+    return re.compile(start, re.IGNORECASE), re.compile(end, re.IGNORECASE)
+
+
+def region_slice(html: Union[str, bytes], tags: List[str]) -> Optional[Union[str, bytes]]:
+    """
+    截取第一个区域开始标签到最后一个区域结束标签之间的内容
+
+    Args:
+        html: 页面内容（str 或响应原始字节）
+        tags: 区域标签名
+
+    Returns:
+        截取的片段（与输入类型相同）,页面中没有完整的区域标签时返回None
+    """
+    start_pattern, end_pattern = _region_tag_patterns(tuple(tags), isinstance(html, bytes))
+    start = start_pattern.search(html)
+    if start is None:
+        return None
+
+    end = None
+    for end in end_pattern.finditer(html, start.end()):
+        pass
+    if end is None:
+        return None
+    return html[start.start():end.end()]
+
+
+class SoupNode:
+    """BeautifulSoup 节点"""
+
+    def __init__(self, tag):
+        self._tag = tag
+
+    @property
+    def tag(self) -> str:
+        return self._tag.name
+
+    @property
+    def parent(self) -> Optional['SoupNode']:
+        parent = self._tag.parent
+        return SoupNode(parent) if parent is not None else None
+
+    def get_text(self, strip: bool = False) -> str:
+        return self._tag.get_text(strip=strip)
+
+    def get(self, name: str, default=None):
+        return self._tag.get(name, default)
+
+    def find_all(self, name: Optional[TagNames] = None, **attrs: AttrMatch) -> List['SoupNode']:
+        names = list(_as_names(name)) if name is not None else True
+        return [SoupNode(tag) for tag in self._tag.find_all(names, attrs=attrs)]
+
+    def find_parent(self, name: str) -> Optional['SoupNode']:
+        parent = self._tag.find_parent(name)
+        return SoupNode(parent) if parent is not None else None
+
+    def find_next_sibling(self) -> Optional['SoupNode']:
+        sibling = self._tag.find_next_sibling()
+        return SoupNode(sibling) if sibling is not None else None
+
+    def find_next_sibling_string(self) -> Optional[str]:
+        """之后的第一个兄弟文本节点（包括注释）"""
+        string = self._tag.find_next_sibling(string=True)
+        return str(string) if string is not None else None
+
+    def find_strings(self, pattern: Pattern) -> List[Tuple[str, 'SoupNode']]:
+        """
+        查找匹配正则的文本节点（包括注释和脚本内容）
+
+        Returns:
+            [(文本, 文本所在的元素), ...]
+        """
+        return [
+            (str(string), SoupNode(string.parent))
+            for string in self._tag.find_all(string=pattern)
+        ]
+
+
+class LxmlNode:
+    """lxml 元素节点"""
+
+    def __init__(self, element):
+        self._element = element
+
+    @property
+    def tag(self) -> str:
+        return self._element.tag
+
+    @property
+    def parent(self) -> Optional['LxmlNode']:
+        parent = self._element.getparent()
+        return LxmlNode(parent) if parent is not None else None
+
+    def _roots(self) -> list:
+        """查找的起点元素"""
+        return [self._element]
+
+    def get_text(self, strip: bool = False) -> str:
+        return lxml_get_text(self._element, strip=strip)
+
+    def get(self, name: str, default=None):
+        return self._element.get(name, default)
+
+    def find_all(self, name: Optional[TagNames] = None, **attrs: AttrMatch) -> List['LxmlNode']:
+        names = _as_names(name) or ()
+        found = []
+        for root in self._roots():
+            # 与 BeautifulSoup 一致: 只查找后代,不包含自身
+            for element in root.iterdescendants(*names):
+                if not isinstance(element.tag, str):
+                    continue
+                if all(_attr_matches(element.get(key), value) for key, value in attrs.items()):
+                    found.append(LxmlNode(element))
+        return found
+
+    def find_parent(self, name: str) -> Optional['LxmlNode']:
+        parent = next(self._element.iterancestors(name), None)
+        return LxmlNode(parent) if parent is not None else None
+
+    def find_next_sibling(self) -> Optional['LxmlNode']:
+        sibling = lxml_next_sibling(self._element)
+        return LxmlNode(sibling) if sibling is not None else None
+
+    def find_next_sibling_string(self) -> Optional[str]:
+        """之后的第一个兄弟文本节点（包括注释）"""
+        element = self._element
+        while True:
+            if element.tail:
+                return element.tail
+            element = element.getnext()
+            if element is None:
+                return None
+            if not isinstance(element.tag, str):
+                return element.text or ''
+
+    def find_strings(self, pattern: Pattern) -> List[Tuple[str, 'LxmlNode']]:
+        """
+        查找匹配正则的文本节点（包括注释和脚本内容）,按文档顺序返回
+
+        Returns:
+            [(文本, 文本所在的元素), ...]
+        """
+        found = []
+
+        def match(text: Optional[str], owner):
+            if text and owner is not None and pattern.search(text):
+                found.append((text, LxmlNode(owner)))
+
+        for root in self._roots():
+            for event, element in etree.iterwalk(root, events=('start', 'end', 'comment', 'pi')):
+                if event == 'start':
+                    match(element.text, element)
+                elif event == 'end':
+                    # 起点元素之后的文本不属于查找范围
+                    if element is not root:
+                        match(element.tail, element.getparent())
+                else:
+                    # 注释和处理指令: 内容与其后的文本都属于父元素
+                    match(element.text, element.getparent())
+                    match(element.tail, element.getparent())
+        return found
+
+
+class LxmlRegionNode(LxmlNode):
+    """
+    lxml 文档根节点
+
+    查找范围是若干区域元素（包括元素本身）: 完整文档时为 <html>,
+    受限解析时为最外层的区域元素（对应 BeautifulSoup 的 parse_only）。
+    """
+
+    def __init__(self, element, regions: list, complete: bool = True):
+        super().__init__(element)
+        self._regions = regions
+        self.complete = complete  # 是否由完整页面构建（受限解析时只解析区域片段）
+
+    def _roots(self) -> list:
+        return self._regions
+
+    def whole(self) -> 'LxmlRegionNode':
+        """同一棵树上以整棵树为查找范围的根节点"""
+        return LxmlRegionNode(self._element, [self._element], self.complete)
+
+    def find_all(self, name: Optional[TagNames] = None, **attrs: AttrMatch) -> List[LxmlNode]:
+        # 区域元素本身也属于文档,需要参与匹配
+        names = _as_names(name)
+        found = []
+        for region in self._regions:
+            if (names is None or region.tag in names) and \
+                    all(_attr_matches(region.get(key), value) for key, value in attrs.items()):
+                found.append(LxmlNode(region))
+            found.extend(LxmlNode(region).find_all(name, **attrs))
+        return found
+
+
+class SoupBackend:
+    """BeautifulSoup 后端"""
+
+    name = 'beautifulsoup'
+
+    def parse(self, html: Union[str, bytes], only: Optional[List[str]] = None,
+              encoding: Optional[str] = None) -> SoupNode:
+        """
+        解析HTML
+
+        Args:
+            html: HTML内容（str 或响应原始字节）
+            only: 只为这些标签及其子树构建节点
+            encoding: 响应头声明的字符编码,未声明时使用页面 <meta> 声明的编码,默认 UTF-8
+
+        Returns:
+            文档根节点
+        """
+        parse_only = SoupStrainer(only) if only else None
+        return SoupNode(make_soup(html, encoding, parse_only=parse_only))
+
+    def expand(self, document: SoupNode, html: Union[str, bytes],
+               encoding: Optional[str] = None) -> SoupNode:
+        """
+        受限解析的文档扩大为完整文档
+
+        SoupStrainer 没有为区域外的内容构建节点,需要重新解析完整页面。
+        """
+        return self.parse(html, encoding=encoding)
+
+
+class LxmlBackend:
+    """lxml 后端"""
+
+    name = 'lxml'
+
+    def parse(self, html: Union[str, bytes], only: Optional[List[str]] = None,
+              encoding: Optional[str] = None) -> LxmlNode:
+        """
+        解析HTML
+
+        指定 only 时只解析原始内容中第一个区域开始标签到最后一个区域结束标签之间的片段
+        （导航、侧栏、脚本和页脚等区域外的内容不进入建树）,查找范围为片段中最外层的区域元素
+        及其子树,结果与 BeautifulSoup 的 parse_only 一致; 页面中没有区域标签时不构建树。
+
+        Args:
+            html: HTML内容（str 或响应原始字节）
+            only: 只解析这些标签及其子树
+            encoding: 响应头声明的字符编码,未声明时使用页面 <meta> 声明的编码,默认 UTF-8
+
+        Returns:
+            文档根节点
+        """
+        if only:
+            if isinstance(html, bytes):
+                # 片段中没有 <meta> 编码声明,先按完整页面确定编码
+                encoding = resolve_html_encoding(html, encoding)
+            fragment = region_slice(html, only)
+            if fragment is None:
+                return LxmlRegionNode(etree.Element('html'), [], complete=False)
+            root = parse_html_tree(fragment, encoding)
+            if root is None:
+                return LxmlRegionNode(etree.Element('html'), [], complete=False)
+            regions = [
+                element for element in root.iter(*only)
+                if next(element.iterancestors(*only), None) is None
+            ]
+            return LxmlRegionNode(root, regions, complete=False)
+
+        root = parse_html_tree(html, encoding)
+        if root is None:
+            return LxmlRegionNode(etree.Element('html'), [])
+        return LxmlRegionNode(root, [root])
+
+    def expand(self, document: LxmlRegionNode, html: Union[str, bytes],
+               encoding: Optional[str] = None) -> LxmlRegionNode:
+        """
+        受限解析的文档扩大为完整文档
+
+        受限解析只构建了区域片段的树,需要重新解析完整页面; 已是完整页面的树时直接扩大查找范围。
+        """
+        if document.complete:
+            return document.whole()
+        return self.parse(html, encoding=encoding)
+
+
+def make_soup(html: Union[str, bytes], encoding: Optional[str] = None, **kwargs) -> BeautifulSoup:
+    """
+    创建 BeautifulSoup 文档
+
+    字节内容直接按 encoding 解码（未声明时使用页面 <meta> 声明的编码,默认 UTF-8）,
+    不经过 BeautifulSoup 对整个页面的编码探测。
+
+    Args:
+        html: HTML内容（str 或响应原始字节）
+        encoding: 字节内容的字符编码
+        **kwargs: 传给 BeautifulSoup 的其他参数（如 parse_only）
+
+    Returns:
+        BeautifulSoup 文档
+    """
+    if isinstance(html, bytes):
+        kwargs['from_encoding'] = resolve_html_encoding(html, encoding)
+    return BeautifulSoup(html, 'lxml', **kwargs)
+
+
+_BACKENDS = {
+    'lxml': LxmlBackend,
+    'beautifulsoup': SoupBackend,
+}
+
+_backend_instances: Dict[str, object] = {}
+
+
+def get_parser_backend(name: Optional[str] = None):
+    """
+    获取HTML解析后端
+
+    Args:
+        name: 'lxml' 或 'beautifulsoup',默认使用 HTML_PARSER_BACKEND
+
+    Returns:
+        解析后端实例
+    """
+    name = (name or HTML_PARSER_BACKEND).lower()
+    if name not in _BACKENDS:
+        raise ValueError(f"不支持的HTML解析后端: {name},可选: {', '.join(_BACKENDS)}")
+
+    if name not in _backend_instances:
+        _backend_instances[name] = _BACKENDS[name]()
+    return _backend_instances[name]
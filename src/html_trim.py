@@ -0,0 +1,162 @@
+"""
+HTML区域预裁剪模块
+
+解析前按页面类型配置的起止标记截取需要的区域,导航、脚本和页脚不再进入解析器:
+- 区域从第一个起始标记所在的标签开始,到最后一个结束标记结束
+- 任一标记缺失时返回完整页面
+- 裁剪后的解析结果不完整时重新解析完整页面: 由解析器判断,只检查裁剪可能丢掉的内容
+  (如 HSCIQ 的商品名称),申报要素等可能本来为空的字段不参与判断
+- 按页面类型统计裁剪成功率、重新解析次数和裁剪前后的字节数; 解析进程池的子进程中的统计
+  随解析结果返回,在父进程中合并 (take_trim_stats / merge_trim_stats)
+
+标记只包含 ASCII 字符,可以直接在原始字节 (UTF-8/GBK 等) 上查找。
+
+创建日期: 2026-10-16
+"""
+import threading
+from typing import Callable, Dict, Union
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import HTML_TRIM_ENABLED, HTML_TRIM_MARKERS
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _page_stats(page_type: str) -> Dict[str, int]:
+    """页面类型的统计（调用方持有锁）"""
+    return _stats.setdefault(page_type, {
+        'trimmed': 0,
+        'fallback': 0,
+        'reparsed': 0,
+        'bytes_before': 0,
+        'bytes_after': 0
+    })
+
+
+def _record(page_type: str, trimmed: bool, size_before: int, size_after: int):
+    """记录一次裁剪结果"""
+    with _stats_lock:
+        stats = _page_stats(page_type)
+        stats['trimmed' if trimmed else 'fallback'] += 1
+        stats['bytes_before'] += size_before
+        stats['bytes_after'] += size_after
+
+
+def trim_html(html: Union[str, bytes], page_type: str) -> Union[str, bytes]:
+    """
+    截取页面中需要解析的区域
+
+    Args:
+        html: 页面内容（str 或响应原始字节）
+        page_type: 页面类型,对应 HTML_TRIM_MARKERS 的键（如 'hsciq_detail'）
+
+    Returns:
+        裁剪后的内容（与输入类型相同）,未启用或标记缺失时返回原内容
+    """
+    markers = HTML_TRIM_MARKERS.get(page_type)
+    if not HTML_TRIM_ENABLED or not markers:
+        return html
+
+    start_marker, end_marker = markers
+    if isinstance(html, bytes):
+        start_marker, end_marker, tag_open = start_marker.encode(), end_marker.encode(), b'<'
+    else:
+        tag_open = '<'
+
+    start = html.find(start_marker)
+    end = html.rfind(end_marker)
+    if start < 0 or end < start:
+        _record(page_type, False, len(html), len(html))
+        logger.debug(f"{page_type} 页面未找到裁剪标记,解析完整页面")
+        return html
+
+    # 标记不以 '<' 开头时（如 class="..."）从所在标签的开头截取
+    if not start_marker.startswith(tag_open):
+        start = max(html.rfind(tag_open, 0, start), 0)
+
+    trimmed = html[start:end + len(end_marker)]
+    _record(page_type, True, len(html), len(trimmed))
+    return trimmed
+
+
+def parse_trimmed(html: Union[str, bytes], page_type: str,
+                  parse: Callable[[Union[str, bytes]], Dict],
+                  is_complete: Callable[[Dict], bool]) -> Dict:
+    """
+    裁剪页面后解析,结果不完整时重新解析完整页面
+
+    标记位置与页面结构不符时（如需要的表格在起始标记之前）,裁剪会丢掉内容;
+    此时使用完整页面的解析结果。
+
+    Args:
+        html: 页面内容（str 或响应原始字节）
+        page_type: 页面类型,对应 HTML_TRIM_MARKERS 的键
+        parse: 解析函数,接收页面内容,返回结果字典
+        is_complete: 判断裁剪后的解析结果是否完整（只检查裁剪可能丢掉、完整页面中一定存在的内容）
+
+    Returns:
+        解析结果字典
+    """
+    trimmed = trim_html(html, page_type)
+    result = parse(trimmed)
+    if trimmed is html or is_complete(result):
+        return result
+
+    with _stats_lock:
+        _page_stats(page_type)['reparsed'] += 1
+    logger.debug(f"{page_type} 裁剪后的结果缺少必需字段,重新解析完整页面")
+    return parse(html)
+
+
+def take_trim_stats() -> Dict[str, Dict[str, int]]:
+    """
+    取出并清空当前进程的统计计数（解析进程池的子进程随解析结果返回给父进程）
+
+    Returns:
+        {页面类型: {trimmed, fallback, reparsed, bytes_before, bytes_after}}
+    """
+    global _stats
+    with _stats_lock:
+        counts, _stats = _stats, {}
+    return counts
+
+
+def merge_trim_stats(counts: Dict[str, Dict[str, int]]):
+    """
+    合并其他进程的统计计数
+
+    Args:
+        counts: take_trim_stats() 的返回值
+    """
+    if not counts:
+        return
+    with _stats_lock:
+        for page_type, page_counts in counts.items():
+            stats = _page_stats(page_type)
+            for key, value in page_counts.items():
+                stats[key] += value
+
+
+def get_trim_stats() -> Dict[str, Dict[str, float]]:
+    """
+    获取裁剪统计
+
+    Returns:
+        {页面类型: {trimmed, fallback, reparsed, success_rate, bytes_before, bytes_after, size_ratio}}
+    """
+    with _stats_lock:
+        snapshot = {page_type: dict(stats) for page_type, stats in _stats.items()}
+
+    for stats in snapshot.values():
+        total = stats['trimmed'] + stats['fallback']
+        stats['success_rate'] = stats['trimmed'] / total if total else 0.0
+        stats['size_ratio'] = stats['bytes_after'] / stats['bytes_before'] if stats['bytes_before'] else 1.0
+
+    return snapshot
@@ -0,0 +1,330 @@
+"""
+HTTP页面磁盘缓存模块
+
+在 AsyncHTTPClient 之下缓存 GET 响应,跨进程和重启复用:
+- 缓存键: 请求方法 + URL + 查询参数
+- 有效期: 按 HTTP_CACHE_TTLS 中的URL规则区分详情页/搜索页
+- 过期后如果上游提供了 ETag/Last-Modified,发送条件请求重新验证,
+  收到 304 时直接续期并复用已缓存的页面
+- 写入: 只存储爬虫解析确认内容有效的 200 响应 (AsyncHTTPClient.cache_response),
+  拦截页、验证码页等即使返回 200 也不会被缓存
+- 清理: 打开缓存时和之后写入时（每小时最多一次）删除过期条目,没有验证头的条目过期即删除,
+  有验证头的条目过期后再保留 HTTP_CACHE_STALE_RETENTION 用于条件请求
+- 存储: SQLite 单文件 (WAL 模式,支持多个进程同时读写),
+  AsyncHTTPClient 在线程池中调用本模块的读写方法
+
+创建日期: 2026-10-16
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    HTTP_CACHE_ENABLED, HTTP_CACHE_PATH,
+    HTTP_CACHE_TTLS, HTTP_CACHE_DEFAULT_TTL, HTTP_CACHE_STALE_RETENTION
+)
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+# 响应体已解压后存储,这些头不能原样回放
+_SKIPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+# 写入时清理过期条目的最短间隔（秒）
+_PURGE_INTERVAL = 3600
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目"""
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    etag: str
+    last_modified: str
+    expires_at: float
+
+    @property
+    def is_fresh(self) -> bool:
+        """是否仍在有效期内"""
+        return time.time() < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """重新验证时使用的条件请求头"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        """还原为 httpx.Response,调用方无需区分是否来自缓存"""
+        response = httpx.Response(
+            status_code=self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=request
+        )
+        response.extensions['from_cache'] = True
+        return response
+
+
+class HTTPCache:
+    """基于 SQLite 的HTTP响应缓存"""
+
+    def __init__(
+        self,
+        path: str = HTTP_CACHE_PATH,
+        ttls: Optional[List[Tuple[str, int]]] = None,
+        default_ttl: int = HTTP_CACHE_DEFAULT_TTL,
+        stale_retention: int = HTTP_CACHE_STALE_RETENTION
+    ):
+        """
+        初始化缓存
+
+        Args:
+            path: SQLite 文件路径
+            ttls: [(URL正则, 有效期秒数), ...],按顺序匹配
+            default_ttl: 未匹配任何规则时的有效期（秒）
+            stale_retention: 有验证头的条目过期后保留的时长（秒）
+        """
+        self.path = path
+        self.default_ttl = default_ttl
+        self.stale_retention = stale_retention
+        self._ttl_rules = [(re.compile(pattern), ttl) for pattern, ttl in (HTTP_CACHE_TTLS if ttls is None else ttls)]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.purged = 0
+        self._next_purge = 0.0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                content BLOB NOT NULL,
+                etag TEXT NOT NULL DEFAULT '',
+                last_modified TEXT NOT NULL DEFAULT '',
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_expires_at ON responses (expires_at)")
+        self._conn.commit()
+        logger.info(f"HTTP页面缓存已启用: {path}")
+        self.purge_expired()
+
+    @staticmethod
+    def make_key(method: str, url: str, params: Optional[Dict] = None) -> str:
+        """
+        生成缓存键
+
+        Args:
+            method: 请求方法
+            url: 请求URL
+            params: 查询参数
+
+        Returns:
+            缓存键（SHA1 十六进制）
+        """
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        raw = f"{method.upper()} {url}?{query}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def ttl_for(self, url: str) -> int:
+        """返回URL对应的缓存有效期（秒）"""
+        for pattern, ttl in self._ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        读取缓存条目（包含已过期条目,用于条件请求）
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存条目,不存在返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status_code, headers, content, etag, last_modified, expires_at "
+                "FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        url, status_code, headers, content, etag, last_modified, expires_at = row
+        return CacheEntry(
+            url=url,
+            status_code=status_code,
+            headers=json.loads(headers),
+            content=content,
+            etag=etag,
+            last_modified=last_modified,
+            expires_at=expires_at
+        )
+
+    def put(self, key: str, response: httpx.Response):
+        """
+        存入内容已确认有效的响应
+
+        Args:
+            key: 缓存键
+            response: 已读取完毕的响应对象
+        """
+        url = str(response.url)
+        headers = {
+            name: value for name, value in response.headers.items()
+            if name.lower() not in _SKIPPED_HEADERS
+        }
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, url, status_code, headers, content, etag, last_modified, stored_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, url, response.status_code, json.dumps(headers),
+                    response.content,
+                    response.headers.get('etag', ''),
+                    response.headers.get('last-modified', ''),
+                    now, now + self.ttl_for(url)
+                )
+            )
+            self._conn.commit()
+
+        if now >= self._next_purge:
+            self.purge_expired()
+
+    def refresh(self, key: str, entry: CacheEntry, response: httpx.Response):
+        """
+        收到 304 后为条目续期,并更新上游返回的新验证头
+
+        Args:
+            key: 缓存键
+            entry: 原缓存条目
+            response: 304 响应
+        """
+        entry.etag = response.headers.get('etag', entry.etag)
+        entry.last_modified = response.headers.get('last-modified', entry.last_modified)
+        entry.expires_at = time.time() + self.ttl_for(entry.url)
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET etag = ?, last_modified = ?, stored_at = ?, expires_at = ? "
+                "WHERE key = ?",
+                (entry.etag, entry.last_modified, time.time(), entry.expires_at, key)
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """
+        删除过期条目: 没有验证头的条目过期即删除（无法条件请求,只能重新下载）,
+        有 ETag/Last-Modified 的条目过期超过 stale_retention 后删除
+
+        Returns:
+            删除的条目数
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE expires_at < ? "
+                "OR (expires_at < ? AND etag = '' AND last_modified = '')",
+                (now - self.stale_retention, now)
+            )
+            self._conn.commit()
+            self._next_purge = now + _PURGE_INTERVAL
+            self.purged += cursor.rowcount
+
+        if cursor.rowcount:
+            logger.info(f"HTTP页面缓存清理过期条目: {cursor.rowcount} 个")
+        return cursor.rowcount
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+        logger.info("HTTP页面缓存已清空")
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            统计字典
+        """
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+        return {
+            'size': size,
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'purged': self.purged
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+# 进程内共享的缓存实例
+_global_cache: Optional[HTTPCache] = None
+_global_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HTTPCache]:
+    """
+    获取全局HTTP页面缓存
+
+    Returns:
+        HTTPCache 实例,未启用缓存时返回None
+    """
+    global _global_cache
+
+    if not HTTP_CACHE_ENABLED:
+        return None
+
+    with _global_cache_lock:
+        if _global_cache is None:
+            try:
+                _global_cache = HTTPCache()
+            except Exception as e:
+                logger.error(f"HTTP页面缓存初始化失败,将直接请求网络: {e}")
+                return None
+
+    return _global_cache
@@ -0,0 +1,344 @@
+"""
+异步HTTP客户端模块
+
+基于 httpx.AsyncClient 为两个爬虫提供 asyncio 原生的请求能力:
+- 每个事件循环持有独立的 AsyncClient (连接池不能跨事件循环复用)
+- 同步接口通过进程内共享的后台事件循环执行协程,
+  即使调用方自身运行在事件循环中 (如 MCP 同步工具) 也不会冲突
+- 请求按站点令牌桶限速 (见 rate_limiter.py)
+- GET 响应由调用方确认内容有效后写入磁盘页面缓存,有效期内不访问网络 (见 http_cache.py),
+  缓存的 SQLite 读写在线程池中执行,不阻塞事件循环
+- 连接池大小与并发配置挂钩,可选 HTTP/2 多路复用,创建时预热连接
+- 按站点记住响应的字符编码,解析器直接解析原始字节 (见 encoding_for)
+
+创建日期: 2026-10-16
+"""
+import asyncio
+import functools
+import importlib.util
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+import sys
+import os
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    REQUEST_TIMEOUT, BATCH_MAX_WORKERS,
+    HTTP_POOL_SIZE, HTTP_KEEPALIVE_EXPIRY, HTTP2_ENABLED,
+    HTTP_PREWARM_CONNECTIONS
+)
+from src.utils import setup_logger
+from src.rate_limiter import get_rate_limiter
+from src.http_cache import HTTPCache, get_http_cache
+
+logger = setup_logger(__name__)
+
+T = TypeVar('T')
+
+# 同步包装器共用的后台事件循环
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """获取（必要时启动）后台事件循环线程"""
+    global _background_loop
+
+    with _background_lock:
+        if _background_loop is None or _background_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever,
+                name='hs-code-async-loop',
+                daemon=True
+            )
+            thread.start()
+            _background_loop = loop
+            logger.debug("后台事件循环已启动")
+
+    return _background_loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    在后台事件循环中执行协程并阻塞等待结果
+
+    同步方法（如 query_by_product_name）均通过此函数调用对应的异步实现。
+
+    Args:
+        coro: 待执行的协程
+
+    Returns:
+        协程的返回值
+    """
+    loop = _get_background_loop()
+
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+
+    if running is loop:
+        coro.close()
+        raise RuntimeError("不能在后台事件循环内部调用同步接口,请直接 await 异步方法")
+
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def pool_size_for(parallel_per_query: int) -> int:
+    """
+    计算单个站点的连接池大小
+
+    Args:
+        parallel_per_query: 单次查询内同时发往该站点的最大请求数
+
+    Returns:
+        HTTP_POOL_SIZE 配置值,未配置时为 BATCH_MAX_WORKERS × parallel_per_query
+    """
+    return HTTP_POOL_SIZE or BATCH_MAX_WORKERS * max(1, parallel_per_query)
+
+
+async def _in_thread(func: Callable[..., Any], *args) -> Any:
+    """在默认线程池中执行阻塞调用（页面缓存的 SQLite 读写）"""
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+
+
+def _http2_available() -> bool:
+    """HTTP/2 需要可选依赖 h2"""
+    return importlib.util.find_spec('h2') is not None
+
+
+class AsyncHTTPClient:
+    """按事件循环管理 httpx.AsyncClient 的异步HTTP客户端"""
+
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = REQUEST_TIMEOUT,
+        cache: Optional[HTTPCache] = None,
+        use_cache: bool = True,
+        pool_size: Optional[int] = None,
+        http2: bool = HTTP2_ENABLED,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        初始化客户端
+
+        Args:
+            headers: 默认请求头
+            timeout: 请求超时时间（秒）
+            cache: 页面缓存实例,默认使用全局缓存 get_http_cache()
+            use_cache: 是否启用页面缓存
+            pool_size: 连接池最大连接数（同时也是保持的空闲连接数）,默认 pool_size_for(1)
+            http2: 是否启用 HTTP/2（未安装 h2 时自动回退到 HTTP/1.1）
+            transport: 自定义 httpx 传输层（测试时使用 httpx.MockTransport）
+        """
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.cache = (cache or get_http_cache()) if use_cache else None
+        self.pool_size = pool_size or pool_size_for(1)
+        self.limits = httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_size,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        )
+
+        if http2 and not _http2_available():
+            logger.warning("未安装 h2,HTTP/2 不可用,使用 HTTP/1.1 (pip install httpx[http2])")
+            http2 = False
+        self.http2 = http2
+        self.transport = transport
+
+        self._prewarm_tasks = set()
+        self._clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]' = \
+            weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取当前事件循环对应的 AsyncClient（延迟创建）"""
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    headers=self.headers,
+                    timeout=self.timeout,
+                    limits=self.limits,
+                    http2=self.http2,
+                    transport=self.transport,
+                    follow_redirects=True
+                )
+                self._clients[loop] = client
+                logger.debug(f"为事件循环 {id(loop)} 创建 AsyncClient")
+
+        return client
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        发送HTTP请求
+
+        GET 请求优先读取页面缓存: 有效期内直接返回缓存; 过期时带上
+        If-None-Match/If-Modified-Since 重新验证,304 则续期复用。
+        真正发往网络的请求先从目标站点的令牌桶获取令牌,速率预算用完时才会等待。
+
+        200 响应不会自动写入缓存（拦截页、验证码页也可能返回 200）,
+        调用方解析确认内容有效后调用 cache_response 写入。
+
+        Args:
+            method: 请求方法
+            url: 请求URL
+            **kwargs: 传递给 httpx 的其他参数 (params, data, headers 等)
+
+        Returns:
+            响应对象
+        """
+        client = self._get_client()
+
+        cache = self.cache if method.upper() == 'GET' else None
+        cache_key = None
+        entry = None
+
+        if cache is not None:
+            cache_key = cache.make_key(method, url, kwargs.get('params'))
+            entry = await _in_thread(cache.get, cache_key)
+
+            if entry is not None and entry.is_fresh:
+                cache.hits += 1
+                logger.debug(f"页面缓存命中: {url}")
+                return entry.to_response(client.build_request(method, url, params=kwargs.get('params')))
+
+            if entry is not None:
+                kwargs['headers'] = {**entry.conditional_headers(), **(kwargs.get('headers') or {})}
+
+        waited = await get_rate_limiter(url).acquire()
+        if waited > 0:
+            logger.debug(f"限速等待 {waited:.2f}秒: {url}")
+
+        response = await client.request(method, url, **kwargs)
+
+        if cache is not None:
+            if entry is not None and response.status_code == 304:
+                cache.revalidated += 1
+                await _in_thread(cache.refresh, cache_key, entry, response)
+                logger.debug(f"页面缓存重新验证通过: {url}")
+                return entry.to_response(response.request)
+
+            cache.misses += 1
+            if response.status_code == 200:
+                response.extensions['cache_key'] = cache_key
+
+        return response
+
+    async def cache_response(self, response: httpx.Response) -> bool:
+        """
+        把确认内容有效的响应写入页面缓存
+
+        只有经 request 从网络获取的 200 GET 响应可以写入; 来自缓存的响应、
+        未启用缓存时直接跳过。
+
+        Args:
+            response: request 返回的响应
+
+        Returns:
+            是否写入了缓存
+        """
+        cache_key = response.extensions.pop('cache_key', None)
+        if self.cache is None or cache_key is None:
+            return False
+
+        await _in_thread(self.cache.put, cache_key, response)
+        return True
+
+    def encoding_for(self, response: httpx.Response) -> Optional[str]:
+        """
+        获取响应头声明的字符编码,供解析器直接解析 response.content 字节
+        
+        只返回 Content-Type 声明的 charset (缓存的响应保存了响应头,同样适用);
+        未声明时返回 None,由解析器使用页面 <meta> 声明的编码,默认 UTF-8。
+        不沿用同一站点其他页面的编码,避免覆盖页面自身的声明。
+        
+        Args:
+            response: 响应对象
+            
+        Returns:
+            字符编码名称,未声明时为 None
+        """
+        return response.charset_encoding
+
+    async def prewarm(self, url: str, connections: int = HTTP_PREWARM_CONNECTIONS):
+        """
+        预热连接: 提前完成 DNS 解析和 TLS 握手,使连接进入连接池
+
+        发送不经过限速和缓存的 HEAD 请求,失败只记录日志。
+
+        Args:
+            url: 站点地址
+            connections: 预热的连接数（HTTP/2 下一个连接即可多路复用）
+        """
+        client = self._get_client()
+        count = 1 if self.http2 else max(1, min(connections, self.pool_size))
+
+        async def warm_one():
+            try:
+                await client.head(url)
+            except httpx.HTTPError as e:
+                logger.debug(f"连接预热失败: {url}, {e}")
+
+        await asyncio.gather(*(warm_one() for _ in range(count)))
+        logger.debug(f"已预热 {count} 个连接: {url}")
+
+    def start_prewarm(self, url: str):
+        """
+        在后台预热连接,不阻塞调用方
+
+        当前线程有运行中的事件循环时（如 API 服务、MCP 服务器）在该循环中预热,
+        否则在同步接口使用的后台事件循环中预热。
+
+        Args:
+            url: 站点地址
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            task = loop.create_task(self.prewarm(url))
+            self._prewarm_tasks.add(task)
+            task.add_done_callback(self._prewarm_tasks.discard)
+        else:
+            asyncio.run_coroutine_threadsafe(self.prewarm(url), _get_background_loop())
+
+    async def aclose(self):
+        """关闭当前事件循环对应的 AsyncClient"""
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            client = self._clients.pop(loop, None)
+
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        """关闭所有 AsyncClient（同步接口）"""
+        with self._lock:
+            clients = list(self._clients.items())
+            self._clients.clear()
+
+        for loop, client in clients:
+            if loop.is_closed() or client.is_closed:
+                continue
+            try:
+                if loop is _background_loop:
+                    run_sync(client.aclose())
+                elif not loop.is_running():
+                    loop.run_until_complete(client.aclose())
+                else:
+                    asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            except Exception as e:
+                logger.warning(f"关闭 AsyncClient 失败: {e}")
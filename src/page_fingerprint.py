@@ -0,0 +1,94 @@
+"""
+页面类型识别模块
+
+解析前在原始内容上识别无结果的搜索页,直接返回空结果,
+不再构建文档树,也不再执行回退的完整解析和文本正则扫描。
+
+识别规则（页面中存在结果区域 SEARCH_RESULT_REGION_TAGS,如结果表格时一律照常解析）:
+- 结构: 页面中没有任何指向详情页的链接（DETAIL_LINK_PATTERNS）——解析器只能从详情链接
+  或结果表格中提取候选,两者都没有时解析结果必然为空（文本扫描只会误取页面中的其他数字）,不需要任何文案
+- 文案: 包含 SEARCH_EMPTY_MARKERS 中配置的无结果文案（可选,只应填写从真实页面核对过的文字;
+  命中时无结果页面侧栏中的编码链接也不会被误当作搜索结果）
+
+创建日期: 2026-10-16
+"""
+import re
+from functools import lru_cache
+from typing import Optional, Pattern, Tuple, Union
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import SEARCH_EMPTY_MARKERS, SEARCH_RESULT_REGION_TAGS
+from src.utils import resolve_html_encoding
+
+# 各类搜索页中指向详情页的链接（与解析器提取候选使用的链接一致）
+DETAIL_LINK_PATTERNS = {
+    'i5a6_search': r'/hscode/detail/\d',
+    'hsciq_search': r'/HSCN/Code/\d',
+}
+
+
+@lru_cache(maxsize=32)
+def _encoded_markers(page_type: str, encoding: str) -> Tuple[bytes, ...]:
+    """按页面编码编码后的文案（中文文案在 UTF-8 和 GBK 下字节不同）"""
+    markers = []
+    for marker in SEARCH_EMPTY_MARKERS.get(page_type, ()):
+        try:
+            markers.append(marker.encode(encoding))
+        except (LookupError, UnicodeEncodeError):
+            continue
+    return tuple(markers)
+
+
+@lru_cache(maxsize=2)
+def _region_pattern(as_bytes: bool) -> Optional[Pattern]:
+    """结果区域开始标签（如 <table>）的正则,未配置结果区域时为 None"""
+    if not SEARCH_RESULT_REGION_TAGS:
+        return None
+    pattern = '<(?:%s)[\\s>]' % '|'.join(re.escape(tag) for tag in SEARCH_RESULT_REGION_TAGS)
+    return re.compile(pattern.encode('ascii') if as_bytes else pattern, re.IGNORECASE)
+
+
+@lru_cache(maxsize=8)
+def _detail_link_pattern(page_type: str, as_bytes: bool) -> Optional[Pattern]:
+    """详情链接的正则,未知页面类型时为 None"""
+    pattern = DETAIL_LINK_PATTERNS.get(page_type)
+    if pattern is None:
+        return None
+    return re.compile(pattern.encode('ascii') if as_bytes else pattern)
+
+
+def is_empty_result_page(html: Union[str, bytes], page_type: str,
+                         encoding: Optional[str] = None) -> bool:
+    """
+    判断搜索页是否为无结果页面
+
+    Args:
+        html: 页面内容（str 或响应原始字节）
+        page_type: 页面类型,对应 SEARCH_EMPTY_MARKERS 的键（如 'i5a6_search'）
+        encoding: 响应头声明的字符编码,未声明时使用页面 <meta> 声明的编码,默认 UTF-8
+
+    Returns:
+        没有结果区域,且没有详情链接或包含任一无结果文案时返回 True
+    """
+    as_bytes = isinstance(html, bytes)
+
+    # 页面中有结果区域时可能仍有结果,交给解析器处理
+    region = _region_pattern(as_bytes)
+    if region is not None and region.search(html) is not None:
+        return False
+
+    # 没有结果区域也没有详情链接: 解析结果必然为空（未配置结果区域时无法排除表格中的编码,不按结构判断）
+    links = _detail_link_pattern(page_type, as_bytes)
+    if region is not None and links is not None and links.search(html) is None:
+        return True
+
+    if not SEARCH_EMPTY_MARKERS.get(page_type):
+        return False
+    if as_bytes:
+        markers = _encoded_markers(page_type, resolve_html_encoding(html, encoding).lower())
+    else:
+        markers = SEARCH_EMPTY_MARKERS.get(page_type, ())
+    return any(marker in html for marker in markers)
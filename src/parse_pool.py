@@ -0,0 +1,167 @@
+"""
+HTML解析进程池模块
+
+API 服务中多个请求并发时,HTML解析是纯CPU计算,在事件循环线程中执行会阻塞
+其他所有请求,且受 GIL 限制只能使用一个核心。解析服务把解析交给子进程:
+- 输入响应原始字节和编码,输出解析后的记录（与解析器的返回值相同,见 src/records.py）
+- 两个站点的爬虫都通过 get_parse_service().parse(...) 解析页面
+- 未启动进程池时（命令行、MCP 服务）直接在当前线程解析,行为与之前一致
+- 进程池异常退出时本次改为在当前线程解析,并重建进程池（多次异常后停用）
+- 子进程中的详情页裁剪统计随解析结果返回,在父进程中合并（get_trim_stats 反映全部解析）
+
+子进程使用 spawn 方式启动,不继承父进程中的事件循环线程和嵌入模型。
+
+创建日期: 2026-10-16
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import PARSE_POOL_WORKERS
+from src.html_trim import merge_trim_stats, take_trim_stats
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+# 进程池累计异常达到该次数后不再重建,之后一直在当前线程解析
+_MAX_POOL_FAILURES = 3
+
+# 子进程内按 (解析器类, 后端) 复用的解析器实例
+_worker_parsers: Dict[tuple, Any] = {}
+
+
+def _run_parser(parser_class: type, backend: str, method: str, args: tuple, kwargs: dict) -> Tuple[Any, Dict]:
+    """
+    在子进程中执行解析（解析器实例在子进程内创建并复用）
+
+    Returns:
+        (解析结果, 本次解析的裁剪统计计数)
+    """
+    key = (parser_class, backend)
+    parser = _worker_parsers.get(key)
+    if parser is None:
+        parser = _worker_parsers[key] = parser_class(backend=backend)
+    return getattr(parser, method)(*args, **kwargs), take_trim_stats()
+
+
+class ParseService:
+    """HTML解析服务（可选的进程池）"""
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._workers = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'pooled': 0,
+            'inline': 0,
+            'pool_failures': 0
+        }
+
+    @property
+    def running(self) -> bool:
+        """进程池是否已启动"""
+        return self._executor is not None
+
+    def start(self, max_workers: Optional[int] = None):
+        """
+        启动解析进程池
+
+        Args:
+            max_workers: 子进程数量,默认使用 PARSE_POOL_WORKERS（None 表示CPU核心数）
+        """
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._workers = max(1, max_workers or PARSE_POOL_WORKERS or os.cpu_count() or 1)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        logger.info(f"HTML解析进程池已启动,子进程数: {self._workers}")
+
+    def shutdown(self):
+        """关闭解析进程池,之后的解析在当前线程执行"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+            logger.info("HTML解析进程池已关闭")
+
+    def _restart(self, executor: ProcessPoolExecutor, error: Exception):
+        """丢弃已损坏的进程池并重建,异常次数过多时停用"""
+        with self._lock:
+            # 同一进程池上的其他解析请求已经处理过
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self._stats['pool_failures'] += 1
+            failures = self._stats['pool_failures']
+        executor.shutdown(wait=False)
+
+        if failures >= _MAX_POOL_FAILURES:
+            logger.error(f"HTML解析进程池已异常 {failures} 次,停用并改为当前线程解析: {error}")
+            return
+        logger.error(f"HTML解析进程池异常,重建进程池: {error}")
+        self.start(self._workers)
+
+    async def parse(self, parser, method: str, *args, **kwargs) -> Any:
+        """
+        使用解析器的指定方法解析页面
+
+        进程池已启动时在子进程中用同类型、同后端的解析器执行,否则直接调用 parser 的方法。
+
+        Args:
+            parser: 解析器实例（DataParser / HTMLParserHSCIQ）
+            method: 方法名,如 'parse_search_results'、'parse_detail_page'
+            *args, **kwargs: 传给解析方法的参数（页面字节、编码等,需可序列化）
+
+        Returns:
+            解析方法的返回值
+        """
+        executor = self._executor
+        if executor is not None:
+            call = functools.partial(
+                _run_parser, type(parser), parser.backend.name, method, args, kwargs
+            )
+            try:
+                result, trim_stats = await asyncio.get_running_loop().run_in_executor(executor, call)
+                merge_trim_stats(trim_stats)
+                self._stats['pooled'] += 1
+                return result
+            except BrokenProcessPool as e:
+                self._restart(executor, e)
+
+        self._stats['inline'] += 1
+        return getattr(parser, method)(*args, **kwargs)
+
+    def get_stats(self) -> Dict:
+        """
+        获取解析统计
+
+        Returns:
+            {running, workers, pooled, inline, pool_failures}
+        """
+        return {
+            'running': self.running,
+            'workers': self._workers if self.running else 0,
+            **self._stats
+        }
+
+
+_parse_service: Optional[ParseService] = None
+
+
+def get_parse_service() -> ParseService:
+    """获取全局解析服务实例"""
+    global _parse_service
+    if _parse_service is None:
+        _parse_service = ParseService()
+    return _parse_service
@@ -5,44 +5,102 @@ HTML数据解析模块
 - 修复 #001 (2025-11-24): 改进数据解析逻辑和URL处理
   详见: docs/CHANGELOG_001_修复数据解析和URL问题.md
 """
-from bs4 import BeautifulSoup
-from typing import Dict, List, Optional
+from lxml import etree
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import re
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.utils import setup_logger, safe_get_text, clean_text, create_empty_result
+from config.settings import (
+    SEARCH_RESTRICTED_PARSE, SEARCH_RESULT_REGION_TAGS
+)
+from src.utils import (
+    setup_logger, safe_get_text, clean_text, create_empty_result,
+    parse_html_tree, lxml_get_text, resolve_html_encoding
+)
+from src.html_backend import get_parser_backend, make_soup
+from src.html_trim import parse_trimmed
+from src.page_fingerprint import is_empty_result_page
+from src.records import HSRecord, SearchCandidate
 
 logger = setup_logger(__name__)
 
+# 详情页中许可证/检验检疫详情表的表头
+_PERMIT_CODE_PATTERN = re.compile(r'许可证或批文代码')
+_PERMIT_NAME_PATTERN = re.compile(r'许可证或批文名称')
+_INSP_CODE_PATTERN = re.compile(r'检验检疫代码')
+_INSP_NAME_PATTERN = re.compile(r'^名称$')
+
 
 class DataParser:
     """HTML数据解析器"""
     
-    def __init__(self):
-        """初始化解析器"""
+    def __init__(self, backend: Optional[str] = None):
+        """
+        初始化解析器
+        
+        Args:
+            backend: HTML解析后端（'lxml' / 'beautifulsoup'），默认使用 HTML_PARSER_BACKEND；
+                lxml 后端的详情页使用单次遍历实现，beautifulsoup 后端使用原实现（用于调试和对照结果）
+        """
+        self.backend = get_parser_backend(backend)
         logger.info("DataParser 初始化完成")
     
-    def parse_search_results(self, html: str, query: str) -> List[Dict[str, str]]:
+    def parse_search_results(self, html: Union[str, bytes], query: str,
+                             encoding: Optional[str] = None) -> List[SearchCandidate]:
         """
         解析搜索结果页面，提取HS编码和商品信息
         
+        无结果页面（没有结果区域，且没有详情链接或包含 SEARCH_EMPTY_MARKERS 中的文案）直接返回空列表；
+        其他页面先只在结果区域（SEARCH_RESULT_REGION_TAGS）中查找，未找到记录时再查找完整页面；
+        结果区域中找到记录时不再包含区域外（侧栏热门链接等）的编码链接。
+        
         Args:
-            html: HTML内容
+            html: HTML内容（str 或响应原始字节）
             query: 查询关键词
+            encoding: 字节内容的字符编码，默认 UTF-8
             
         Returns:
-            搜索结果列表，每个元素包含 hs_code, product_name, detail_url
+            候选商品列表（SearchCandidate: hs_code, name, url）
+        """
+        if is_empty_result_page(html, 'i5a6_search', encoding):
+            logger.info(f"搜索无结果页面: {query}")
+            return []
+        
+        if SEARCH_RESTRICTED_PARSE:
+            document = self.backend.parse(html, only=SEARCH_RESULT_REGION_TAGS, encoding=encoding)
+            results = self._extract_search_results(document)
+            if results:
+                logger.info(f"从搜索结果中提取到 {len(results)} 条记录")
+                return results
+            # 在同一页面的完整文档中查找 (重新解析完整页面)
+            logger.debug("结果区域中未找到记录，在完整页面中查找")
+            document = self.backend.expand(document, html, encoding)
+        else:
+            document = self.backend.parse(html, encoding=encoding)
+        
+        results = self._extract_search_results(document)
+        logger.info(f"从搜索结果中提取到 {len(results)} 条记录")
+        return results
+    
+    def _extract_search_results(self, document) -> List[SearchCandidate]:
+        """
+        从解析后的文档中提取搜索结果
+        
+        Args:
+            document: 解析后端返回的文档根节点（完整文档或只包含结果区域）
+            
+        Returns:
+            搜索结果列表
         """
-        soup = BeautifulSoup(html, 'lxml')
         results = []
         
         try:
             # 方法1: 查找所有包含HS编码的链接（指向详情页的链接）
             # 排除包含#sbsl（申报实例）的链接
-            detail_links = soup.find_all('a', href=re.compile(r'/hscode/detail/\d+'))
+            detail_links = document.find_all('a', href=re.compile(r'/hscode/detail/\d+'))
             
             for link in detail_links:
                 href = link.get('href', '')
@@ -112,20 +170,15 @@ class DataParser:
                     else:
                         detail_url = f"https://www.i5a6.com/{clean_href}"
                     
-                    results.append({
-                        'hs_code': hs_code,
-                        'product_name': clean_text(product_name),
-                        'detail_url': detail_url
-                    })
+                    results.append(SearchCandidate(hs_code, clean_text(product_name), detail_url))
             
             # 方法2: 如果方法1没找到，尝试查找表格中的HS编码
             if not results:
                 hs_code_pattern = re.compile(r'\d{8,10}')
-                hs_elements = soup.find_all(text=hs_code_pattern)
+                hs_elements = document.find_strings(hs_code_pattern)
                 
-                for hs_text in hs_elements:
-                    parent = hs_text.parent
-                    hs_match = hs_code_pattern.search(str(hs_text))
+                for hs_text, parent in hs_elements:
+                    hs_match = hs_code_pattern.search(hs_text)
                     if not hs_match:
                         continue
                     
@@ -151,52 +204,78 @@ class DataParser:
                     # 构建详情URL（移除点号）
                     detail_url = f"https://www.i5a6.com/hscode/detail/{hs_code.replace('.', '')}"
                     
-                    results.append({
-                        'hs_code': hs_code,
-                        'product_name': clean_text(product_name),
-                        'detail_url': detail_url
-                    })
-            
-            logger.info(f"从搜索结果中提取到 {len(results)} 条记录")
+                    results.append(SearchCandidate(hs_code, clean_text(product_name), detail_url))
             
         except Exception as e:
             logger.error(f"解析搜索结果失败: {str(e)}")
         
         return results
     
-    def parse_detail_page(self, html: str) -> Dict:
+    def parse_detail_page(self, html: Union[str, bytes], encoding: Optional[str] = None) -> HSRecord:
         """
         解析详情页面，提取完整的HS编码信息
         
         Args:
-            html: HTML内容
+            html: HTML内容（str 或响应原始字节）
+            encoding: 字节内容的字符编码，默认 UTF-8
+            
+        Returns:
+            HS编码详情记录
+        """
+        if isinstance(html, bytes):
+            # 裁剪会去掉 head 中的 <meta> 编码声明，先确定编码
+            encoding = resolve_html_encoding(html, encoding)
+        parse = self.parse_detail_page_lxml if self.backend.name == 'lxml' else self.parse_detail_page_soup
+        # 已作废页面的编码和名称为空，同样是完整的解析结果
+        return HSRecord.from_dict(parse_trimmed(
+            html, 'i5a6_detail', lambda page: parse(page, encoding),
+            lambda result: result['search_success'] or '已作废' in result['error_message']
+        ))
+    
+    def parse_detail_page_lxml(self, html: Union[str, bytes], encoding: Optional[str] = None) -> Dict:
+        """
+        解析详情页面（lxml 单次遍历实现）
+        
+        Args:
+            html: HTML内容（str 或响应原始字节）
+            encoding: 字节内容的字符编码，默认 UTF-8
+            
+        Returns:
+            包含所有字段的字典
+        """
+        return self._parse_detail(html, encoding, self._extract_detail_lxml)
+    
+    def parse_detail_page_soup(self, html: Union[str, bytes], encoding: Optional[str] = None) -> Dict:
+        """
+        解析详情页面（BeautifulSoup 多次遍历实现）
+        
+        原始实现,与 lxml 单次遍历实现输出完全相同,保留用于对照结果。
+        
+        Args:
+            html: HTML内容（str 或响应原始字节）
+            encoding: 字节内容的字符编码，默认 UTF-8
+            
+        Returns:
+            包含所有字段的字典
+        """
+        return self._parse_detail(html, encoding, self._extract_detail_soup)
+    
+    def _parse_detail(self, html: Union[str, bytes], encoding: Optional[str], extract: Callable) -> Dict:
+        """
+        从提取到的表格数据组装详情结果
+        
+        Args:
+            html: HTML内容（str 或响应原始字节）
+            encoding: 字节内容的字符编码
+            extract: 提取函数,返回 (表格键值字典, 监管条件详情, 检验检疫详情)
             
         Returns:
             包含所有字段的字典
         """
-        soup = BeautifulSoup(html, 'lxml')
         result = create_empty_result()
         
         try:
-            # 查找包含数据的表格
-            tables = soup.find_all('table')
-            data_dict = {}
-            
-            for table in tables:
-                rows = table.find_all('tr')
-                for row in rows:
-                    cells = row.find_all(['td', 'th'])
-                    if len(cells) >= 2:
-                        key = safe_get_text(cells[0])
-                        value = safe_get_text(cells[1])
-                        if key and value:
-                            data_dict[key] = value
-                        # 处理一行有4个单元格的情况（两对键值）
-                        if len(cells) >= 4:
-                            key2 = safe_get_text(cells[2])
-                            value2 = safe_get_text(cells[3])
-                            if key2 and value2:
-                                data_dict[key2] = value2
+            data_dict, supervision_details, inspection_details = extract(html, encoding)
             
             # 提取HS编码
             result['hs_code'] = data_dict.get('商品编码', '')
@@ -222,61 +301,17 @@ class DataParser:
             # 提取法定第二单位
             result['second_unit'] = data_dict.get('法定第二单位', '')
             
-            # 提取海关监管条件
+            # 提取海关监管条件及详情（许可证或批文）
             result['customs_supervision_conditions']['code'] = data_dict.get('海关监管条件', '')
-            
-            # 提取海关监管条件详情（许可证或批文）
-            supervision_details = []
-            permit_code_elem = soup.find(text=re.compile(r'许可证或批文代码'))
-            permit_name_elem = soup.find(text=re.compile(r'许可证或批文名称'))
-            
-            if permit_code_elem and permit_name_elem:
-                # 查找表格
-                table = permit_code_elem.find_parent('table')
-                if table:
-                    rows = table.find_all('tr')[1:]  # 跳过标题行
-                    for row in rows:
-                        cells = row.find_all(['td', 'th'])
-                        if len(cells) >= 2:
-                            code = safe_get_text(cells[0])
-                            name = safe_get_text(cells[1])
-                            if code and name:
-                                supervision_details.append({
-                                    'code': code,
-                                    'name': name
-                                })
-            
             result['customs_supervision_conditions']['details'] = supervision_details
             
-            # 提取检验检疫类别
+            # 提取检验检疫类别及详情
             result['inspection_quarantine']['code'] = data_dict.get('检验检疫类别', '')
+            result['inspection_quarantine']['details'] = inspection_details
             
             # 提取商品描述
             result['description'] = data_dict.get('商品描述', '')
             
-            # 提取检验检疫详情
-            inspection_details = []
-            insp_code_elem = soup.find(text=re.compile(r'检验检疫代码'))
-            insp_name_elem = soup.find(text=re.compile(r'^名称$'))
-            
-            if insp_code_elem and insp_name_elem:
-                # 查找表格
-                table = insp_code_elem.find_parent('table')
-                if table:
-                    rows = table.find_all('tr')[1:]  # 跳过标题行
-                    for row in rows:
-                        cells = row.find_all(['td', 'th'])
-                        if len(cells) >= 2:
-                            code = safe_get_text(cells[0])
-                            name = safe_get_text(cells[1])
-                            if code and name:
-                                inspection_details.append({
-                                    'code': code,
-                                    'name': name
-                                })
-            
-            result['inspection_quarantine']['details'] = inspection_details
-            
             # 如果没有找到商品描述，尝试使用商品名称
             if not result['description'] and result['product_name']:
                 result['description'] = result['product_name']
@@ -295,6 +330,199 @@ class DataParser:
         
         return result
     
+    def _extract_detail_lxml(self, html: Union[str, bytes],
+                             encoding: Optional[str] = None) -> Tuple[Dict[str, str], List[Dict], List[Dict]]:
+        """
+        单次遍历文档,提取表格键值对和许可证/检验检疫详情表
+        
+        按文档顺序依次处理标签和文本节点:
+        - 每个表格行记录到所在的最内层表格,组装时按表格顺序写入字典,
+          与原实现逐个表格遍历（嵌套表格的行会被内层表格再次覆盖）的结果一致
+        - 文本节点只需匹配四个表头关键字,记录第一次出现的位置
+        
+        Args:
+            html: HTML内容（str 或响应原始字节）
+            encoding: 字节内容的字符编码
+            
+        Returns:
+            (表格键值字典, 监管条件详情, 检验检疫详情)
+        """
+        root = parse_html_tree(html, encoding)
+        if root is None:
+            return {}, [], []
+        
+        table_order = {}    # 表格 -> 文档顺序
+        row_pairs = []      # (所在表格顺序, 键, 值)
+        permit_code_owner = insp_code_owner = None
+        has_permit_name = has_insp_name = False
+        
+        def match_text(text: str, owner):
+            """匹配表头关键字,owner 为文本所在的元素"""
+            nonlocal permit_code_owner, insp_code_owner, has_permit_name, has_insp_name
+            if permit_code_owner is None and _PERMIT_CODE_PATTERN.search(text):
+                permit_code_owner = owner
+            if not has_permit_name and _PERMIT_NAME_PATTERN.search(text):
+                has_permit_name = True
+            if insp_code_owner is None and _INSP_CODE_PATTERN.search(text):
+                insp_code_owner = owner
+            if not has_insp_name and _INSP_NAME_PATTERN.search(text):
+                has_insp_name = True
+        
+        for event, element in etree.iterwalk(root, events=('start', 'end', 'comment', 'pi')):
+            if event == 'end':
+                if element.tail:
+                    match_text(element.tail, element.getparent())
+                continue
+            
+            if event != 'start':
+                # 注释和处理指令: 内容与其后的文本都属于父元素
+                if element.text:
+                    match_text(element.text, element.getparent())
+                if element.tail:
+                    match_text(element.tail, element.getparent())
+                continue
+            
+            if element.text:
+                match_text(element.text, element)
+            
+            tag = element.tag
+            if tag == 'table':
+                table_order[element] = len(table_order)
+            elif tag == 'tr':
+                table = next(element.iterancestors('table'), None)
+                if table is None:
+                    continue
+                
+                cells = list(element.iter('td', 'th'))
+                if len(cells) >= 2:
+                    order = table_order[table]
+                    key = lxml_get_text(cells[0])
+                    value = lxml_get_text(cells[1])
+                    if key and value:
+                        row_pairs.append((order, key, value))
+                    # 处理一行有4个单元格的情况（两对键值）
+                    if len(cells) >= 4:
+                        key2 = lxml_get_text(cells[2])
+                        value2 = lxml_get_text(cells[3])
+                        if key2 and value2:
+                            row_pairs.append((order, key2, value2))
+        
+        row_pairs.sort(key=lambda pair: pair[0])
+        data_dict = {key: value for _, key, value in row_pairs}
+        
+        supervision_details = []
+        if permit_code_owner is not None and has_permit_name:
+            supervision_details = self._parse_code_table_lxml(permit_code_owner)
+        
+        inspection_details = []
+        if insp_code_owner is not None and has_insp_name:
+            inspection_details = self._parse_code_table_lxml(insp_code_owner)
+        
+        return data_dict, supervision_details, inspection_details
+    
+    @staticmethod
+    def _parse_code_table_lxml(owner) -> List[Dict]:
+        """
+        解析表头所在表格的 代码-名称 行（跳过标题行）
+        
+        Args:
+            owner: 表头文本所在的元素
+            
+        Returns:
+            [{'code': ..., 'name': ...}, ...]
+        """
+        table = owner if owner.tag == 'table' else next(owner.iterancestors('table'), None)
+        if table is None:
+            return []
+        
+        details = []
+        for row in list(table.iter('tr'))[1:]:  # 跳过标题行
+            cells = list(row.iter('td', 'th'))
+            if len(cells) >= 2:
+                code = lxml_get_text(cells[0])
+                name = lxml_get_text(cells[1])
+                if code and name:
+                    details.append({'code': code, 'name': name})
+        return details
+    
+    def _extract_detail_soup(self, html: Union[str, bytes],
+                             encoding: Optional[str] = None) -> Tuple[Dict[str, str], List[Dict], List[Dict]]:
+        """
+        使用 BeautifulSoup 提取表格键值对和许可证/检验检疫详情表（原实现）
+        
+        Args:
+            html: HTML内容（str 或响应原始字节）
+            encoding: 字节内容的字符编码
+            
+        Returns:
+            (表格键值字典, 监管条件详情, 检验检疫详情)
+        """
+        soup = make_soup(html, encoding)
+        
+        # 查找包含数据的表格
+        tables = soup.find_all('table')
+        data_dict = {}
+        
+        for table in tables:
+            rows = table.find_all('tr')
+            for row in rows:
+                cells = row.find_all(['td', 'th'])
+                if len(cells) >= 2:
+                    key = safe_get_text(cells[0])
+                    value = safe_get_text(cells[1])
+                    if key and value:
+                        data_dict[key] = value
+                    # 处理一行有4个单元格的情况（两对键值）
+                    if len(cells) >= 4:
+                        key2 = safe_get_text(cells[2])
+                        value2 = safe_get_text(cells[3])
+                        if key2 and value2:
+                            data_dict[key2] = value2
+        
+        # 提取海关监管条件详情（许可证或批文）
+        supervision_details = []
+        permit_code_elem = soup.find(text=_PERMIT_CODE_PATTERN)
+        permit_name_elem = soup.find(text=_PERMIT_NAME_PATTERN)
+        
+        if permit_code_elem and permit_name_elem:
+            # 查找表格
+            table = permit_code_elem.find_parent('table')
+            if table:
+                rows = table.find_all('tr')[1:]  # 跳过标题行
+                for row in rows:
+                    cells = row.find_all(['td', 'th'])
+                    if len(cells) >= 2:
+                        code = safe_get_text(cells[0])
+                        name = safe_get_text(cells[1])
+                        if code and name:
+                            supervision_details.append({
+                                'code': code,
+                                'name': name
+                            })
+        
+        # 提取检验检疫详情
+        inspection_details = []
+        insp_code_elem = soup.find(text=_INSP_CODE_PATTERN)
+        insp_name_elem = soup.find(text=_INSP_NAME_PATTERN)
+        
+        if insp_code_elem and insp_name_elem:
+            # 查找表格
+            table = insp_code_elem.find_parent('table')
+            if table:
+                rows = table.find_all('tr')[1:]  # 跳过标题行
+                for row in rows:
+                    cells = row.find_all(['td', 'th'])
+                    if len(cells) >= 2:
+                        code = safe_get_text(cells[0])
+                        name = safe_get_text(cells[1])
+                        if code and name:
+                            inspection_details.append({
+                                'code': code,
+                                'name': name
+                            })
+        
+        return data_dict, supervision_details, inspection_details
+    
     def extract_product_names_from_search(self, html: str) -> List[str]:
         """
         从搜索结果中提取所有商品名称，用于相似度匹配
@@ -306,4 +534,4 @@ class DataParser:
             商品名称列表
         """
         results = self.parse_search_results(html, "")
-        return [r['product_name'] for r in results if r['product_name']]
+        return [r.name for r in results if r.name]
@@ -11,22 +11,38 @@ HS编码查询工具 - HSCIQ网站HTML解析模块
 - 详情页URL: https://hsciq.com/HSCN/Code/0808100000
 """
 
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import logging
 import re
 
+from config.settings import (
+    SEARCH_RESTRICTED_PARSE, SEARCH_RESULT_REGION_TAGS
+)
+from src.utils import parse_html_tree, lxml_get_text, lxml_next_sibling, resolve_html_encoding
+from src.html_backend import get_parser_backend, make_soup
+from src.html_trim import parse_trimmed
+from src.page_fingerprint import is_empty_result_page
+from src.records import HSRecord, SearchCandidate
+
 logger = logging.getLogger(__name__)
 
 
 class HTMLParserHSCIQ:
     """HSCIQ网站的HTML解析器"""
     
-    def __init__(self):
-        """初始化解析器"""
+    def __init__(self, backend: Optional[str] = None):
+        """
+        初始化解析器
+        
+        Args:
+            backend: HTML解析后端 ('lxml' / 'beautifulsoup'),默认使用 HTML_PARSER_BACKEND;
+                lxml 后端的详情页使用单次遍历实现,beautifulsoup 后端使用原实现 (用于调试和对照结果)
+        """
         self.base_url = "https://hsciq.com"
+        self.backend = get_parser_backend(backend)
     
-    def parse_search_results(self, html: str, query: str) -> List[Dict]:
+    def parse_search_results(self, html: Union[str, bytes], query: str,
+                             encoding: Optional[str] = None) -> List[SearchCandidate]:
         """
         解析搜索结果页面,提取商品列表
         
@@ -35,20 +51,54 @@ class HTMLParserHSCIQ:
         - HS编码在链接中: <link "0808100000" url="https://hsciq.com/HSCN/Code/0808100000">
         - 商品名称在纯文本中: "鲜苹果"
         
+        无结果页面 (没有结果区域,且没有详情链接或包含 SEARCH_EMPTY_MARKERS 中的文案) 直接返回空列表;
+        其他页面先只在结果区域 (SEARCH_RESULT_REGION_TAGS) 中查找,未找到商品时再查找完整页面;
+        结果区域中找到商品时不再包含区域外 (侧栏热门链接等) 的编码链接。
+        
         Args:
-            html: 搜索结果页面的HTML内容
+            html: 搜索结果页面的HTML内容 (str 或响应原始字节)
             query: 搜索关键词
+            encoding: 字节内容的字符编码,默认 UTF-8
+            
+        Returns:
+            候选商品列表 (SearchCandidate: hs_code, name, url),已过滤作废编码
+        """
+        if is_empty_result_page(html, 'hsciq_search', encoding):
+            logger.info(f"HSCIQ搜索无结果页面: {query}")
+            return []
+        
+        if SEARCH_RESTRICTED_PARSE:
+            document = self.backend.parse(html, only=SEARCH_RESULT_REGION_TAGS, encoding=encoding)
+            results = self._extract_search_results(document)
+            if results:
+                logger.info(f"从HSCIQ搜索结果中提取到 {len(results)} 个有效商品")
+                return results
+            # 在同一页面的完整文档中查找 (重新解析完整页面)
+            logger.debug("结果区域中未找到商品,在完整页面中查找")
+            document = self.backend.expand(document, html, encoding)
+        else:
+            document = self.backend.parse(html, encoding=encoding)
+        
+        results = self._extract_search_results(document)
+        logger.info(f"从HSCIQ搜索结果中提取到 {len(results)} 个有效商品")
+        return results
+    
+    def _extract_search_results(self, document) -> List[SearchCandidate]:
+        """
+        从解析后的文档中提取搜索结果
+        
+        Args:
+            document: 解析后端返回的文档根节点 (完整文档或只包含结果区域)
             
         Returns:
-            商品列表,每个商品包含 name, url, hs_code 等信息
+            商品列表
         """
-        soup = BeautifulSoup(html, 'lxml')
         results = []
         
         try:
             # 查找所有包含HS编码链接的元素
             # 根据页面快照,HS编码链接格式为: /HSCN/Code/编码
-            hs_code_links = soup.find_all('a', href=re.compile(r'/HSCN/Code/\d+'))
+            hs_code_links = document.find_all('a', href=re.compile(r'/HSCN/Code/\d+'))
             
             logger.debug(f"找到 {len(hs_code_links)} 个HS编码链接")
             
@@ -74,7 +124,7 @@ class HTMLParserHSCIQ:
                         
                         # 如果商品名称为空,尝试查找下一个兄弟元素
                         if not product_name:
-                            next_elem = link.find_next_sibling(string=True)
+                            next_elem = link.find_next_sibling_string()
                             if next_elem:
                                 product_name = next_elem.strip()
                         
@@ -82,12 +132,7 @@ class HTMLParserHSCIQ:
                         is_obsolete = '已作废' in full_text or '过期' in full_text
                         
                         if not is_obsolete and hs_code and product_name:
-                            results.append({
-                                'name': product_name,
-                                'url': detail_url,
-                                'hs_code': hs_code,
-                                'obsolete': False
-                            })
+                            results.append(SearchCandidate(hs_code, product_name, detail_url))
                             logger.debug(f"解析到: {hs_code} - {product_name}")
                         elif is_obsolete:
                             logger.debug(f"跳过已作废商品: {product_name} ({hs_code})")
@@ -96,25 +141,234 @@ class HTMLParserHSCIQ:
                     logger.warning(f"解析单个搜索结果失败: {e}")
                     continue
             
-            logger.info(f"从HSCIQ搜索结果中提取到 {len(results)} 个有效商品")
-            
         except Exception as e:
             logger.error(f"解析HSCIQ搜索结果失败: {e}")
         
         return results
     
-    def parse_detail_page(self, html: str, url: str) -> Dict:
+    def parse_detail_page(self, html: Union[str, bytes], url: str, encoding: Optional[str] = None) -> HSRecord:
         """
         解析商品详情页面,提取完整的HS编码信息
         
         Args:
-            html: 详情页HTML内容
+            html: 详情页HTML内容 (str 或响应原始字节)
+            url: 详情页URL
+            encoding: 字节内容的字符编码,默认 UTF-8
+            
+        Returns:
+            HS编码详情记录 (查询状态由爬虫判断后填写)
+        """
+        if isinstance(html, bytes):
+            # 裁剪会去掉 head 中的 <meta> 编码声明,先确定编码
+            encoding = resolve_html_encoding(html, encoding)
+        parse = self.parse_detail_page_lxml if self.backend.name == 'lxml' else self.parse_detail_page_soup
+        # 编码可能取自URL,只有商品名称一定来自页面内容
+        return HSRecord.from_dict(parse_trimmed(
+            html, 'hsciq_detail', lambda page: parse(page, url, encoding),
+            lambda result: bool(result['product_name'])
+        ))
+    
+    def parse_detail_page_lxml(self, html: Union[str, bytes], url: str, encoding: Optional[str] = None) -> Dict:
+        """
+        解析商品详情页面（lxml 单次遍历实现）
+        
+        基于 lxml 的单次遍历实现: 一次遍历文档收集标题、表格行、标签和 h6 小节,
+        再从收集结果中组装字段,输出与 parse_detail_page_soup 完全相同。
+        
+        Args:
+            html: 详情页HTML内容 (str 或响应原始字节)
+            url: 详情页URL
+            encoding: 字节内容的字符编码,默认 UTF-8
+            
+        Returns:
+            包含完整信息的字典
+        """
+        result = {
+            'hs_code': '',
+            'product_name': '',
+            'description': '',
+            'declaration_elements': '',
+            'first_unit': '',
+            'second_unit': '',
+            'customs_supervision_conditions': {
+                'code': '',
+                'details': []
+            },
+            'inspection_quarantine': {
+                'code': '',
+                'details': []
+            }
+        }
+        
+        try:
+            # 空页面解析结果为 None,此时仍可从URL提取HS编码
+            root = parse_html_tree(html, encoding)
+            elements = root.iter() if root is not None else ()
+            
+            first_h1 = first_h2 = None
+            row_pairs = {}      # 方法A: 表格行 第一列 -> 第二列
+            label_pairs = {}    # 方法B: <strong>/<label>/<dt> -> 值
+            decl_heading = None
+            decl_table = None
+            supervision_table = None
+            quarantine_table = None
+            supervision_found = quarantine_found = False
+            
+            # 单次遍历文档（先序,与 BeautifulSoup 的文档顺序一致）
+            for element in elements:
+                tag = element.tag
+                if not isinstance(tag, str):
+                    continue
+                
+                if tag == 'tr':
+                    cells = list(element.iter('th', 'td'))
+                    if len(cells) >= 2:
+                        key = lxml_get_text(cells[0]).replace(':', '').replace(':', '')
+                        value = lxml_get_text(cells[1])
+                        if key and value:
+                            row_pairs[key] = value
+                
+                elif tag in ('strong', 'label', 'dt'):
+                    label_text = lxml_get_text(element).replace(':', '').replace(':', '')
+                    if label_text:
+                        value_elem = lxml_next_sibling(element)
+                        if value_elem is not None:
+                            value = lxml_get_text(value_elem)
+                        else:
+                            value = lxml_get_text(element.getparent()).replace(label_text, '').replace(':', '').strip()
+                        if value:
+                            label_pairs[label_text] = value
+                
+                elif tag == 'table':
+                    # 申报要素表格: "申报要素"标题之后的第一个表格
+                    if decl_heading is not None and decl_table is None:
+                        decl_table = element
+                
+                elif tag == 'h6':
+                    h6_text = lxml_get_text(element, strip=False)
+                    if decl_heading is None and '申报要素' in h6_text:
+                        decl_heading = element
+                    # 监管条件/检验检疫表格: h6 父元素下的第一个表格
+                    if not supervision_found and '监管条件' in h6_text:
+                        supervision_found = True
+                        supervision_table = self._first_table_in_parent(element)
+                    if not quarantine_found and '检验检疫' in h6_text:
+                        quarantine_found = True
+                        quarantine_table = self._first_table_in_parent(element)
+                
+                elif tag == 'h1' and first_h1 is None:
+                    first_h1 = element
+                elif tag == 'h2' and first_h2 is None:
+                    first_h2 = element
+            
+            # 1. HS编码 - 标题中的10位数字,其次从URL提取
+            heading = first_h1 if first_h1 is not None else first_h2
+            if heading is not None:
+                hs_match = re.search(r'\d{10}', lxml_get_text(heading))
+                if hs_match:
+                    result['hs_code'] = self._format_hs_code(hs_match.group())
+            
+            if not result['hs_code']:
+                url_match = re.search(r'/Code/(\d{10})', url)
+                if url_match:
+                    result['hs_code'] = self._format_hs_code(url_match.group(1))
+            
+            # 2. 数据字典 - 标签结构的值覆盖表格行
+            data_dict = {**row_pairs, **label_pairs}
+            
+            result['product_name'] = (
+                data_dict.get('商品名称') or 
+                data_dict.get('品名') or ''
+            )
+            result['description'] = (
+                data_dict.get('商品描述') or 
+                result['product_name']
+            )
+            
+            # 3. 申报要素
+            if decl_table is not None:
+                elements_list = []
+                for row in decl_table.iter('tr'):
+                    cells = list(row.iter('td', 'th'))
+                    if len(cells) >= 2:
+                        index = lxml_get_text(cells[0])
+                        element_text = re.sub(r'\[\?\]', '', lxml_get_text(cells[1]))
+                        element_text = re.sub(r'(必填|非必填)$', '', element_text).strip()
+                        if index.isdigit() and element_text:
+                            elements_list.append(f"{index}:{element_text}")
+                result['declaration_elements'] = ';'.join(elements_list)
+            
+            # 法定单位
+            result['first_unit'] = (
+                data_dict.get('第一法定单位') or 
+                data_dict.get('法定第一单位') or 
+                data_dict.get('第一单位') or ''
+            )
+            result['second_unit'] = (
+                data_dict.get('第二法定单位') or 
+                data_dict.get('法定第二单位') or 
+                data_dict.get('第二单位') or '无'
+            )
+            
+            # 4. 监管条件 / 检验检疫
+            for field, table, label in (
+                ('customs_supervision_conditions', supervision_table, '监管条件'),
+                ('inspection_quarantine', quarantine_table, '检验检疫')
+            ):
+                if table is None:
+                    continue
+                
+                codes = []
+                details = []
+                for row in table.iter('tr'):
+                    tds = list(row.iter('td'))
+                    if len(tds) >= 2:
+                        code = lxml_get_text(tds[0])
+                        name = lxml_get_text(tds[1])
+                        if code and name:
+                            codes.append(code)
+                            details.append({'code': code, 'name': name})
+                            logger.debug(f"  {label}: {code} - {name}")
+                
+                if codes:
+                    result[field]['code'] = ''.join(codes)
+                    result[field]['details'] = details
+                    logger.info(f"成功提取{label}: {result[field]['code']}")
+            
+            if not result['hs_code'] and not result['product_name']:
+                logger.warning(f"HSCIQ详情页解析失败,HS编码和商品名称都为空: {url}")
+                return result
+            
+            logger.info(f"成功解析HSCIQ详情页: {result['hs_code']} - {result['product_name']}")
+            
+        except Exception as e:
+            logger.error(f"解析HSCIQ详情页失败: {e}, URL: {url}")
+        
+        return result
+    
+    @staticmethod
+    def _first_table_in_parent(element):
+        """h6 父元素下的第一个表格（等价于 find_parent().find('table')）"""
+        parent = element.getparent()
+        if parent is None:
+            return None
+        return next(parent.iter('table'), None)
+    
+    def parse_detail_page_soup(self, html: Union[str, bytes], url: str, encoding: Optional[str] = None) -> Dict:
+        """
+        解析商品详情页面（BeautifulSoup 多次遍历实现）
+        
+        parse_detail_page 的原始实现,与 lxml 单次遍历实现输出完全相同,保留用于对照结果。
+        
+        Args:
+            html: 详情页HTML内容 (str 或响应原始字节)
             url: 详情页URL
+            encoding: 字节内容的字符编码,默认 UTF-8
             
         Returns:
             包含完整信息的字典
         """
-        soup = BeautifulSoup(html, 'lxml')
+        soup = make_soup(html, encoding)
         
         # 初始化结果字典
         result = {
@@ -0,0 +1,121 @@
+"""
+按站点的令牌桶限速模块
+
+替代每次请求后固定 sleep(REQUEST_DELAY) 的做法:
+- 每个站点一个令牌桶,按 rate 持续补充令牌,最多积累 burst 个
+- 有可用令牌时立即放行,只有速率预算用完时才等待
+- 令牌在等待前预留,多个并发请求按到达顺序排队,不会同时醒来
+
+创建日期: 2026-10-16
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import RATE_LIMITS, REQUEST_DELAY
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class TokenBucket:
+    """令牌桶限速器（可跨线程、跨事件循环共享）"""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        初始化令牌桶
+        
+        Args:
+            rate: 每秒补充的令牌数
+            burst: 桶容量（允许的突发请求数）
+        """
+        if rate <= 0:
+            raise ValueError(f"rate 必须大于0: {rate}")
+        
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """
+        预留一个令牌
+        
+        Returns:
+            需要等待的秒数（0 表示立即可用）
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            
+            # 令牌数可以为负,表示已被排队中的请求预留
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    async def acquire(self) -> float:
+        """
+        获取一个令牌,令牌不足时异步等待
+        
+        Returns:
+            实际等待的秒数
+        """
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+# 进程内共享的站点限速器
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def _match_rate_config(host: str) -> Optional[tuple]:
+    """查找站点对应的限速配置,返回 (配置域名, 配置)"""
+    for domain, config in RATE_LIMITS.items():
+        if host == domain or host.endswith(f".{domain}"):
+            return domain, config
+    return None
+
+
+def get_rate_limiter(url: str) -> TokenBucket:
+    """
+    获取URL所属站点的令牌桶（同一站点在进程内共享一个实例）
+    
+    未在 RATE_LIMITS 中配置的站点使用 1/REQUEST_DELAY 的速率,不允许突发
+    
+    Args:
+        url: 请求URL或主机名
+        
+    Returns:
+        TokenBucket 实例
+    """
+    host = (urlsplit(url).hostname if '//' in url else url) or ''
+    host = host.lower()
+    
+    matched = _match_rate_config(host)
+    if matched:
+        key, config = matched
+        rate, burst = config['rate'], config.get('burst', 1)
+    else:
+        key = host
+        rate, burst = 1.0 / REQUEST_DELAY if REQUEST_DELAY > 0 else 1000.0, 1
+    
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = TokenBucket(rate, burst)
+            _limiters[key] = limiter
+            logger.debug(f"创建站点限速器: {key} (rate={rate}/s, burst={burst})")
+    
+    return limiter
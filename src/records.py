@@ -0,0 +1,136 @@
+"""
+查询记录类型模块
+
+解析器、详情缓存、解析进程池和爬虫内部使用的紧凑记录类型（NamedTuple）:
+- RegulatoryCode:  监管条件/检验检疫代码及名称
+- SearchCandidate: 搜索结果中的候选商品
+- HSRecord:        HS编码详情（查询结果）
+
+以及按详情URL合并多组候选的 merge_candidates。
+
+记录不可变,可在缓存和并发查询之间直接共享,无需深拷贝;
+爬虫的公开接口（query_*、search_products、get_product_detail、get_hs_code_detail 及其
+异步版本,即 API、MCP 服务、文件存储和外部调用方使用的数据）通过 to_dict() 等转换为原有的字典结构。
+
+创建日期: 2026-10-16
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class RegulatoryCode(NamedTuple):
+    """监管条件/检验检疫代码"""
+    code: str
+    name: str
+
+    def to_dict(self) -> Dict[str, str]:
+        """转换为 {'code': ..., 'name': ...}"""
+        return {'code': self.code, 'name': self.name}
+
+
+class SearchCandidate(NamedTuple):
+    """搜索结果中的候选商品"""
+    hs_code: str
+    name: str
+    url: str
+    score: float = 0.0     # 与查询商品名的相似度,打分前为 0
+
+    def to_dict(self) -> Dict:
+        """转换为字典"""
+        return {'hs_code': self.hs_code, 'name': self.name, 'url': self.url, 'score': self.score}
+
+
+def _codes_from_dicts(details) -> Tuple[RegulatoryCode, ...]:
+    """把 [{'code': ..., 'name': ...}, ...] 转换为代码元组"""
+    return tuple(RegulatoryCode(item['code'], item['name']) for item in details or ())
+
+
+class HSRecord(NamedTuple):
+    """HS编码详情记录,字段与 create_empty_result() 的字典一一对应"""
+    query_product_name: str = ''
+    hs_code: str = ''
+    product_name: str = ''
+    declaration_elements: str = ''
+    first_unit: str = ''
+    second_unit: str = ''
+    supervision_code: str = ''
+    supervision_details: Tuple[RegulatoryCode, ...] = ()
+    quarantine_code: str = ''
+    quarantine_details: Tuple[RegulatoryCode, ...] = ()
+    description: str = ''
+    search_success: bool = False
+    error_message: str = ''
+
+    def to_dict(self) -> Dict:
+        """
+        转换为原有的结果字典结构
+
+        Returns:
+            与 create_empty_result() 字段相同的字典
+        """
+        return {
+            'query_product_name': self.query_product_name,
+            'hs_code': self.hs_code,
+            'product_name': self.product_name,
+            'declaration_elements': self.declaration_elements,
+            'first_unit': self.first_unit,
+            'second_unit': self.second_unit,
+            'customs_supervision_conditions': {
+                'code': self.supervision_code,
+                'details': [item.to_dict() for item in self.supervision_details]
+            },
+            'inspection_quarantine': {
+                'code': self.quarantine_code,
+                'details': [item.to_dict() for item in self.quarantine_details]
+            },
+            'description': self.description,
+            'search_success': self.search_success,
+            'error_message': self.error_message
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> 'HSRecord':
+        """
+        从结果字典创建记录（缺少的字段使用默认值）
+
+        Args:
+            data: 结果字典,结构同 create_empty_result()
+
+        Returns:
+            HSRecord
+        """
+        data = data or {}
+        supervision = data.get('customs_supervision_conditions') or {}
+        quarantine = data.get('inspection_quarantine') or {}
+        return cls(
+            query_product_name=data.get('query_product_name', ''),
+            hs_code=data.get('hs_code', ''),
+            product_name=data.get('product_name', ''),
+            declaration_elements=data.get('declaration_elements', ''),
+            first_unit=data.get('first_unit', ''),
+            second_unit=data.get('second_unit', ''),
+            supervision_code=supervision.get('code', ''),
+            supervision_details=_codes_from_dicts(supervision.get('details')),
+            quarantine_code=quarantine.get('code', ''),
+            quarantine_details=_codes_from_dicts(quarantine.get('details')),
+            description=data.get('description', ''),
+            search_success=data.get('search_success', False),
+            error_message=data.get('error_message', '')
+        )
+
+
+def merge_candidates(groups: Iterable[Optional[List[SearchCandidate]]]) -> List[SearchCandidate]:
+    """
+    合并多组已打分的候选,按详情URL去重并保留最高分; 同分时保留靠前一组的候选
+
+    Args:
+        groups: 候选列表序列（None 表示该组未完成,跳过）
+
+    Returns:
+        按相似度降序排列的候选列表（不含没有详情URL的候选）
+    """
+    pooled: Dict[str, SearchCandidate] = {}
+    for candidates in groups:
+        for item in candidates or []:
+            if item.url and (item.url not in pooled or item.score > pooled[item.url].score):
+                pooled[item.url] = item
+    return sorted(pooled.values(), key=lambda x: x.score, reverse=True)
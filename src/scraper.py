@@ -1,10 +1,10 @@
 """
 网络爬虫模块
 """
-import requests
+import asyncio
+import httpx
 from urllib.parse import urlencode, quote
-import time
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Callable
 import sys
 import os
 
@@ -12,10 +12,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import (
     BASE_URL, SEARCH_URL, DETAIL_URL_TEMPLATE,
-    REQUEST_TIMEOUT, HEADERS, REQUEST_DELAY
+    REQUEST_TIMEOUT, HEADERS, BATCH_MAX_WORKERS, SPECULATIVE_DETAIL_FETCH_K,
+    KEYWORD_FANOUT, FANOUT_EARLY_STOP_SCORE, MAX_SEARCH_ATTEMPTS, HTTP_PREWARM,
+    CATALOGUE_DIRECT_SCORE
 )
-from src.utils import setup_logger, retry_on_exception, create_empty_result
+from src.utils import setup_logger, retry_on_exception, run_bounded, gather_until
+from src.http_client import AsyncHTTPClient, run_sync, pool_size_for
+from src.detail_cache import get_detail_cache, hs_code_from_url
 from src.parser import DataParser
+from src.parse_pool import get_parse_service
+from src.records import HSRecord, SearchCandidate, merge_candidates
 from src.search_optimizer import SearchOptimizer
 
 logger = setup_logger(__name__)
@@ -24,16 +30,42 @@ logger = setup_logger(__name__)
 class HSCodeScraper:
     """HS编码爬虫"""
     
-    def __init__(self):
-        """初始化爬虫"""
-        self.session = requests.Session()
-        self.session.headers.update(HEADERS)
+    # 详情缓存中的数据源标识
+    source = 'i5a6.com'
+    
+    def __init__(self, speculative_k: Optional[int] = None,
+                 keyword_fanout: Optional[bool] = None,
+                 early_stop_score: Optional[float] = FANOUT_EARLY_STOP_SCORE):
+        """
+        初始化爬虫
+        
+        Args:
+            speculative_k: 同时预取的候选详情页数量，默认使用 SPECULATIVE_DETAIL_FETCH_K；
+                大于1时并发获取前K个候选，返回排名最高的有效结果并取消其余请求
+            keyword_fanout: 是否并发搜索所有关键词并汇总候选，默认使用 KEYWORD_FANOUT
+            early_stop_score: 并发搜索时出现不低于该分数的候选即取消其余搜索（None 表示不提前结束）
+        """
+        self.speculative_k = max(1, speculative_k or SPECULATIVE_DETAIL_FETCH_K)
+        self.keyword_fanout = KEYWORD_FANOUT if keyword_fanout is None else keyword_fanout
+        self.early_stop_score = early_stop_score
+        
+        # 连接池按单次查询内的最大并行请求数 × 批量并发数设置
+        parallel = max(self.speculative_k, MAX_SEARCH_ATTEMPTS if self.keyword_fanout else 1)
+        self.http = AsyncHTTPClient(
+            headers=HEADERS,
+            timeout=REQUEST_TIMEOUT,
+            pool_size=pool_size_for(parallel)
+        )
+        if HTTP_PREWARM:
+            self.http.start_prewarm(BASE_URL)
+        
         self.parser = DataParser()
         self.search_optimizer = SearchOptimizer(use_embedding=True)
+        self.detail_cache = get_detail_cache()
         logger.info("HSCodeScraper 初始化完成")
     
-    @retry_on_exception(exceptions=(requests.RequestException,))
-    def _make_request(self, url: str, method: str = 'GET', **kwargs) -> requests.Response:
+    @retry_on_exception(exceptions=(httpx.HTTPError,))
+    async def _make_request(self, url: str, method: str = 'GET', **kwargs) -> httpx.Response:
         """
         发送HTTP请求（带重试机制）
         
@@ -47,21 +79,28 @@ class HSCodeScraper:
         """
         logger.debug(f"请求 {method} {url}")
         
-        if method.upper() == 'GET':
-            response = self.session.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
-        elif method.upper() == 'POST':
-            response = self.session.post(url, timeout=REQUEST_TIMEOUT, **kwargs)
-        else:
+        if method.upper() not in ('GET', 'POST'):
             raise ValueError(f"不支持的请求方法: {method}")
         
+        response = await self.http.request(method.upper(), url, **kwargs)
         response.raise_for_status()
         
-        # 延迟，避免请求过快
-        time.sleep(REQUEST_DELAY)
-        
+        # 请求速率由 AsyncHTTPClient 内的站点令牌桶控制，无需固定延迟
         return response
     
     def search_product(self, keyword: str) -> Optional[str]:
+        """
+        搜索商品，返回第一个匹配结果的详情页URL（同步接口）
+        
+        Args:
+            keyword: 搜索关键词
+            
+        Returns:
+            详情页URL，如果未找到返回None
+        """
+        return run_sync(self.search_product_async(keyword))
+    
+    async def search_product_async(self, keyword: str) -> Optional[str]:
         """
         搜索商品，返回第一个匹配结果的详情页URL
         
@@ -77,27 +116,33 @@ class HSCodeScraper:
             search_url = f"{BASE_URL}/hscode/key/{quote(keyword)}"
             
             logger.info(f"搜索关键词: {keyword}")
-            response = self._make_request(search_url)
+            response = await self._make_request(search_url)
             
             # 解析搜索结果
-            results = self.parser.parse_search_results(response.text, keyword)
+            results = await get_parse_service().parse(
+                self.parser, 'parse_search_results',
+                response.content, keyword, encoding=self.http.encoding_for(response)
+            )
             
             if results:
+                # 解析出结果的页面才写入页面缓存
+                await self.http.cache_response(response)
+                
                 # 使用相似度匹配找到最佳结果
-                product_names = [r['product_name'] for r in results]
+                product_names = [r.name for r in results]
                 logger.debug(f"提取到的商品名称列表: {product_names[:5]}...")  # 调试：显示前5个
                 best_match, score = self.search_optimizer.find_best_match(keyword, product_names)
                 
                 if best_match:
                     # 找到最匹配的结果
                     for result in results:
-                        if result['product_name'] == best_match:
-                            logger.info(f"找到匹配结果: {result['hs_code']} - {result['product_name']}")
-                            return result['detail_url']
+                        if result.name == best_match:
+                            logger.info(f"找到匹配结果: {result.hs_code} - {result.name}")
+                            return result.url
                 
                 # 如果没有找到相似度足够高的，返回第一个结果
-                logger.info(f"使用第一个搜索结果: {results[0]['hs_code']} - {results[0]['product_name']}")
-                return results[0]['detail_url']
+                logger.info(f"使用第一个搜索结果: {results[0].hs_code} - {results[0].name}")
+                return results[0].url
             else:
                 logger.warning(f"关键词 '{keyword}' 未找到搜索结果")
                 return None
@@ -107,6 +152,18 @@ class HSCodeScraper:
             return None
     
     def get_hs_code_detail(self, detail_url: str) -> Dict:
+        """
+        获取HS编码详细信息（同步接口）
+        
+        Args:
+            detail_url: 详情页URL
+            
+        Returns:
+            包含所有信息的字典
+        """
+        return run_sync(self.get_hs_code_detail_async(detail_url))
+    
+    async def get_hs_code_detail_async(self, detail_url: str) -> Dict:
         """
         获取HS编码详细信息
         
@@ -116,21 +173,60 @@ class HSCodeScraper:
         Returns:
             包含所有信息的字典
         """
+        return (await self._get_detail_record(detail_url)).to_dict()
+    
+    async def _get_detail_record(self, detail_url: str) -> HSRecord:
+        """
+        获取HS编码详情记录（优先读取进程内的详情记录缓存）
+        
+        Args:
+            detail_url: 详情页URL
+            
+        Returns:
+            HS编码详情记录
+        """
+        hs_code = hs_code_from_url(detail_url)
+        if hs_code:
+            cached = self.detail_cache.get(self.source, hs_code)
+            if cached is not None:
+                logger.info(f"详情命中缓存: {hs_code}")
+                return cached
+        
         try:
             logger.info(f"获取详情: {detail_url}")
-            response = self._make_request(detail_url)
+            response = await self._make_request(detail_url)
             
             # 解析详情页
-            result = self.parser.parse_detail_page(response.text)
+            result = await get_parse_service().parse(
+                self.parser, 'parse_detail_page',
+                response.content, encoding=self.http.encoding_for(response)
+            )
+            
+            # 成功结果和"已作废"结果都是页面本身的内容，可以缓存；网络错误和无法解析的页面不缓存
+            if result.search_success or '已作废' in result.error_message:
+                await self.http.cache_response(response)
+                if hs_code:
+                    self.detail_cache.put(self.source, hs_code, result)
+            
             return result
             
         except Exception as e:
             logger.error(f"获取详情失败: {str(e)}")
-            result = create_empty_result()
-            result['error_message'] = str(e)
-            return result
+            return HSRecord(error_message=str(e))
     
     def query_by_product_name(self, product_name: str) -> Dict:
+        """
+        根据商品名称查询HS编码（同步接口）
+        
+        Args:
+            product_name: 商品名称
+            
+        Returns:
+            包含所有信息的字典
+        """
+        return run_sync(self.query_by_product_name_async(product_name))
+    
+    async def query_by_product_name_async(self, product_name: str) -> Dict:
         """
         根据商品名称查询HS编码（带智能搜索）
         
@@ -140,43 +236,210 @@ class HSCodeScraper:
         Returns:
             包含所有信息的字典
         """
+        return (await self._query_product_record(product_name)).to_dict()
+    
+    async def _query_product_record(self, product_name: str) -> HSRecord:
+        """
+        根据商品名称查询HS编码，返回详情记录
+        
+        Args:
+            product_name: 商品名称
+            
+        Returns:
+            HS编码详情记录
+        """
         logger.info(f"开始查询商品: {product_name}")
         
+        # 离线目录索引的编码作为候选参与排序；设置了 CATALOGUE_DIRECT_SCORE 时高置信度编码直接获取详情
+        catalogue = await self._search_catalogue(product_name)
+        result = await self._query_from_catalogue(product_name, catalogue)
+        if result is not None:
+            return result
+        seeds = await self._score_catalogue_seeds(product_name, catalogue)
+        
         # 生成搜索关键词列表
         keywords = self.search_optimizer.generate_search_keywords(product_name)
         
+        # 并发搜索所有关键词，汇总候选后按全局排名获取详情
+        if self.keyword_fanout:
+            candidates = await self._search_with_keyword_fanout(keywords, product_name, seeds)
+            result = await self._fetch_best_candidate_detail(candidates) if candidates else None
+            
+            if result is not None:
+                logger.info(f"查询成功: {product_name} -> {result.hs_code}")
+                return result._replace(query_product_name=product_name)  # 添加原始查询商品名
+        
         # 依次尝试每个关键词
-        for idx, keyword in enumerate(keywords, 1):
-            logger.info(f"尝试关键词 {idx}/{len(keywords)}: {keyword}")
+        else:
+            for idx, keyword in enumerate(keywords, 1):
+                logger.info(f"尝试关键词 {idx}/{len(keywords)}: {keyword}")
+                
+                # 搜索并获取所有匹配结果（按相似度排序）
+                search_results = await self._search_with_all_candidates(keyword, product_name)
+                
+                # 目录索引的候选与第一个关键词的搜索结果一起排序
+                if idx == 1 and seeds:
+                    search_results = merge_candidates([search_results, seeds])
+                
+                if search_results:
+                    # 按相似度从高到低获取候选详情，返回第一个成功且未作废的结果
+                    result = await self._fetch_best_candidate_detail(search_results)
+                    
+                    if result is not None:
+                        logger.info(f"查询成功: {product_name} -> {result.hs_code}")
+                        return result._replace(query_product_name=product_name)  # 添加原始查询商品名
+        
+        # 所有关键词和候选都未找到有效结果
+        logger.warning(f"查询失败: {product_name}，已尝试 {len(keywords)} 个关键词")
+        return HSRecord(
+            query_product_name=product_name,  # 添加原始查询商品名
+            error_message=f"未找到匹配结果，已尝试关键词: {', '.join(keywords)}"
+        )
+    
+    async def _search_catalogue(self, product_name: str) -> List[SearchCandidate]:
+        """
+        在离线HS编码目录索引中检索候选编码
+        
+        查询文本的编码在默认线程池中执行，不阻塞事件循环中的其他查询。
+        
+        Args:
+            product_name: 商品名称
+            
+        Returns:
+            候选列表（url 为详情页地址，score 为索引相似度），按相似度降序排列；没有索引时返回空列表
+        """
+        results = await asyncio.get_running_loop().run_in_executor(
+            None, self.search_optimizer.search_catalogue, product_name
+        )
+        return [item._replace(url=DETAIL_URL_TEMPLATE.format(hs_code=item.hs_code)) for item in results]
+    
+    async def _query_from_catalogue(self, product_name: str, catalogue: List[SearchCandidate]) -> Optional[HSRecord]:
+        """
+        索引相似度不低于 CATALOGUE_DIRECT_SCORE 的编码直接获取详情，不请求搜索页
+        
+        Args:
+            product_name: 商品名称
+            catalogue: 目录索引的检索结果
+            
+        Returns:
+            有效的详情记录，未设置 CATALOGUE_DIRECT_SCORE 或没有高置信度的有效编码时返回None
+        """
+        if CATALOGUE_DIRECT_SCORE is None:
+            return None
+        
+        candidates = [item for item in catalogue if item.score >= CATALOGUE_DIRECT_SCORE]
+        if not candidates:
+            return None
+        
+        logger.info(f"目录索引命中 {len(candidates)} 个编码，直接获取详情: {candidates[0].hs_code} (相似度: {candidates[0].score:.2f})")
+        result = await self._fetch_best_candidate_detail(candidates)
+        if result is None:
+            logger.info("目录索引中的编码均无效，使用在线搜索")
+            return None
+        
+        logger.info(f"查询成功（目录索引）: {product_name} -> {result.hs_code}")
+        return result._replace(query_product_name=product_name)
+    
+    async def _score_catalogue_seeds(self, product_name: str, catalogue: List[SearchCandidate]) -> List[SearchCandidate]:
+        """
+        按在线搜索结果的打分方式（商品名称相似度）重新为目录索引的编码打分，作为搜索候选的补充
+        
+        Args:
+            product_name: 商品名称
+            catalogue: 目录索引的检索结果
             
-            # 搜索并获取所有匹配结果（按相似度排序）
-            search_results = self._search_with_all_candidates(keyword, product_name)
+        Returns:
+            重新打分的候选列表
+        """
+        if not catalogue:
+            return []
+        
+        scores = await asyncio.get_running_loop().run_in_executor(
+            None, self.search_optimizer.score_candidates, product_name, [item.name for item in catalogue]
+        )
+        logger.info(f"目录索引提供 {len(catalogue)} 个候选编码")
+        return [item._replace(score=score) for item, score in zip(catalogue, scores)]
+    
+    async def _fetch_best_candidate_detail(self, candidates: List[SearchCandidate]) -> Optional[HSRecord]:
+        """
+        按排名获取候选详情，返回排名最高的有效结果
+        
+        每次并发获取 speculative_k 个候选的详情页，并按排名顺序检查结果：
+        排名靠前的候选有效时立即返回，同一批中尚未完成的请求会被取消；
+        整批都无效（已作废或获取失败）时继续下一批。speculative_k=1 时等同逐个获取。
+        
+        Args:
+            candidates: 候选商品列表，按相似度降序排列
             
-            if search_results:
-                # 尝试每个候选结果（从相似度最高的开始）
-                for candidate_idx, (detail_url, similarity, matched_name) in enumerate(search_results, 1):
-                    logger.debug(f"尝试候选 {candidate_idx}/{len(search_results)}: {matched_name} (相似度: {similarity:.2f})")
+        Returns:
+            有效的详情记录，全部无效时返回None
+        """
+        k = self.speculative_k
+        
+        for start in range(0, len(candidates), k):
+            window = candidates[start:start + k]
+            tasks = [
+                asyncio.ensure_future(self._get_detail_record(candidate.url))
+                for candidate in window
+            ]
+            
+            try:
+                for offset, (task, candidate) in enumerate(zip(tasks, window)):
+                    candidate_idx = start + offset + 1
+                    logger.debug(f"检查候选 {candidate_idx}/{len(candidates)}: {candidate.name} (相似度: {candidate.score:.2f})")
                     
-                    # 获取详情
-                    result = self.get_hs_code_detail(detail_url)
+                    result = await task
                     
                     # 检查是否成功且未作废
-                    if result['search_success']:
-                        result['query_product_name'] = product_name  # 添加原始查询商品名
-                        logger.info(f"查询成功: {product_name} -> {result['hs_code']}")
+                    if result.search_success:
                         return result
-                    elif '已作废' in result.get('error_message', ''):
+                    elif '已作废' in result.error_message:
                         logger.debug(f"候选 {candidate_idx} 已作废，尝试下一个")
-                        continue
+            finally:
+                pending = [task for task in tasks if not task.done()]
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    logger.debug(f"取消 {len(pending)} 个不再需要的详情请求")
+                    await asyncio.gather(*pending, return_exceptions=True)
         
-        # 所有关键词和候选都未找到有效结果
-        logger.warning(f"查询失败: {product_name}，已尝试 {len(keywords)} 个关键词")
-        result = create_empty_result()
-        result['query_product_name'] = product_name  # 添加原始查询商品名
-        result['error_message'] = f"未找到匹配结果，已尝试关键词: {', '.join(keywords)}"
-        return result
+        return None
+    
+    async def _search_with_keyword_fanout(self, keywords: List[str], product_name: str,
+                                          seeds: Optional[List[SearchCandidate]] = None) -> List[SearchCandidate]:
+        """
+        并发搜索所有关键词，汇总各结果页的候选并按相似度统一排序
+        
+        出现相似度不低于 early_stop_score 的候选时，取消其余尚未完成的搜索。
+        
+        Args:
+            keywords: 关键词列表
+            product_name: 原始商品名称
+            seeds: 其他来源（目录索引）已打分的候选，与搜索结果一起排序
+            
+        Returns:
+            候选商品列表，按相似度降序排列（按URL去重）
+        """
+        logger.info(f"并发搜索 {len(keywords)} 个关键词: {keywords}")
+        
+        def is_confident(candidates: List[SearchCandidate]) -> bool:
+            return self.early_stop_score is not None and \
+                any(candidate.score >= self.early_stop_score for candidate in candidates)
+        
+        pages = await gather_until(
+            [self._search_with_all_candidates(keyword, product_name) for keyword in keywords],
+            is_confident
+        )
+        
+        # 按详情URL去重，保留最高分；同分时保留靠前关键词的结果
+        merged = merge_candidates(list(pages) + [seeds])
+        logger.info(
+            f"汇总得到 {len(merged)} 个候选 "
+            f"(完成搜索 {sum(1 for p in pages if p is not None)}/{len(keywords)})"
+        )
+        return merged
     
-    def _search_with_all_candidates(self, keyword: str, product_name: str) -> List[tuple]:
+    async def _search_with_all_candidates(self, keyword: str, product_name: str) -> List[SearchCandidate]:
         """
         搜索并返回所有候选结果（按相似度排序）
         
@@ -185,37 +448,38 @@ class HSCodeScraper:
             product_name: 原始商品名称
             
         Returns:
-            [(detail_url, similarity, matched_name), ...] 按相似度降序排列
+            候选商品列表（score 为相似度），按相似度降序排列
         """
         try:
             logger.info(f"搜索关键词: {keyword}")
             
             # 构建搜索URL
             search_url = f"{BASE_URL}/hscode/key/{quote(keyword)}"
-            response = self._make_request(search_url)
+            response = await self._make_request(search_url)
             
             # 解析搜索结果
-            results = self.parser.parse_search_results(response.text, product_name)
+            results = await get_parse_service().parse(
+                self.parser, 'parse_search_results',
+                response.content, product_name, encoding=self.http.encoding_for(response)
+            )
             
             if results:
-                logger.debug(f"提取到的商品名称列表: {[r['product_name'] for r in results][:5]}...")
+                await self.http.cache_response(response)
+                logger.debug(f"提取到的商品名称列表: {[r.name for r in results][:5]}...")
                 
-                # 计算所有结果的相似度并排序
-                candidates = []
-                for item in results:
-                    similarity = self.search_optimizer.calculate_similarity(
-                        product_name, 
-                        item['product_name']
-                    )
-                    candidates.append((item['detail_url'], similarity, item['product_name']))
+                # 一次批量计算所有结果的相似度并排序（在默认线程池中执行，不阻塞其他查询）
+                scores = await asyncio.get_running_loop().run_in_executor(
+                    None, self.search_optimizer.score_candidates, product_name, [item.name for item in results]
+                )
+                candidates = [item._replace(score=score) for item, score in zip(results, scores)]
                 
                 # 按相似度降序排序
-                candidates.sort(key=lambda x: x[1], reverse=True)
+                candidates.sort(key=lambda x: x.score, reverse=True)
                 
                 # 记录最佳匹配
                 if candidates:
                     best_match = candidates[0]
-                    logger.info(f"找到最佳匹配: '{best_match[2]}' (相似度: {best_match[1]:.2f})")
+                    logger.info(f"找到最佳匹配: '{best_match.name}' (相似度: {best_match.score:.2f})")
                 
                 return candidates
             else:
@@ -227,6 +491,18 @@ class HSCodeScraper:
             return []
     
     def query_by_hs_code(self, hs_code: str) -> Dict:
+        """
+        根据HS编码直接查询（同步接口）
+        
+        Args:
+            hs_code: HS编码
+            
+        Returns:
+            包含所有信息的字典
+        """
+        return run_sync(self.query_by_hs_code_async(hs_code))
+    
+    async def query_by_hs_code_async(self, hs_code: str) -> Dict:
         """
         根据HS编码直接查询
         
@@ -245,32 +521,69 @@ class HSCodeScraper:
         detail_url = DETAIL_URL_TEMPLATE.format(hs_code=clean_code)
         
         # 获取详情
-        return self.get_hs_code_detail(detail_url)
+        return await self.get_hs_code_detail_async(detail_url)
     
-    def batch_query(self, product_names: List[str]) -> List[Dict]:
+    def batch_query(
+        self,
+        product_names: List[str],
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int, str, Dict], None]] = None
+    ) -> List[Dict]:
         """
-        批量查询商品
+        批量查询商品（同步接口）
         
         Args:
             product_names: 商品名称列表
+            max_workers: 最大并发查询数，默认使用 BATCH_MAX_WORKERS
+            progress_callback: 每完成一个商品调用一次 callback(已完成数, 总数, 商品名称, 结果)
             
         Returns:
-            结果列表
+            结果列表（与输入顺序一致）
+        """
+        return run_sync(self.batch_query_async(product_names, max_workers, progress_callback))
+    
+    async def batch_query_async(
+        self,
+        product_names: List[str],
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int, str, Dict], None]] = None
+    ) -> List[Dict]:
         """
-        logger.info(f"开始批量查询，共 {len(product_names)} 个商品")
+        批量并发查询商品
         
-        results = []
-        for idx, name in enumerate(product_names, 1):
-            logger.info(f"处理 {idx}/{len(product_names)}: {name}")
-            result = self.query_by_product_name(name)
-            results.append(result)
+        Args:
+            product_names: 商品名称列表
+            max_workers: 最大并发查询数，默认使用 BATCH_MAX_WORKERS
+            progress_callback: 每完成一个商品调用一次 callback(已完成数, 总数, 商品名称, 结果)
+            
+        Returns:
+            结果列表（与输入顺序一致）
+        """
+        workers = max_workers or BATCH_MAX_WORKERS
+        logger.info(f"开始批量查询，共 {len(product_names)} 个商品，并发数: {workers}")
+        
+        def on_progress(done: int, total: int, name: str, result: Dict):
+            logger.info(f"批量查询进度 {done}/{total}: {name}")
+            if progress_callback is not None:
+                progress_callback(done, total, name, result)
+        
+        results = await run_bounded(
+            product_names,
+            self.query_by_product_name_async,
+            workers,
+            on_progress
+        )
         
         success_count = sum(1 for r in results if r['search_success'])
         logger.info(f"批量查询完成，成功: {success_count}/{len(product_names)}")
         
         return results
     
+    async def aclose(self):
+        """关闭当前事件循环中的HTTP连接"""
+        await self.http.aclose()
+    
     def close(self):
         """关闭会话"""
-        self.session.close()
+        self.http.close()
         logger.info("会话已关闭")
@@ -15,21 +15,28 @@ HS编码查询工具 - HSCIQ网站爬虫模块
 - 过滤过期编码通过URL参数实现,不需要模拟点击
 """
 
-import requests
-from bs4 import BeautifulSoup
-import time
+import asyncio
+import httpx
 import logging
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from src.parser_hsciq import HTMLParserHSCIQ
 from src.search_optimizer import SearchOptimizer
 from config.settings import (
     REQUEST_TIMEOUT,
     MAX_RETRIES,
-    REQUEST_DELAY,
     MAX_SEARCH_ATTEMPTS,
-    MIN_SIMILARITY_SCORE
+    MIN_SIMILARITY_SCORE,
+    BATCH_MAX_WORKERS,
+    KEYWORD_FANOUT,
+    FANOUT_EARLY_STOP_SCORE,
+    HTTP_PREWARM,
+    CATALOGUE_DIRECT_SCORE
 )
-from src.utils import retry_on_exception, setup_logger, create_empty_result
+from src.utils import retry_on_exception, setup_logger, run_bounded, gather_until
+from src.http_client import AsyncHTTPClient, run_sync, pool_size_for
+from src.detail_cache import get_detail_cache, hs_code_from_url
+from src.parse_pool import get_parse_service
+from src.records import HSRecord, SearchCandidate, merge_candidates
 
 logger = logging.getLogger(__name__)
 
@@ -37,26 +44,45 @@ logger = logging.getLogger(__name__)
 class HSCodeScraperHSCIQ:
     """HSCIQ网站的HS编码爬虫"""
     
-    def __init__(self):
-        """初始化爬虫"""
+    # 详情缓存中的数据源标识
+    source = 'hsciq.com'
+    
+    def __init__(self, keyword_fanout: Optional[bool] = None,
+                 early_stop_score: Optional[float] = FANOUT_EARLY_STOP_SCORE):
+        """
+        初始化爬虫
+        
+        Args:
+            keyword_fanout: 是否并发搜索所有关键词并汇总候选,默认使用 KEYWORD_FANOUT
+            early_stop_score: 并发搜索时出现不低于该分数的候选即取消其余搜索 (None 表示不提前结束)
+        """
+        self.keyword_fanout = KEYWORD_FANOUT if keyword_fanout is None else keyword_fanout
+        self.early_stop_score = early_stop_score
         self.base_url = "https://hsciq.com"
         self.search_url = f"{self.base_url}/HSCN/Search"  # 修正搜索URL
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive'
-        })
+        self.http = AsyncHTTPClient(
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+                'Accept-Encoding': 'gzip, deflate, br',
+                'Connection': 'keep-alive'
+            },
+            timeout=REQUEST_TIMEOUT,
+            # 关键词并发搜索时单次查询最多同时发出 MAX_SEARCH_ATTEMPTS 个请求
+            pool_size=pool_size_for(MAX_SEARCH_ATTEMPTS if self.keyword_fanout else 1)
+        )
+        if HTTP_PREWARM:
+            self.http.start_prewarm(self.base_url)
         
         self.parser = HTMLParserHSCIQ()
         self.optimizer = SearchOptimizer(use_embedding=True)
+        self.detail_cache = get_detail_cache()
         
         logger.info("HSCIQ爬虫初始化完成")
     
-    @retry_on_exception(max_retries=MAX_RETRIES, exceptions=(requests.RequestException,))
-    def _make_request(self, url: str, method: str = 'GET', **kwargs) -> requests.Response:
+    @retry_on_exception(max_retries=MAX_RETRIES, exceptions=(httpx.HTTPError,))
+    async def _make_request(self, url: str, method: str = 'GET', **kwargs) -> httpx.Response:
         """
         发送HTTP请求,支持重试
         
@@ -70,22 +96,48 @@ class HSCodeScraperHSCIQ:
         """
         logger.debug(f"请求 {method} {url}")
         
-        if method.upper() == 'GET':
-            response = self.session.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
-        elif method.upper() == 'POST':
-            response = self.session.post(url, timeout=REQUEST_TIMEOUT, **kwargs)
-        else:
+        if method.upper() not in ('GET', 'POST'):
             raise ValueError(f"不支持的请求方法: {method}")
         
-        response.raise_for_status()
-        time.sleep(REQUEST_DELAY)  # 请求间隔
+        response = await self.http.request(method.upper(), url, **kwargs)
+        response.raise_for_status()  # 请求间隔由站点令牌桶控制
         
         return response
     
     def search_products(self, keyword: str, filter_obsolete: bool = True) -> List[Dict]:
+        """
+        搜索商品,返回搜索结果列表（同步接口）
+        
+        Args:
+            keyword: 搜索关键词
+            filter_obsolete: 是否过滤已作废商品 (默认True)
+            
+        Returns:
+            商品列表,每个商品包含 name, url, hs_code 等信息
+        """
+        return run_sync(self.search_products_async(keyword, filter_obsolete))
+    
+    async def search_products_async(self, keyword: str, filter_obsolete: bool = True) -> List[Dict]:
         """
         搜索商品,返回搜索结果列表
         
+        Args:
+            keyword: 搜索关键词
+            filter_obsolete: 是否过滤已作废商品 (默认True)
+            
+        Returns:
+            商品列表,每个商品包含 name, url, hs_code 等信息
+        """
+        results = await self._search_candidates(keyword, filter_obsolete)
+        return [
+            {'name': item.name, 'url': item.url, 'hs_code': item.hs_code, 'obsolete': False}
+            for item in results
+        ]
+    
+    async def _search_candidates(self, keyword: str, filter_obsolete: bool = True) -> List[SearchCandidate]:
+        """
+        搜索商品,返回候选记录列表
+        
         根据实际网站分析:
         - URL: https://hsciq.com/HSCN/Search
         - 参数: keywords, viewtype=1, filterFailureCode=true
@@ -96,7 +148,7 @@ class HSCodeScraperHSCIQ:
             filter_obsolete: 是否过滤已作废商品 (默认True)
             
         Returns:
-            商品列表,每个商品包含 name, url, hs_code 等信息
+            候选商品列表 (SearchCandidate: hs_code, name, url)
         """
         try:
             logger.info(f"在HSCIQ搜索关键词: {keyword}")
@@ -116,17 +168,22 @@ class HSCodeScraperHSCIQ:
                 search_params['exclude_expired'] = 'true'
             
             # 发送搜索请求
-            response = self._make_request(
+            response = await self._make_request(
                 self.search_url,
                 method='GET',
                 params=search_params
             )
             
             # 解析搜索结果
-            results = self.parser.parse_search_results(response.text, keyword)
+            results = await get_parse_service().parse(
+                self.parser, 'parse_search_results',
+                response.content, keyword, encoding=self.http.encoding_for(response)
+            )
             if not results:
                 logger.warning(f"HSCIQ搜索无结果: {keyword}")
             else:
+                # 解析出结果的页面才写入页面缓存
+                await self.http.cache_response(response)
                 logger.info(f"HSCIQ搜索到 {len(results)} 个商品")
             
             return results
@@ -136,6 +193,18 @@ class HSCodeScraperHSCIQ:
             return []
     
     def get_product_detail(self, url: str) -> Dict:
+        """
+        获取商品详情（同步接口）
+        
+        Args:
+            url: 商品详情页URL
+            
+        Returns:
+            商品详细信息字典,获取失败时返回空字典
+        """
+        return run_sync(self.get_product_detail_async(url))
+    
+    async def get_product_detail_async(self, url: str) -> Dict:
         """
         获取商品详情
         
@@ -143,21 +212,77 @@ class HSCodeScraperHSCIQ:
             url: 商品详情页URL
             
         Returns:
-            商品详细信息字典
+            商品详细信息字典,获取失败时返回空字典
+        """
+        detail = await self._get_detail_record(url)
+        return detail.to_dict() if detail is not None else {}
+    
+    async def _get_detail_record(self, url: str) -> Optional[HSRecord]:
+        """
+        获取商品详情记录（优先读取进程内的详情记录缓存）
+        
+        Args:
+            url: 商品详情页URL
+            
+        Returns:
+            HS编码详情记录,获取失败时返回None
         """
+        hs_code = hs_code_from_url(url)
+        if hs_code:
+            cached = self.detail_cache.get(self.source, hs_code)
+            if cached is not None:
+                logger.info(f"HSCIQ商品详情命中缓存: {hs_code}")
+                return cached
+        
         try:
             logger.info(f"获取HSCIQ商品详情: {url}")
             
-            response = self._make_request(url)
-            detail = self.parser.parse_detail_page(response.text, url)
+            response = await self._make_request(url)
+            detail = await get_parse_service().parse(
+                self.parser, 'parse_detail_page',
+                response.content, url, encoding=self.http.encoding_for(response)
+            )
+            
+            # hs_code 在页面缺少编码时取自URL,只有页面本身有商品名称的才是详情页;
+            # 拦截页、验证码页即使返回 200 也不写入页面缓存和详情缓存
+            if self._is_detail_record(detail):
+                await self.http.cache_response(response)
+                # 只按URL中的10位编码缓存记录
+                if hs_code:
+                    self.detail_cache.put(self.source, hs_code, detail)
             
             return detail
             
         except Exception as e:
             logger.error(f"获取HSCIQ商品详情失败: {url}, 错误: {e}")
-            return {}
+            return None
+    
+    @staticmethod
+    def _is_detail_record(detail: Optional[HSRecord]) -> bool:
+        """
+        检查解析结果是否来自真实的详情页（有编码和商品名称）
+        
+        Args:
+            detail: 详情页解析结果
+            
+        Returns:
+            是否为有效的详情记录
+        """
+        return detail is not None and bool(detail.hs_code) and bool(detail.product_name)
     
     def query_by_product_name(self, product_name: str) -> Dict:
+        """
+        根据商品名称查询HS编码（同步接口）
+        
+        Args:
+            product_name: 商品名称
+            
+        Returns:
+            查询结果字典,包含HS编码和详细信息
+        """
+        return run_sync(self.query_by_product_name_async(product_name))
+    
+    async def query_by_product_name_async(self, product_name: str) -> Dict:
         """
         根据商品名称查询HS编码
         
@@ -167,62 +292,79 @@ class HSCodeScraperHSCIQ:
         Returns:
             查询结果字典,包含HS编码和详细信息
         """
+        return (await self._query_product_record(product_name)).to_dict()
+    
+    async def _query_product_record(self, product_name: str) -> HSRecord:
+        """
+        根据商品名称查询HS编码,返回详情记录
+        
+        Args:
+            product_name: 商品名称
+            
+        Returns:
+            HS编码详情记录
+        """
         logger.info(f"开始HSCIQ查询: {product_name}")
         
+        # 离线目录索引的编码作为候选参与排序; 设置了 CATALOGUE_DIRECT_SCORE 时高置信度编码直接获取详情
+        catalogue = await self._search_catalogue(product_name)
+        detail = await self._query_from_catalogue(product_name, catalogue)
+        if detail is not None:
+            return detail
+        seeds = await self._score_catalogue_seeds(product_name, catalogue)
+        
         # 生成搜索关键词
         keywords = self.optimizer.generate_search_keywords(product_name)
         logger.info(f"生成的搜索关键词: {keywords[:5]}")  # 只显示前5个
         
+        if self.keyword_fanout:
+            detail = await self._query_with_keyword_fanout(product_name, keywords[:MAX_SEARCH_ATTEMPTS], seeds)
+            if detail is not None:
+                return detail
+            
+            logger.warning(f"HSCIQ未找到匹配结果: {product_name}")
+            return self._create_error_result(
+                product_name,
+                f"未找到匹配结果,已尝试关键词: {', '.join(keywords[:MAX_SEARCH_ATTEMPTS])}"
+            )
+        
         # 依次尝试每个关键词
         for attempt, keyword in enumerate(keywords[:MAX_SEARCH_ATTEMPTS], 1):
             logger.info(f"尝试第 {attempt} 次搜索,使用关键词: {keyword}")
             
             # 搜索商品
-            results = self.search_products(keyword, filter_obsolete=True)
+            results = await self._search_candidates(keyword, filter_obsolete=True)
+            
+            # 目录索引的候选与第一个关键词的搜索结果一起打分
+            if attempt == 1 and seeds:
+                results = merge_candidates([results, seeds])
             
             if not results:
                 logger.debug(f"关键词 '{keyword}' 无搜索结果,尝试下一个")
                 continue
             
-            # 计算所有结果的相似度并找到最佳匹配
+            # 一次批量计算所有结果的相似度并找到最佳匹配（在默认线程池中执行,不阻塞其他查询）
             best_match = None
             best_similarity = 0.0
+            scores = await asyncio.get_running_loop().run_in_executor(
+                None, self.optimizer.score_candidates,
+                product_name, [item.name for item in results]  # 使用搜索结果中的商品名称
+            )
             
-            for item in results:
-                similarity = self.optimizer.calculate_similarity(
-                    product_name,
-                    item['name']  # 使用搜索结果中的商品名称
-                )
-                
+            for item, similarity in zip(results, scores):
                 if similarity > best_similarity:
                     best_similarity = similarity
                     best_match = item
             
             # 检查相似度是否满足阈值
             if best_match and best_similarity >= MIN_SIMILARITY_SCORE:
-                logger.info(f"找到匹配商品: {best_match['name']} (相似度: {best_similarity:.2f})")
+                logger.info(f"找到匹配商品: {best_match.name} (相似度: {best_similarity:.2f})")
                 
-                # 获取详情
-                detail_url = best_match.get('url')
-                if detail_url:
-                    detail = self.get_product_detail(detail_url)
-                    
-                    if detail and detail.get('hs_code'):
-                        # 检查详情页是否标记为已作废
-                        if '已作废' not in detail.get('product_name', '') and \
-                           '过期' not in detail.get('product_name', ''):
-                            # 添加查询相关信息
-                            detail['query_product_name'] = product_name
-                            detail['search_success'] = True
-                            detail['error_message'] = ''
-                            
-                            logger.info(f"成功获取HS编码: {detail['hs_code']}")
-                            return detail
-                        else:
-                            logger.warning(f"详情页显示商品已作废,尝试下一个候选")
-                            continue
+                detail = await self._fetch_valid_detail(product_name, best_match)
+                if detail is not None:
+                    return detail
             else:
-                logger.debug(f"相似度不足 ({best_match.get('similarity', 0):.2f} < {MIN_SIMILARITY_SCORE})")
+                logger.debug(f"相似度不足 ({best_similarity:.2f} < {MIN_SIMILARITY_SCORE})")
         
         # 所有尝试都失败
         logger.warning(f"HSCIQ未找到匹配结果: {product_name}")
@@ -231,7 +373,165 @@ class HSCodeScraperHSCIQ:
             f"未找到匹配结果,已尝试关键词: {', '.join(keywords[:MAX_SEARCH_ATTEMPTS])}"
         )
     
+    async def _query_with_keyword_fanout(self, product_name: str, keywords: List[str],
+                                         seeds: Optional[List[SearchCandidate]] = None) -> Optional[HSRecord]:
+        """
+        并发搜索所有关键词,汇总候选后统一打分,按全局排名获取详情
+        
+        搜索结果到达时即对该页候选打分; 出现分数不低于 early_stop_score 的候选时
+        取消其余尚未完成的搜索。
+        
+        Args:
+            product_name: 商品名称
+            keywords: 关键词列表
+            seeds: 其他来源（目录索引）已打分的候选,与搜索结果一起排序
+            
+        Returns:
+            有效的详情记录,没有合格候选时返回None
+        """
+        logger.info(f"并发搜索 {len(keywords)} 个关键词: {keywords}")
+        
+        async def search_and_score(keyword: str) -> List[SearchCandidate]:
+            results = await self._search_candidates(keyword, filter_obsolete=True)
+            if not results:
+                return []
+            scores = await asyncio.get_running_loop().run_in_executor(
+                None, self.optimizer.score_candidates, product_name, [item.name for item in results]
+            )
+            return [item._replace(score=score) for item, score in zip(results, scores)]
+        
+        def is_confident(scored: List[SearchCandidate]) -> bool:
+            return self.early_stop_score is not None and \
+                any(item.score >= self.early_stop_score for item in scored)
+        
+        pages = await gather_until([search_and_score(kw) for kw in keywords], is_confident)
+        
+        # 按详情URL去重,保留最高分; 同分时保留靠前关键词的结果
+        candidates = merge_candidates(list(pages) + [seeds])
+        logger.info(
+            f"汇总得到 {len(candidates)} 个候选 "
+            f"(完成搜索 {sum(1 for p in pages if p is not None)}/{len(keywords)})"
+        )
+        
+        for item in candidates:
+            if item.score < MIN_SIMILARITY_SCORE:
+                logger.debug(f"剩余候选相似度不足 ({item.score:.2f} < {MIN_SIMILARITY_SCORE})")
+                break
+            
+            logger.info(f"尝试候选商品: {item.name} (相似度: {item.score:.2f})")
+            detail = await self._fetch_valid_detail(product_name, item)
+            if detail is not None:
+                return detail
+        
+        return None
+    
+    async def _search_catalogue(self, product_name: str) -> List[SearchCandidate]:
+        """
+        在离线HS编码目录索引中检索候选编码
+        
+        查询文本的编码在默认线程池中执行,不阻塞事件循环中的其他查询。
+        
+        Args:
+            product_name: 商品名称
+            
+        Returns:
+            候选列表（url 为详情页地址,score 为索引相似度）,按相似度降序排列; 没有索引时返回空列表
+        """
+        results = await asyncio.get_running_loop().run_in_executor(
+            None, self.optimizer.search_catalogue, product_name
+        )
+        return [item._replace(url=f"{self.base_url}/HSCN/Code/{item.hs_code}") for item in results]
+    
+    async def _query_from_catalogue(self, product_name: str, catalogue: List[SearchCandidate]) -> Optional[HSRecord]:
+        """
+        索引相似度不低于 CATALOGUE_DIRECT_SCORE 的编码按排名直接获取详情,不请求搜索页
+        
+        Args:
+            product_name: 商品名称
+            catalogue: 目录索引的检索结果
+            
+        Returns:
+            有效的详情记录,未设置 CATALOGUE_DIRECT_SCORE 或没有高置信度的有效编码时返回None
+        """
+        if CATALOGUE_DIRECT_SCORE is None:
+            return None
+        
+        for item in catalogue:
+            if item.score < CATALOGUE_DIRECT_SCORE:
+                break
+            
+            logger.info(f"目录索引命中: {item.hs_code} {item.name} (相似度: {item.score:.2f}),直接获取详情")
+            detail = await self._fetch_valid_detail(product_name, item)
+            if detail is not None:
+                return detail
+        
+        return None
+    
+    async def _score_catalogue_seeds(self, product_name: str, catalogue: List[SearchCandidate]) -> List[SearchCandidate]:
+        """
+        按在线搜索结果的打分方式（商品名称相似度）重新为目录索引的编码打分,作为搜索候选的补充
+        
+        Args:
+            product_name: 商品名称
+            catalogue: 目录索引的检索结果
+            
+        Returns:
+            重新打分的候选列表
+        """
+        if not catalogue:
+            return []
+        
+        scores = await asyncio.get_running_loop().run_in_executor(
+            None, self.optimizer.score_candidates, product_name, [item.name for item in catalogue]
+        )
+        logger.info(f"目录索引提供 {len(catalogue)} 个候选编码")
+        return [item._replace(score=score) for item, score in zip(catalogue, scores)]
+    
+    async def _fetch_valid_detail(self, product_name: str, item: SearchCandidate) -> Optional[HSRecord]:
+        """
+        获取候选商品详情并检查是否有效（有编码和商品名称且未作废）
+        
+        Args:
+            product_name: 原始查询商品名称
+            item: 搜索结果项
+            
+        Returns:
+            补充了查询信息的详情记录,无效时返回None
+        """
+        if not item.url:
+            return None
+        
+        detail = await self._get_detail_record(item.url)
+        
+        if self._is_detail_record(detail):
+            # 检查详情页是否标记为已作废
+            if '已作废' not in detail.product_name and \
+               '过期' not in detail.product_name:
+                logger.info(f"成功获取HS编码: {detail.hs_code}")
+                # 添加查询相关信息
+                return detail._replace(
+                    query_product_name=product_name,
+                    search_success=True,
+                    error_message=''
+                )
+            else:
+                logger.warning(f"详情页显示商品已作废,尝试下一个候选")
+        
+        return None
+    
     def query_by_hs_code(self, hs_code: str) -> Dict:
+        """
+        根据HS编码查询详细信息（同步接口）
+        
+        Args:
+            hs_code: HS编码
+            
+        Returns:
+            查询结果字典
+        """
+        return run_sync(self.query_by_hs_code_async(hs_code))
+    
+    async def query_by_hs_code_async(self, hs_code: str) -> Dict:
         """
         根据HS编码查询详细信息
         
@@ -250,81 +550,96 @@ class HSCodeScraperHSCIQ:
             detail_url = f"{self.base_url}/HSCN/Code/{clean_code}"
             
             # 获取详情
-            detail = self.get_product_detail(detail_url)
+            detail = await self._get_detail_record(detail_url)
             
-            if detail and detail.get('hs_code'):
-                detail['search_success'] = True
-                detail['error_message'] = ''
-                return detail
+            if self._is_detail_record(detail):
+                return detail._replace(search_success=True, error_message='').to_dict()
             else:
                 return self._create_error_result(
                     hs_code,
                     "未找到该HS编码的详细信息"
-                )
+                ).to_dict()
                 
         except Exception as e:
             logger.error(f"按HS编码查询失败: {hs_code}, 错误: {e}")
-            return self._create_error_result(hs_code, str(e))
+            return self._create_error_result(hs_code, str(e)).to_dict()
     
-    def batch_query(self, product_names: List[str]) -> List[Dict]:
+    def batch_query(
+        self,
+        product_names: List[str],
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int, str, Dict], None]] = None
+    ) -> List[Dict]:
         """
-        批量查询商品
+        批量查询商品（同步接口）
         
         Args:
             product_names: 商品名称列表
+            max_workers: 最大并发查询数,默认使用 BATCH_MAX_WORKERS
+            progress_callback: 每完成一个商品调用一次 callback(已完成数, 总数, 商品名称, 结果)
             
         Returns:
-            查询结果列表
+            查询结果列表（与输入顺序一致）
+        """
+        return run_sync(self.batch_query_async(product_names, max_workers, progress_callback))
+    
+    async def batch_query_async(
+        self,
+        product_names: List[str],
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int, str, Dict], None]] = None
+    ) -> List[Dict]:
         """
-        logger.info(f"开始HSCIQ批量查询,共 {len(product_names)} 个商品")
+        批量并发查询商品
         
-        results = []
-        for i, product_name in enumerate(product_names, 1):
-            logger.info(f"批量查询进度: {i}/{len(product_names)}")
-            result = self.query_by_product_name(product_name)
-            results.append(result)
+        请求间隔由站点令牌桶控制,不再在商品之间额外等待
+        
+        Args:
+            product_names: 商品名称列表
+            max_workers: 最大并发查询数,默认使用 BATCH_MAX_WORKERS
+            progress_callback: 每完成一个商品调用一次 callback(已完成数, 总数, 商品名称, 结果)
             
-            # 批量查询时增加延迟
-            if i < len(product_names):
-                time.sleep(REQUEST_DELAY * 2)
+        Returns:
+            查询结果列表（与输入顺序一致）
+        """
+        workers = max_workers or BATCH_MAX_WORKERS
+        logger.info(f"开始HSCIQ批量查询,共 {len(product_names)} 个商品,并发数: {workers}")
+        
+        def on_progress(done: int, total: int, name: str, result: Dict):
+            logger.info(f"批量查询进度: {done}/{total}")
+            if progress_callback is not None:
+                progress_callback(done, total, name, result)
+        
+        results = await run_bounded(
+            product_names,
+            self.query_by_product_name_async,
+            workers,
+            on_progress
+        )
         
         logger.info(f"HSCIQ批量查询完成,成功 {sum(1 for r in results if r.get('search_success'))} 个")
         return results
     
-    def _create_error_result(self, query: str, error_message: str) -> Dict:
+    def _create_error_result(self, query: str, error_message: str) -> HSRecord:
         """
-        创建错误结果字典
+        创建错误结果记录
         
         Args:
             query: 查询关键词
             error_message: 错误信息
             
         Returns:
-            错误结果字典
-        """
-        return {
-            'query_product_name': query,
-            'hs_code': '',
-            'product_name': '',
-            'description': '',
-            'declaration_elements': '',
-            'first_unit': '',
-            'second_unit': '',
-            'customs_supervision_conditions': {
-                'code': '',
-                'details': []
-            },
-            'inspection_quarantine': {
-                'code': '',
-                'details': []
-            },
-            'search_success': False,
-            'error_message': error_message
-        }
+            错误结果记录
+        """
+        return HSRecord(query_product_name=query, error_message=error_message)
+    
+    async def aclose(self):
+        """关闭当前事件循环中的HTTP连接"""
+        await self.http.aclose()
     
     def close(self):
         """关闭会话"""
-        self.session.close()
+        self.http.close()
         logger.info("HSCIQ爬虫会话已关闭")
     
     def __enter__(self):
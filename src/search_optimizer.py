@@ -5,17 +5,21 @@
 - 修复 #002 (2025-11-24): 改进中文文本相似度匹配算法
   详见: docs/CHANGELOG_002_改进相似度匹配算法.md
 - 2025-11-26: 添加基于 BGE 嵌入向量的语义相似度计算支持
+- 2026-10-16: 添加批量打分接口 score_candidates,一页候选只需一次模型前向计算
+- 2026-10-16: 添加离线HS编码目录检索 search_catalogue
 """
 import jieba
+import numpy as np
 from difflib import SequenceMatcher
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 from typing import List, Tuple, Optional
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.settings import MAX_SEARCH_ATTEMPTS, MIN_SIMILARITY_SCORE
+from config.settings import MAX_SEARCH_ATTEMPTS, MIN_SIMILARITY_SCORE, CATALOGUE_INDEX_ENABLED, CATALOGUE_TOP_K
+from src.records import SearchCandidate
 from src.utils import setup_logger
 
 logger = setup_logger(__name__)
@@ -217,6 +221,74 @@ class SearchOptimizer:
         
         return max_score
     
+    def score_candidates(self, query: str, names: List[str]) -> List[float]:
+        """
+        批量计算查询与所有候选名称的相似度
+        
+        分数与逐个调用 calculate_similarity 相同:
+        启用嵌入向量时查询和全部候选在一次模型前向计算中编码;
+        否则使用 rapidfuzz.process.cdist 一次计算三种模糊匹配分数。
+        
+        Args:
+            query: 查询字符串
+            names: 候选名称列表
+            
+        Returns:
+            相似度分数列表 (0-1),与 names 一一对应
+        """
+        if not names:
+            return []
+        
+        if self.use_embedding:
+            global _embedding_matcher
+            if _embedding_matcher is None:
+                self._load_embedding_matcher()
+            return [float(score) for score in _embedding_matcher.score_candidates(query, names)]
+        
+        if not query:
+            return [0.0] * len(names)
+        
+        query_clean = query.strip()
+        names_clean = [(name or '').strip() for name in names]
+        
+        # 三种模糊匹配分数,每种一次批量计算,取最高分
+        scores = np.max([
+            process.cdist([query_clean], names_clean, scorer=scorer, dtype=np.float64)[0]
+            for scorer in (fuzz.partial_ratio, fuzz.token_sort_ratio, fuzz.token_set_ratio)
+        ], axis=0) / 100.0
+        
+        query_lower = query_clean.lower()
+        result = []
+        for name, clean, score in zip(names, names_clean, scores):
+            if not name:
+                result.append(0.0)
+            elif clean.lower() == query_lower:
+                result.append(1.0)     # 完全匹配（忽略大小写）
+            else:
+                result.append(float(score))
+        
+        logger.debug(f"批量相似度计算: '{query_clean}' vs {len(names)} 个候选, 最高分 {max(result):.2f}")
+        return result
+    
+    def search_catalogue(self, query: str, top_k: int = CATALOGUE_TOP_K) -> List[SearchCandidate]:
+        """
+        在离线HS编码目录索引中检索候选编码（需要启用嵌入向量）
+        
+        Args:
+            query: 商品名称
+            top_k: 返回的编码数
+            
+        Returns:
+            候选列表（url 为空）,按相似度降序排列; 未启用嵌入向量、未启用或没有索引时返回空列表
+        """
+        if not self.use_embedding or not CATALOGUE_INDEX_ENABLED:
+            return []
+        
+        global _embedding_matcher
+        if _embedding_matcher is None:
+            self._load_embedding_matcher()
+        return _embedding_matcher.search_catalogue(query, top_k)
+    
     def find_best_match(
         self, 
         query: str, 
@@ -240,8 +312,7 @@ class SearchOptimizer:
         best_match = ""
         best_score = 0.0
         
-        for candidate in candidates:
-            score = self.calculate_similarity(query, candidate)
+        for candidate, score in zip(candidates, self.score_candidates(query, candidates)):
             if score > best_score:
                 best_score = score
                 best_match = candidate
@@ -2,10 +2,17 @@
 工具函数模块
 包含日志、重试装饰器等通用功能
 """
+import asyncio
 import logging
 import time
 import functools
-from typing import Callable, Any
+import random
+import re
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from lxml import etree
+from typing import Callable, Any, Awaitable, Dict, List, Optional, TypeVar, Union
 import sys
 import os
 
@@ -14,8 +21,10 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import (
     LOG_LEVEL, LOG_FORMAT, LOG_FILE, 
-    MAX_RETRIES, RETRY_DELAY
+    MAX_RETRIES, RETRY_DELAY, RETRY_MAX_DELAY,
+    RETRY_BUDGET_RATIO, RETRY_BUDGET_MIN_RETRIES, RETRY_BUDGET_WINDOW
 )
+from src.records import HSRecord
 
 
 def setup_logger(name: str = __name__) -> logging.Logger:
@@ -52,45 +61,296 @@ def setup_logger(name: str = __name__) -> logging.Logger:
     return logger
 
 
+class RetryBudget:
+    """
+    进程级重试预算
+
+    统计窗口内的重试次数不超过 min_retries + ratio × 正常请求数,
+    上游持续故障时限制重试流量,避免所有调用方同时重试形成重试风暴。
+    """
+
+    def __init__(
+        self,
+        ratio: float = RETRY_BUDGET_RATIO,
+        min_retries: int = RETRY_BUDGET_MIN_RETRIES,
+        window: float = RETRY_BUDGET_WINDOW
+    ):
+        """
+        初始化重试预算
+
+        Args:
+            ratio: 允许的重试次数占正常请求数的比例
+            min_retries: 窗口内至少允许的重试次数
+            window: 统计窗口（秒）
+        """
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        """移除统计窗口之外的记录"""
+        cutoff = now - self.window
+        for records in (self._requests, self._retries):
+            while records and records[0] < cutoff:
+                records.popleft()
+
+    def record_request(self):
+        """记录一次正常请求（首次尝试）"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._requests.append(now)
+
+    def try_acquire_retry(self) -> bool:
+        """
+        申请一次重试
+
+        Returns:
+            预算充足返回 True 并计入一次重试,否则返回 False
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            allowed = self.min_retries + self.ratio * len(self._requests)
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+    def get_stats(self) -> dict:
+        """获取窗口内的请求数和重试数"""
+        with self._lock:
+            self._expire(time.monotonic())
+            return {'requests': len(self._requests), 'retries': len(self._retries)}
+
+
+_retry_budget = RetryBudget()
+
+
+def get_retry_budget() -> RetryBudget:
+    """获取全局重试预算"""
+    return _retry_budget
+
+
+def _get_status_code(error: Exception) -> Optional[int]:
+    """取出异常携带的HTTP状态码（httpx.HTTPStatusError / requests.HTTPError 等）"""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def _get_retry_after(error: Exception) -> Optional[float]:
+    """
+    解析 429/503 响应的 Retry-After 头
+
+    Returns:
+        需要等待的秒数,没有或无法解析时返回None
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    value = headers.get('Retry-After') if headers is not None else None
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _plan_retry(error: Exception, attempt: int, delay: float, max_delay: float):
+    """
+    判断是否重试以及等待时间
+
+    - 4xx（429 除外,408 请求超时除外）属于永久错误,不重试
+    - 429/503 优先遵循 Retry-After,超过 max_delay 时放弃
+    - 其他错误使用带随机抖动的指数退避: [0, min(max_delay, delay × 2^attempt)]
+    - 重试预算用完时不重试
+
+    Args:
+        error: 捕获的异常
+        attempt: 当前尝试序号（从0开始）
+        delay: 退避基础延迟（秒）
+        max_delay: 单次最长等待（秒）
+
+    Returns:
+        (等待秒数, None) 表示重试; (None, 原因) 表示不重试
+    """
+    status = _get_status_code(error)
+
+    if status is not None and 400 <= status < 500 and status not in (408, 429):
+        return None, f"HTTP {status} 不重试"
+
+    wait = None
+    if status in (429, 503):
+        wait = _get_retry_after(error)
+        if wait is not None and wait > max_delay:
+            return None, f"Retry-After {wait:.0f}秒 超过上限 {max_delay}秒"
+
+    if wait is None:
+        wait = random.uniform(0, min(max_delay, delay * (2 ** attempt)))
+
+    if not _retry_budget.try_acquire_retry():
+        return None, "重试预算已用完"
+
+    return wait, None
+
+
 def retry_on_exception(
     max_retries: int = MAX_RETRIES,
-    delay: int = RETRY_DELAY,
-    exceptions: tuple = (Exception,)
+    delay: float = RETRY_DELAY,
+    exceptions: tuple = (Exception,),
+    max_delay: float = RETRY_MAX_DELAY
 ) -> Callable:
     """
     重试装饰器，当函数抛出异常时自动重试
     
+    同时支持普通函数和协程函数（协程中使用 asyncio.sleep 等待，不阻塞事件循环）。
+    按错误类型决定是否重试（见 _plan_retry）,重试次数受进程级重试预算限制。
+    
     Args:
         max_retries: 最大重试次数
-        delay: 重试延迟（秒）
+        delay: 指数退避的基础延迟（秒）
         exceptions: 需要捕获的异常类型
+        max_delay: 单次重试最长等待（秒）
         
     Returns:
         装饰器函数
     """
     def decorator(func: Callable) -> Callable:
+        logger = setup_logger(func.__module__)
+        
+        def on_failure(e: Exception, attempt: int) -> float:
+            """记录失败并返回重试等待时间,不重试时重新抛出异常"""
+            if attempt == max_retries:
+                logger.error(f"{func.__name__} 执行失败，已达到最大重试次数 {max_retries}: {str(e)}")
+                raise e
+            
+            wait, reason = _plan_retry(e, attempt, delay, max_delay)
+            if wait is None:
+                logger.error(f"{func.__name__} 执行失败 ({reason}): {str(e)}")
+                raise e
+            
+            logger.warning(
+                f"{func.__name__} 执行失败 (尝试 {attempt + 1}/{max_retries + 1}): {str(e)}，"
+                f"{wait:.2f}秒后重试..."
+            )
+            return wait
+        
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                _retry_budget.record_request()
+                
+                for attempt in range(max_retries + 1):
+                    try:
+                        return await func(*args, **kwargs)
+                    except exceptions as e:
+                        await asyncio.sleep(on_failure(e, attempt))
+            
+            return async_wrapper
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            logger = setup_logger(func.__module__)
+            _retry_budget.record_request()
             
             for attempt in range(max_retries + 1):
                 try:
                     return func(*args, **kwargs)
                 except exceptions as e:
-                    if attempt == max_retries:
-                        logger.error(f"{func.__name__} 执行失败，已达到最大重试次数 {max_retries}: {str(e)}")
-                        raise
-                    else:
-                        logger.warning(
-                            f"{func.__name__} 执行失败 (尝试 {attempt + 1}/{max_retries + 1}): {str(e)}，"
-                            f"{delay}秒后重试..."
-                        )
-                        time.sleep(delay)
+                    time.sleep(on_failure(e, attempt))
             
         return wrapper
     return decorator
 
 
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+async def run_bounded(
+    items: List[T],
+    worker: Callable[[T], Awaitable[R]],
+    max_workers: int,
+    progress_callback: Optional[Callable[[int, int, T, R], Any]] = None
+) -> List[R]:
+    """
+    以有限并发数执行异步任务，结果按输入顺序返回
+    
+    Args:
+        items: 待处理的输入列表
+        worker: 处理单个输入的协程函数
+        max_workers: 最大并发数（至少为1）
+        progress_callback: 每完成一项调用一次 callback(已完成数, 总数, 输入, 结果)
+        
+    Returns:
+        与输入顺序一致的结果列表
+    """
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+    total = len(items)
+    completed = 0
+    
+    async def run_one(item: T) -> R:
+        nonlocal completed
+        async with semaphore:
+            result = await worker(item)
+        
+        completed += 1
+        if progress_callback is not None:
+            try:
+                progress_callback(completed, total, item, result)
+            except Exception as e:
+                setup_logger(__name__).warning(f"进度回调执行失败: {e}")
+        return result
+    
+    return list(await asyncio.gather(*(run_one(item) for item in items)))
+
+
+async def gather_until(
+    aws: List[Awaitable[R]],
+    stop: Callable[[R], bool]
+) -> List[Optional[R]]:
+    """
+    并发执行多个协程，某个结果满足停止条件时取消其余协程
+    
+    Args:
+        aws: 协程列表
+        stop: 停止条件，接收单个结果，返回True时取消尚未完成的协程
+        
+    Returns:
+        与输入顺序一致的结果列表，被取消的位置为None
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    indices = {task: i for i, task in enumerate(tasks)}
+    results: List[Optional[R]] = [None] * len(tasks)
+    pending = set(tasks)
+    
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            stopped = False
+            for task in sorted(done, key=indices.get):
+                results[indices[task]] = task.result()
+                stopped = stopped or stop(results[indices[task]])
+            if stopped:
+                break
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    return results
+
+
 def safe_get_text(element, default: str = "") -> str:
     """
     安全获取元素文本内容
@@ -108,6 +368,104 @@ def safe_get_text(element, default: str = "") -> str:
         return default
 
 
+# 与 BeautifulSoup 的 get_text() 一致: 不包含注释以及 script/style/template 中的文本
+_LXML_TEXT_NODES = etree.XPath(
+    './/text()[not(ancestor::script or ancestor::style or ancestor::template)]',
+    smart_strings=False
+)
+
+# 页面中 <meta charset="..."> 或 <meta http-equiv="Content-Type" content="...; charset=..."> 声明的编码
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+_META_PRESCAN_BYTES = 4096
+
+
+def resolve_html_encoding(html: bytes, encoding: Optional[str] = None) -> str:
+    """
+    确定响应原始字节的字符编码
+
+    优先使用响应头声明的 encoding; 未声明时使用页面开头 <meta> 声明的 charset,
+    都没有时为 UTF-8。两种解析后端和无结果页面检测使用同一结果,解码一致。
+
+    Args:
+        html: 响应原始字节
+        encoding: 响应头声明的编码,未声明时为 None
+
+    Returns:
+        字符编码名称
+    """
+    if encoding:
+        return encoding
+    match = _META_CHARSET.search(html, 0, _META_PRESCAN_BYTES)
+    return match.group(1).decode('ascii').lower() if match else 'utf-8'
+
+
+# 按字符编码缓存的 lxml 解析器
+_lxml_html_parsers: Dict[str, etree.HTMLParser] = {}
+
+
+def _get_lxml_html_parser(encoding: str) -> etree.HTMLParser:
+    """获取指定编码的 lxml HTML解析器,libxml2 不支持的编码回退到 UTF-8"""
+    parser = _lxml_html_parsers.get(encoding)
+    if parser is None:
+        try:
+            parser = etree.HTMLParser(encoding=encoding)
+        except LookupError:
+            setup_logger(__name__).warning(f"lxml 不支持编码 {encoding},按 UTF-8 解析")
+            parser = _get_lxml_html_parser('utf-8')
+        _lxml_html_parsers[encoding] = parser
+    return parser
+
+
+def parse_html_tree(html: Union[str, bytes], encoding: Optional[str] = None):
+    """
+    使用 lxml 解析HTML（与 BeautifulSoup(html, 'lxml') 得到相同的文档结构）
+    
+    传入响应原始字节时由 libxml2 直接按 encoding 解码,省去先解码为 str 再编码的过程。
+    
+    Args:
+        html: HTML内容（str 或响应原始字节）
+        encoding: 响应头声明的字符编码,未声明时使用页面 <meta> 声明的编码,默认 UTF-8
+        
+    Returns:
+        根元素,空页面返回None
+    """
+    if isinstance(html, str):
+        return etree.fromstring(html.encode('utf-8'), _get_lxml_html_parser('utf-8'))
+    return etree.fromstring(html, _get_lxml_html_parser(resolve_html_encoding(html, encoding)))
+
+
+def lxml_get_text(element, strip: bool = True) -> str:
+    """
+    获取 lxml 元素的文本内容,等价于 BeautifulSoup 的 get_text(strip=strip)
+    
+    Args:
+        element: lxml 元素
+        strip: 是否去除每段文本两端的空白
+        
+    Returns:
+        文本内容
+    """
+    if strip:
+        return ''.join(text.strip() for text in _LXML_TEXT_NODES(element))
+    return ''.join(_LXML_TEXT_NODES(element))
+
+
+def lxml_next_sibling(element):
+    """
+    获取下一个兄弟标签（跳过注释等非标签节点）,等价于 find_next_sibling()
+    
+    Args:
+        element: lxml 元素
+        
+    Returns:
+        兄弟元素,不存在返回None
+    """
+    sibling = element.getnext()
+    while sibling is not None and not isinstance(sibling.tag, str):
+        sibling = sibling.getnext()
+    return sibling
+
+
 def clean_text(text: str) -> str:
     """
     清理文本，去除多余空白字符
@@ -132,24 +490,6 @@ def create_empty_result() -> dict:
     创建空的查询结果
     
     Returns:
-        包含所有字段的空字典
-    """
-    return {
-        "query_product_name": "",  # 原始查询的商品名称
-        "hs_code": "",
-        "product_name": "",
-        "declaration_elements": "",
-        "first_unit": "",
-        "second_unit": "",
-        "customs_supervision_conditions": {
-            "code": "",
-            "details": []
-        },
-        "inspection_quarantine": {
-            "code": "",
-            "details": []
-        },
-        "description": "",
-        "search_success": False,
-        "error_message": ""
-    }
+        包含所有字段的空字典（即 HSRecord().to_dict()）
+    """
+    return HSRecord().to_dict()
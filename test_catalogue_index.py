@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+HS编码目录语义索引验证脚本（离线运行,不加载模型）
+
+测试场景:
+1. 读取 CSV 目录文件,编码规范为10位数字,跳过无效行
+2. 检索按相似度排序,名称和描述两行向量按编码去重
+3. 保存后重新加载,检索结果不变
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from src.catalogue_index import CatalogueIndex, read_catalogue
+
+
+def make_index() -> CatalogueIndex:
+    """三个编码、四行向量（第一个编码的名称和描述各一行）"""
+    matrix = np.array([
+        [1.0, 0.0, 0.0],
+        [0.8, 0.6, 0.0],
+        [0.0, 1.0, 0.0],
+        [0.0, 0.0, 1.0],
+    ], dtype=np.float32)
+    return CatalogueIndex(
+        codes=['0808100000', '2009710000', '8471300000'],
+        names=['鲜苹果', '苹果汁', '便携式自动数据处理设备'],
+        row_codes=np.array([0, 0, 1, 2], dtype=np.int32),
+        matrix=matrix
+    )
+
+
+def test_read_catalogue():
+    """CSV 目录文件"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'hs_codes.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("hs_code,product_name,description\n")
+            f.write("08081000.00,鲜苹果,鲜苹果\n")
+            f.write("8471300000,便携式自动数据处理设备,笔记本电脑\n")
+            f.write(",缺少编码,\n")
+        entries = read_catalogue(path)
+
+    assert entries == [
+        ('0808100000', '鲜苹果', '鲜苹果'),
+        ('8471300000', '便携式自动数据处理设备', '笔记本电脑'),
+    ]
+    print(f"✅ 读取目录: {entries}")
+
+
+def test_search():
+    """按相似度排序,同一编码只返回一次"""
+    index = make_index()
+    query = np.array([0.6, 0.8, 0.0], dtype=np.float32)
+
+    results = index.search(query, top_k=3)
+    assert [item.hs_code for item in results] == ['0808100000', '2009710000', '8471300000']
+    assert abs(results[0].score - 0.96) < 1e-6   # 第二行（描述）得分更高
+    assert results[0].name == '鲜苹果' and results[0].url == ''
+
+    assert [item.hs_code for item in index.search(query, top_k=1)] == ['0808100000']
+    print(f"✅ 检索: {results}")
+
+
+def test_save_and_load():
+    """保存后重新加载（内存映射）"""
+    index = make_index()
+    query = np.array([0.0, 0.0, 1.0], dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'catalogue')
+        index.save(path)
+        loaded = CatalogueIndex.load(path)
+        assert loaded.search(query, top_k=2) == index.search(query, top_k=2)
+        assert len(loaded) == 3
+        # 释放映射后才能删除临时目录（Windows）
+        del loaded
+
+    print("✅ 保存和加载")
+
+
+if __name__ == "__main__":
+    test_read_catalogue()
+    test_search()
+    test_save_and_load()
+    print("\n所有测试通过!")
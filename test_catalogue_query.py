@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+HS编码目录索引查询流程验证脚本（离线运行,使用内存中的小型目录索引和模拟的搜索/详情请求,不加载模型）
+
+测试场景:
+1. 设置 CATALOGUE_DIRECT_SCORE 且索引相似度达到阈值时直接获取详情,不请求搜索页
+2. 默认不跳过: 索引命中的编码重新打分后与在线搜索的候选一起排序
+3. 索引相似度低于阈值时走在线搜索
+4. HSCIQ 关键词并发搜索时索引候选并入全局排名
+5. 查询文本在线程池中编码,不在事件循环线程中执行
+"""
+
+import sys
+import os
+import asyncio
+import threading
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from src import scraper as scraper_module
+from src import scraper_hsciq as scraper_hsciq_module
+from src.catalogue_index import CatalogueIndex
+from src.records import HSRecord, SearchCandidate
+from src.scraper import HSCodeScraper
+from src.scraper_hsciq import HSCodeScraperHSCIQ
+
+
+def make_index() -> CatalogueIndex:
+    """三个编码,每个编码一行向量"""
+    return CatalogueIndex(
+        codes=['0808100000', '2009710000', '8471300000'],
+        names=['鲜苹果', '苹果汁', '便携式自动数据处理设备'],
+        row_codes=np.array([0, 1, 2], dtype=np.int32),
+        matrix=np.eye(3, dtype=np.float32)
+    )
+
+
+class StubOptimizer:
+    """用小型目录索引检索,查询向量和名称相似度查表"""
+
+    def __init__(self, vectors: dict, scores: dict):
+        self.index = make_index()
+        self.vectors = vectors
+        self.scores = scores
+        self.threads = []
+
+    def search_catalogue(self, query, top_k=2):
+        self.threads.append(threading.current_thread())
+        return self.index.search(np.array(self.vectors[query], dtype=np.float32), top_k)
+
+    def score_candidates(self, query, names):
+        return [self.scores.get(name, 0.0) for name in names]
+
+    def generate_search_keywords(self, product_name):
+        return [product_name]
+
+
+def i5a6_item(hs_code: str, name: str, score: float = 0.0) -> SearchCandidate:
+    return SearchCandidate(hs_code, name, f'https://www.i5a6.com/hscode/detail/{hs_code}', score)
+
+
+class StubScraper(HSCodeScraper):
+    """只替换搜索和详情请求的 i5a6 爬虫"""
+
+    def __init__(self, optimizer: StubOptimizer, pages: dict, keyword_fanout=False):
+        self.search_optimizer = optimizer
+        self.keyword_fanout = keyword_fanout
+        self.speculative_k = 1
+        self.early_stop_score = None
+        self.pages = pages
+        self.searched = []
+        self.fetched = []
+
+    async def _search_with_all_candidates(self, keyword, product_name):
+        self.searched.append(keyword)
+        return self.pages.get(keyword, [])
+
+    async def _get_detail_record(self, detail_url):
+        hs_code = detail_url.rsplit('/', 1)[-1]
+        self.fetched.append(hs_code)
+        return HSRecord(hs_code=hs_code, search_success=True)
+
+
+class StubScraperHSCIQ(HSCodeScraperHSCIQ):
+    """只替换搜索和详情请求的 HSCIQ 爬虫"""
+
+    def __init__(self, optimizer: StubOptimizer, pages: dict):
+        self.base_url = "https://hsciq.com"
+        self.optimizer = optimizer
+        self.keyword_fanout = True
+        self.early_stop_score = None
+        self.pages = pages
+        self.searched = []
+        self.fetched = []
+
+    async def _search_candidates(self, keyword, filter_obsolete=True):
+        self.searched.append(keyword)
+        return self.pages.get(keyword, [])
+
+    async def _fetch_valid_detail(self, product_name, item):
+        self.fetched.append(item.hs_code)
+        return HSRecord(hs_code=item.hs_code, query_product_name=product_name, search_success=True)
+
+
+def with_direct_score(score, func):
+    """临时修改两个爬虫模块的 CATALOGUE_DIRECT_SCORE"""
+    original = scraper_module.CATALOGUE_DIRECT_SCORE, scraper_hsciq_module.CATALOGUE_DIRECT_SCORE
+    scraper_module.CATALOGUE_DIRECT_SCORE = scraper_hsciq_module.CATALOGUE_DIRECT_SCORE = score
+    try:
+        return func()
+    finally:
+        scraper_module.CATALOGUE_DIRECT_SCORE, scraper_hsciq_module.CATALOGUE_DIRECT_SCORE = original
+
+
+def test_direct_skip():
+    """索引相似度达到阈值时直接获取详情,不请求搜索页"""
+    optimizer = StubOptimizer({'苹果': [0.95, 0.3, 0.0]}, {})
+    scraper = StubScraper(optimizer, {'苹果': [i5a6_item('0810909000', '其他鲜果', 0.9)]})
+
+    result = with_direct_score(0.9, lambda: asyncio.run(scraper._query_product_record('苹果')))
+    assert result.hs_code == '0808100000' and result.query_product_name == '苹果'
+    assert scraper.searched == [] and scraper.fetched == ['0808100000']
+    assert optimizer.threads and threading.main_thread() not in optimizer.threads
+    print(f"✅ 索引直接命中: {result.hs_code},未请求搜索页")
+
+
+def test_seed_by_default():
+    """默认不跳过: 索引候选与搜索结果一起排序"""
+    assert scraper_module.CATALOGUE_DIRECT_SCORE is None
+    optimizer = StubOptimizer({'苹果': [0.95, 0.3, 0.0]}, {'鲜苹果': 0.8, '苹果汁': 0.4})
+    scraper = StubScraper(optimizer, {'苹果': [i5a6_item('0810909000', '其他鲜果', 0.6)]})
+
+    candidates = []
+    original = scraper._fetch_best_candidate_detail
+
+    async def record(items):
+        candidates.extend(items)
+        return await original(items)
+
+    scraper._fetch_best_candidate_detail = record
+    result = asyncio.run(scraper._query_product_record('苹果'))
+
+    assert scraper.searched == ['苹果']
+    assert [(c.hs_code, c.score) for c in candidates] == [
+        ('0808100000', 0.8), ('0810909000', 0.6), ('2009710000', 0.4)
+    ]
+    assert result.hs_code == '0808100000' and scraper.fetched == ['0808100000']
+    print(f"✅ 默认不跳过,索引候选参与排序: {[c.hs_code for c in candidates]}")
+
+
+def test_fall_through_below_threshold():
+    """索引相似度低于阈值时走在线搜索,搜索结果排名更高时优先获取"""
+    optimizer = StubOptimizer({'水果': [0.5, 0.2, 0.0]}, {'鲜苹果': 0.5, '苹果汁': 0.2})
+    scraper = StubScraper(optimizer, {'水果': [i5a6_item('0810909000', '其他鲜果', 0.7)]})
+
+    result = with_direct_score(0.9, lambda: asyncio.run(scraper._query_product_record('水果')))
+    assert scraper.searched == ['水果']
+    assert result.hs_code == '0810909000' and scraper.fetched == ['0810909000']
+    print("✅ 低于阈值时走在线搜索")
+
+
+def test_hsciq_fanout_seeds():
+    """HSCIQ 并发搜索: 索引候选并入全局排名"""
+    optimizer = StubOptimizer(
+        {'苹果汁': [0.1, 0.95, 0.0]},
+        {'苹果汁': 0.85, '鲜苹果': 0.3, '浓缩苹果汁': 0.7}
+    )
+    url = 'https://hsciq.com/HSCN/Code/'
+    scraper = StubScraperHSCIQ(optimizer, {
+        '苹果汁': [SearchCandidate('2009790000', '浓缩苹果汁', url + '2009790000')],
+    })
+
+    detail = asyncio.run(scraper._query_product_record('苹果汁'))
+    assert scraper.searched == ['苹果汁']
+    assert detail.hs_code == '2009710000' and scraper.fetched == ['2009710000']
+
+    # 设置阈值后直接获取索引中的编码
+    scraper.searched, scraper.fetched = [], []
+    detail = with_direct_score(0.9, lambda: asyncio.run(scraper._query_product_record('苹果汁')))
+    assert detail.hs_code == '2009710000' and scraper.searched == []
+    print(f"✅ HSCIQ 索引候选参与全局排名: {detail.hs_code}")
+
+
+if __name__ == "__main__":
+    test_direct_skip()
+    test_seed_by_default()
+    test_fall_through_below_threshold()
+    test_hsciq_fanout_seeds()
+    print("\n所有测试通过!")
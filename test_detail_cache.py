@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+详情记录缓存验证脚本（离线运行,不访问网络）
+
+测试场景:
+1. 不同格式的同一10位编码共用一个缓存键,8位编码不缓存
+2. 超过有效期的记录不再返回
+3. 超过容量时淘汰最久未使用的记录
+"""
+
+import sys
+import os
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.detail_cache import DetailCache, hs_code_from_url
+from src.records import HSRecord
+
+
+def make_record(hs_code: str) -> HSRecord:
+    """构造成功的详情记录"""
+    return HSRecord(hs_code=hs_code, product_name='鲜苹果', search_success=True)
+
+
+def test_key_normalization():
+    """编码规范为10位数字后作为缓存键"""
+    assert hs_code_from_url('https://hsciq.com/HSCN/Code/0808100000') == '0808100000'
+    assert hs_code_from_url('https://www.i5a6.com/hscode/detail/0808100000') == '0808100000'
+    assert hs_code_from_url('https://hsciq.com/HSCN/Code/08081000') == ''
+    assert hs_code_from_url('https://hsciq.com/HSCN/Code/080810000012') == ''
+
+    cache = DetailCache(max_size=10, ttl=60)
+    record = make_record('08081000.00')
+    cache.put('hsciq.com', '08081000.00', record)
+    assert cache.get('hsciq.com', '0808100000') is record
+    assert cache.get('hsciq.com', '0808 1000 00') is record
+    assert cache.get('i5a6.com', '0808100000') is None  # 数据源互不影响
+
+    cache.put('hsciq.com', '08081000', make_record('08081000'))
+    assert cache.get('hsciq.com', '08081000') is None
+    assert cache.get_stats()['size'] == 1
+    print(f"✅ 缓存键规范化: {cache.get_stats()}")
+
+
+def test_ttl_expiry():
+    """过期记录被删除"""
+    cache = DetailCache(max_size=10, ttl=0.05)
+    cache.put('i5a6.com', '0808100000', make_record('0808100000'))
+    assert cache.get('i5a6.com', '0808100000') is not None
+
+    time.sleep(0.1)
+    assert cache.get('i5a6.com', '0808100000') is None
+    stats = cache.get_stats()
+    assert stats['size'] == 0 and stats['hits'] == 1 and stats['misses'] == 1
+    print(f"✅ 有效期: {stats}")
+
+
+def test_lru_eviction():
+    """读取会刷新记录的位置,淘汰最久未使用的记录"""
+    cache = DetailCache(max_size=2, ttl=60)
+    cache.put('i5a6.com', '0808100000', make_record('0808100000'))
+    cache.put('i5a6.com', '8471300000', make_record('8471300000'))
+
+    assert cache.get('i5a6.com', '0808100000') is not None  # 0808100000 变为最近使用
+    cache.put('i5a6.com', '6109100022', make_record('6109100022'))
+
+    assert cache.get('i5a6.com', '8471300000') is None
+    assert cache.get('i5a6.com', '0808100000') is not None
+    assert cache.get('i5a6.com', '6109100022') is not None
+    assert cache.get_stats()['size'] == 2
+    print("✅ LRU 淘汰")
+
+
+if __name__ == "__main__":
+    test_key_normalization()
+    test_ttl_expiry()
+    test_lru_eviction()
+    print("\n所有测试通过!")
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+嵌入模型推理后端验证脚本（离线运行,不加载模型）
+
+测试场景:
+1. 两种编码器编码空列表时返回形状为 (0, embedding_dim) 的 float32 矩阵,不调用模型
+"""
+
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from src.embedding_backends import OnnxEncoder, TorchEncoder
+
+
+def test_encode_empty():
+    """空输入不调用模型,返回空矩阵"""
+    for encoder_class in (TorchEncoder, OnnxEncoder):
+        # 不执行 __init__,编码器没有模型和会话,调用模型时会报错
+        encoder = encoder_class.__new__(encoder_class)
+        encoder.embedding_dim = 512
+
+        vectors = encoder.encode([])
+        assert vectors.shape == (0, 512) and vectors.dtype == np.float32, encoder_class.__name__
+    print("✅ 空输入返回 (0, embedding_dim) 矩阵")
+
+
+if __name__ == "__main__":
+    test_encode_empty()
+    print("\n所有测试通过!")
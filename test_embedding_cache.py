@@ -4,7 +4,12 @@
 """
 
 import logging
+import tempfile
 import time
+import numpy as np
+from src.embedding_cache import EmbeddingCache
+from src.embedding_store import EmbeddingStore
+from src import embedding_matcher
 from src.embedding_matcher import EmbeddingMatcher
 
 # 配置日志
@@ -194,6 +199,112 @@ def test_real_world_scenario():
     print(f"  性能提升: 约 10x (第2次开始)")
 
 
+
+def test_lru_eviction():
+    """测试 LRU 淘汰、内存上限和 float16 存储(不需要加载模型)"""
+    print("\n\n" + "="*80)
+    print("LRU 缓存淘汰测试")
+    print("="*80)
+    
+    vectors = {name: np.full(512, i, dtype=np.float32) for i, name in enumerate(["苹果", "香蕉", "橙子"])}
+    
+    # 按条目数限制: 命中的"苹果"移到队尾,淘汰最久未使用的"香蕉"
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("苹果", vectors["苹果"])
+    cache.put("香蕉", vectors["香蕉"])
+    assert cache.get("苹果") is not None
+    cache.put("橙子", vectors["橙子"])
+    assert cache.get("香蕉") is None
+    assert np.array_equal(cache.get("苹果"), vectors["苹果"])
+    
+    stats = cache.get_stats()
+    assert (stats['size'], stats['hits'], stats['misses'], stats['evictions']) == (2, 2, 1, 1)
+    
+    # 按内存限制: 只能容纳一个 float32 向量
+    cache = EmbeddingCache(max_bytes=3000)
+    cache.put("苹果", vectors["苹果"])
+    cache.put("香蕉", vectors["香蕉"])
+    assert len(cache) == 1 and cache.get_stats()['bytes'] <= 3000
+    
+    # float16 存储: 同样的内存可以容纳两个向量,读取时还原为 float32
+    cache = EmbeddingCache(max_bytes=3000, use_float16=True)
+    cache.put("苹果", vectors["苹果"])
+    cache.put("香蕉", vectors["香蕉"])
+    assert len(cache) == 2
+    assert cache.get("香蕉").dtype == np.float32
+    
+    print(f"  缓存统计: {cache.get_stats()}")
+    print("  ✅ LRU 淘汰、内存上限和 float16 存储正常")
+
+
+
+class StubEncoder:
+    """固定维度的编码器,用于不加载模型创建 EmbeddingMatcher"""
+    name = 'stub'
+    cache_name = 'stub'
+    embedding_dim = 8
+
+    def encode(self, texts, batch_size=32, show_progress=False):
+        return np.ones((len(texts), self.embedding_dim), dtype=np.float32)
+
+
+def test_matcher_cache_limits():
+    """默认只按内存上限限制缓存,显式设置 cache_size 时才限制条目数(不需要加载模型)"""
+    print("\n\n" + "="*80)
+    print("匹配器缓存上限测试")
+    print("="*80)
+    
+    create_encoder = embedding_matcher.create_encoder
+    embedding_matcher.create_encoder = lambda *args, **kwargs: StubEncoder()
+    try:
+        matcher = EmbeddingMatcher(enable_store=False)
+        limited = EmbeddingMatcher(enable_store=False, cache_size=10)
+    finally:
+        embedding_matcher.create_encoder = create_encoder
+    
+    vector = np.ones(StubEncoder.embedding_dim, dtype=np.float32)
+    for i in range(1500):
+        matcher._put_to_cache(f"商品{i}", vector)
+        limited._put_to_cache(f"商品{i}", vector)
+    
+    assert matcher._cache.max_entries is None and len(matcher._cache) == 1500
+    assert len(limited._cache) == 10
+    print("  ✅ 默认按内存上限限制,显式 cache_size 限制条目数")
+
+
+
+def test_embedding_store():
+    """测试磁盘存储的追加、重新打开和去重(不需要加载模型)"""
+    print("\n\n" + "="*80)
+    print("嵌入向量磁盘存储测试")
+    print("="*80)
+    
+    vectors = np.random.rand(3, 8).astype(np.float32)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        store = EmbeddingStore("BAAI/bge-small-zh-v1.5", 8, directory=directory)
+        store.put_many(["苹果", "香蕉"], vectors[:2])
+        store.put_many(["香蕉", "橙子"], vectors[1:])  # "香蕉"已存储,不重复追加
+        
+        # 另一个实例（相当于另一个进程或重启后）直接读取
+        reopened = EmbeddingStore("BAAI/bge-small-zh-v1.5", 8, directory=directory)
+        found = reopened.get_many(["苹果", "橙子", "梨"])
+        
+        assert set(found) == {"苹果", "橙子"}
+        assert np.array_equal(found["苹果"], vectors[0])
+        assert np.array_equal(found["橙子"], vectors[2])
+        assert reopened.get_stats()['size'] == 3
+        
+        print(f"  存储统计: {reopened.get_stats()}")
+        
+        # 释放映射后才能删除临时目录（Windows）
+        del found
+        store.close()
+        reopened.close()
+    
+    print("  ✅ 磁盘存储读写正常")
+
+
 if __name__ == "__main__":
     try:
         # 测试1: 缓存性能提升
@@ -205,6 +316,15 @@ if __name__ == "__main__":
         # 测试3: 真实场景模拟
         test_real_world_scenario()
         
+        # 测试4: LRU 淘汰
+        test_lru_eviction()
+        
+        # 测试5: 匹配器缓存上限
+        test_matcher_cache_limits()
+        
+        # 测试6: 磁盘存储
+        test_embedding_store()
+        
         print("\n\n" + "="*80)
         print("所有测试完成!")
         print("="*80)
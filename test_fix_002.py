@@ -6,7 +6,8 @@
 测试场景:
 1. 查询词 "苹果" 应该能匹配到 "鲜苹果"（高分）
 2. 查询词 "苹果" 应该能匹配到包含"苹果"的长描述（中等分数）
-3. 验证实际查询能够正确返回结果
+3. 批量打分 score_candidates 与逐个计算的分数一致
+4. 验证实际查询能够正确返回结果
 """
 
 import sys
@@ -91,10 +92,41 @@ def test_best_match():
     return passed
 
 
+def test_score_candidates():
+    """测试批量打分与逐个计算相似度一致"""
+    print("\n" + "=" * 60)
+    print("测试 3: 批量打分")
+    print("=" * 60)
+    
+    optimizer = SearchOptimizer()
+    
+    query = "苹果"
+    candidates = [
+        "白利糖度值不超过20的苹果汁",
+        "鲜苹果",
+        "苹果",
+        " 苹果干 ",
+        "",
+        "Apple Juice",
+    ]
+    
+    scores = optimizer.score_candidates(query, candidates)
+    expected = [optimizer.calculate_similarity(query, candidate) for candidate in candidates]
+    
+    for candidate, score in zip(candidates, scores):
+        print(f"  {score:.2f} - '{candidate}'")
+    
+    passed = scores == expected and optimizer.score_candidates(query, []) == []
+    print("✅ 通过 - 与逐个计算一致" if passed else f"❌ 失败 - 期望 {expected}")
+    
+    assert passed
+    return passed
+
+
 def test_actual_query():
     """测试实际查询功能"""
     print("\n" + "=" * 60)
-    print("测试 3: 实际查询 '苹果'")
+    print("测试 4: 实际查询 '苹果'")
     print("=" * 60)
     
     from src.scraper import HSCodeScraper
@@ -144,11 +176,18 @@ def main():
         print(f"\n❌ 测试2失败: {e}")
         results.append(("最佳匹配查找", False))
     
-    # 测试3: 实际查询
+    # 测试3: 批量打分
     try:
-        results.append(("实际查询", test_actual_query()))
+        results.append(("批量打分", test_score_candidates()))
     except Exception as e:
         print(f"\n❌ 测试3失败: {e}")
+        results.append(("批量打分", False))
+    
+    # 测试4: 实际查询
+    try:
+        results.append(("实际查询", test_actual_query()))
+    except Exception as e:
+        print(f"\n❌ 测试4失败: {e}")
         import traceback
         traceback.print_exc()
         results.append(("实际查询", False))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+MCP 服务器主备对冲验证脚本（离线运行,使用模拟的数据源,不访问网络也不加载模型）
+
+测试场景:
+1. 主数据源在等待时间内成功时不启动备用数据源,并记录耗时
+2. 主数据源超时后启动备用数据源,备用先成功时取消主数据源,被取消的查询记录取消时的耗时（不短于等待时间）
+3. 主数据源在等待时间内失败时直接查询备用数据源
+4. 冷启动期间的查询不记录耗时
+"""
+
+import sys
+import os
+import asyncio
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mcp_hs_code_query import server
+
+
+class StubSource:
+    """按固定耗时返回结果的数据源"""
+
+    def __init__(self, delay: float, success: bool = True):
+        self.delay = delay
+        self.success = success
+        self.calls = 0
+        self.cancelled = 0
+
+    async def query_by_product_name_async(self, product_name: str) -> dict:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {'query_product_name': product_name, 'search_success': self.success, 'error_message': ''}
+
+
+def query(primary: StubSource, fallback: StubSource, samples=(0.05,) * 20, cold: bool = False,
+          times: int = 1) -> dict:
+    """
+    用模拟数据源执行对冲查询,结束后恢复服务器的数据源和冷启动标记
+
+    默认历史耗时为20个 0.05 秒的样本,对冲等待时间为 0.05 秒。
+
+    Returns:
+        最后一次查询的结果
+    """
+    saved = (server.scraper_primary, server.scraper_fallback, server.primary_cold)
+    server.scraper_primary, server.scraper_fallback = primary, fallback
+    server.primary_latencies.clear()
+    server.primary_latencies.extend(samples)
+    server.primary_cold = cold
+    server.query_stats['hedged_queries'] = 0
+    try:
+        for _ in range(times):
+            result = asyncio.run(asyncio.wait_for(
+                server.query_with_hedging('query_by_product_name', '苹果'), timeout=2
+            ))
+        return result
+    finally:
+        server.scraper_primary, server.scraper_fallback, server.primary_cold = saved
+
+
+def test_primary_fast():
+    """主数据源按时成功"""
+    primary, fallback = StubSource(0.0), StubSource(0.0)
+
+    result = query(primary, fallback)
+    assert result['query_method'] == 'primary' and result['data_source'] == 'hsciq.com'
+    assert fallback.calls == 0 and server.query_stats['hedged_queries'] == 0
+    assert len(server.primary_latencies) == 21
+    print("✅ 主数据源按时返回,未启动备用数据源")
+
+
+def test_hedge_fires():
+    """主数据源过慢时备用数据源胜出,主数据源被取消并记录截至取消时的耗时"""
+    primary, fallback = StubSource(5.0), StubSource(0.0)
+
+    result = query(primary, fallback)
+    assert result['query_method'] == 'fallback' and result['data_source'] == 'i5a6.com'
+    assert server.query_stats['hedged_queries'] == 1
+    assert primary.cancelled == 1
+    # 慢尾样本不短于对冲等待时间,分位数不会因对冲而下降
+    assert len(server.primary_latencies) == 21 and server.primary_latencies[-1] >= 0.05
+    print("✅ 对冲触发,主数据源已取消")
+
+
+def test_primary_failure():
+    """主数据源在等待时间内失败,直接使用备用数据源"""
+    primary, fallback = StubSource(0.0, success=False), StubSource(0.0)
+
+    result = query(primary, fallback, samples=())
+    assert result['query_method'] == 'fallback'
+    assert server.query_stats['hedged_queries'] == 0  # 不是因超时启动
+    assert len(server.primary_latencies) == 1 and fallback.calls == 1
+    print("✅ 主数据源失败,切换到备用数据源")
+
+
+def test_cold_start_excluded():
+    """冷启动期间的查询不记录耗时,之后的查询正常记录"""
+    primary, fallback = StubSource(0.0), StubSource(0.0)
+
+    query(primary, fallback, samples=(), cold=True, times=2)
+    assert primary.calls == 2
+    assert len(server.primary_latencies) == 1
+    print("✅ 冷启动查询未记录耗时")
+
+
+if __name__ == "__main__":
+    test_primary_fast()
+    test_hedge_fires()
+    test_primary_failure()
+    test_cold_start_excluded()
+    print("\n所有测试通过!")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+HTML解析后端一致性验证脚本（离线运行,不访问网络）
+
+测试场景:
+1. lxml 与 BeautifulSoup 后端的节点接口返回相同结果
+2. 受限解析 (only) 只在结果区域内查找
+3. lxml 受限解析只为区域片段建树; 未找到内容时扩大到完整文档
+4. 两种后端下搜索结果解析输出一致
+5. 响应头未声明编码时按页面 <meta> 声明的编码解析字节
+6. 详情页区域裁剪与标记缺失时的回退
+7. 裁剪丢掉商品名称时重新解析完整页面; 本来为空的申报要素不触发重新解析
+"""
+
+import sys
+import os
+import re
+
+import httpx
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.html_backend import get_parser_backend
+from src.parser import DataParser
+from src.parser_hsciq import HTMLParserHSCIQ
+from src import html_trim
+from src.html_trim import trim_html
+from src.http_client import AsyncHTTPClient
+
+SEARCH_PAGE = """
+<html><body>
+<div class="nav"><a href="/hscode/detail/1111111111">热门编码</a></div>
+<table>
+  <tr><th>编码</th><th>名称</th></tr>
+  <tr><td><a href="/hscode/detail/0808100000">08081000.00</a></td><td>鲜苹果</td></tr>
+  <tr><td><a href="/hscode/detail/0808200000">08082000.00</a></td><td>鲜梨(已作废)</td></tr>
+</table>
+<ul><li><a href="/HSCN/Code/0808100000">0808100000</a>鲜苹果<!-- 注释 --></li></ul>
+</body></html>
+"""
+
+
+def summarize(document) -> list:
+    """用节点接口提取一份可比较的摘要"""
+    links = document.find_all('a', href=re.compile(r'/(hscode/detail|HSCN/Code)/\d+'))
+    return [
+        (
+            link.get('href'),
+            link.get_text(strip=True),
+            link.find_parent('tr') is not None,
+            link.find_next_sibling_string(),
+        )
+        for link in links
+    ] + [text for text, _ in document.find_strings(re.compile(r'\d{8,10}'))]
+
+
+def test_backends_agree():
+    """两种后端的节点接口结果一致"""
+    lxml_backend = get_parser_backend('lxml')
+    soup_backend = get_parser_backend('beautifulsoup')
+
+    for only in (None, ['table']):
+        expected = summarize(soup_backend.parse(SEARCH_PAGE, only=only))
+        actual = summarize(lxml_backend.parse(SEARCH_PAGE, only=only))
+        assert actual == expected, (only, actual, expected)
+    print("✅ lxml 与 BeautifulSoup 后端结果一致")
+
+
+def test_restricted_parse():
+    """受限解析只包含结果表格中的链接"""
+    for name in ('lxml', 'beautifulsoup'):
+        document = get_parser_backend(name).parse(SEARCH_PAGE, only=['table'])
+        hrefs = [link.get('href') for link in document.find_all('a')]
+        assert hrefs == ['/hscode/detail/0808100000', '/hscode/detail/0808200000'], hrefs
+    print("✅ 受限解析范围正确")
+
+
+def test_expand():
+    """lxml 受限解析只为区域片段建树,扩大到完整文档后与直接完整解析结果相同"""
+    backend = get_parser_backend('lxml')
+    document = backend.parse(SEARCH_PAGE.encode('utf-8'), only=['table'])
+    assert not document.complete
+    assert [element.tag for element in document._element.iter('div', 'ul', 'table')] == ['table']
+
+    page = SEARCH_PAGE.replace('<table>', '<div>').replace('</table>', '</div>')
+    for name in ('lxml', 'beautifulsoup'):
+        backend = get_parser_backend(name)
+        document = backend.parse(page, only=['table'])
+        assert document.find_all('a') == []
+        expanded = backend.expand(document, page)
+        assert summarize(expanded) == summarize(backend.parse(page))
+
+    # 完整页面的树直接扩大查找范围
+    document = get_parser_backend('lxml').parse(page)
+    assert get_parser_backend('lxml').expand(document, page)._element is document._element
+    print("✅ 受限解析只解析区域片段,扩大查找范围正确")
+
+
+def test_search_results_identical():
+    """两个站点的搜索结果解析在两种后端下输出一致"""
+    for parser_class in (DataParser, HTMLParserHSCIQ):
+        lxml_results = parser_class(backend='lxml').parse_search_results(SEARCH_PAGE, '苹果')
+        soup_results = parser_class(backend='beautifulsoup').parse_search_results(SEARCH_PAGE, '苹果')
+        assert lxml_results == soup_results
+        assert lxml_results
+    print("✅ 搜索结果解析输出一致")
+
+
+def test_undeclared_encoding():
+    """响应头未声明编码时返回 None,解析器使用 <meta> 声明的编码"""
+    client = AsyncHTTPClient()
+    assert client.encoding_for(httpx.Response(200, headers={'Content-Type': 'text/html'})) is None
+    assert client.encoding_for(httpx.Response(200, headers={'Content-Type': 'text/html; charset=GBK'})) == 'gbk'
+
+    gbk_page = SEARCH_PAGE.replace('<html>', '<html><head><meta charset="gbk"></head>').encode('gbk')
+    for parser_class in (DataParser, HTMLParserHSCIQ):
+        for name in ('lxml', 'beautifulsoup'):
+            results = parser_class(backend=name).parse_search_results(gbk_page, '苹果', encoding=None)
+            assert results == parser_class(backend=name).parse_search_results(SEARCH_PAGE, '苹果')
+    print("✅ 未声明编码时按 <meta> 解码")
+
+
+def with_trim(markers: dict, func):
+    """开启裁剪并使用指定标记执行,结束后恢复配置"""
+    saved = html_trim.HTML_TRIM_ENABLED, html_trim.HTML_TRIM_MARKERS
+    html_trim.HTML_TRIM_ENABLED, html_trim.HTML_TRIM_MARKERS = True, markers
+    try:
+        return func()
+    finally:
+        html_trim.HTML_TRIM_ENABLED, html_trim.HTML_TRIM_MARKERS = saved
+
+
+def test_trim_html():
+    """按标记裁剪详情页,标记缺失时返回完整页面"""
+    page = '<html><head><script>x</script></head><body><h1>0808100000</h1><table></table></body></html>'
+
+    def check():
+        assert trim_html(page, 'hsciq_detail') == '<h1>0808100000</h1><table></table></body>'
+        assert trim_html(page.encode('gbk'), 'hsciq_detail') == b'<h1>0808100000</h1><table></table></body>'
+        assert trim_html('<p>无标题</p>', 'hsciq_detail') == '<p>无标题</p>'
+        assert trim_html(page, 'unknown') == page
+    with_trim({'hsciq_detail': ('<h1', '</body>')}, check)
+    print("✅ 区域裁剪正确")
+
+
+DETAIL_PAGE = """
+<html><head><meta charset="gbk"><title>鲜苹果</title></head><body>
+<table><tr><th>商品编码</th><td>0808100000</td></tr><tr><th>商品名称</th><td>鲜苹果</td></tr></table>
+<h1>0808100000</h1>
+<div class="card"><h6>申报要素</h6><table><tr><td>0</td><td>品名</td></tr><tr><td>1</td><td>品牌类型</td></tr></table></div>
+</body></html>
+"""
+
+
+def test_trim_reparse():
+    """商品名称在编码标题之前时,裁剪后缺少商品名称,使用完整页面的解析结果"""
+    page = DETAIL_PAGE.encode('gbk')
+    url = 'https://hsciq.com/HSCN/Code/0808100000'
+    before = html_trim.get_trim_stats().get('hsciq_detail', {}).get('reparsed', 0)
+    for name in ('lxml', 'beautifulsoup'):
+        parser = HTMLParserHSCIQ(backend=name)
+        expected = with_trim({}, lambda: parser.parse_detail_page(page, url))
+        assert expected.declaration_elements and expected.product_name == '鲜苹果'
+
+        actual = with_trim({'hsciq_detail': ('<h1', '</body>')}, lambda: parser.parse_detail_page(page, url))
+        assert actual == expected
+    assert html_trim.get_trim_stats()['hsciq_detail']['reparsed'] - before == 2
+    print("✅ 裁剪结果缺少商品名称时重新解析完整页面")
+
+
+def test_trim_no_reparse_for_empty_fields():
+    """本来为空的申报要素不触发重新解析"""
+    page = """
+<html><head><meta charset="gbk"><title>鲜苹果</title></head><body><div class="col-main">
+<h1>0808100000</h1>
+<table><tr><th>商品编码</th><td>0808100000</td></tr><tr><th>商品名称</th><td>鲜苹果</td></tr></table>
+</div><div class="related">0808300000</div></body></html>
+""".encode('gbk')
+    url = 'https://hsciq.com/HSCN/Code/0808100000'
+    before = html_trim.get_trim_stats().get('hsciq_detail', {}).get('reparsed', 0)
+    parser = HTMLParserHSCIQ(backend='lxml')
+    result = with_trim({'hsciq_detail': ('class="col-main"', '</table>')}, lambda: parser.parse_detail_page(page, url))
+    assert result.product_name == '鲜苹果' and not result.declaration_elements
+    assert html_trim.get_trim_stats()['hsciq_detail']['reparsed'] == before
+    print("✅ 本来为空的字段不触发重新解析")
+
+
+if __name__ == "__main__":
+    test_backends_agree()
+    test_restricted_parse()
+    test_expand()
+    test_search_results_identical()
+    test_undeclared_encoding()
+    test_trim_html()
+    test_trim_reparse()
+    test_trim_no_reparse_for_empty_fields()
+    print("\n所有测试通过!")
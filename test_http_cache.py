@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+HTTP页面缓存验证脚本（离线运行,使用 httpx.MockTransport,不访问网络）
+
+测试场景:
+1. 确认有效后写入的页面在有效期内直接命中缓存
+2. 未确认内容的 200 响应（如拦截页）不写入缓存
+3. 过期条目带 ETag 重新验证,304 时续期并复用缓存内容
+4. 过期且没有验证头的条目重新请求网络
+5. 清理过期条目: 没有验证头的过期即删除,有验证头的超过保留时长后删除,未过期的保留
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from src.http_cache import HTTPCache
+from src.http_client import AsyncHTTPClient
+
+
+class Upstream:
+    """记录请求次数的模拟站点"""
+
+    def __init__(self, body: bytes = b'<html>0808100000</html>', etag: str = ''):
+        self.body = body
+        self.etag = etag
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.etag and request.headers.get('if-none-match') == self.etag:
+            return httpx.Response(304, headers={'ETag': self.etag})
+        headers = {'ETag': self.etag} if self.etag else {}
+        return httpx.Response(200, headers=headers, content=self.body)
+
+
+def run_with_cache(upstream: Upstream, scenario, ttl: int = 3600):
+    """在临时缓存文件上运行异步测试场景"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = HTTPCache(os.path.join(directory, 'cache.sqlite3'), ttls=[], default_ttl=ttl)
+        client = AsyncHTTPClient(cache=cache, transport=httpx.MockTransport(upstream.handler))
+
+        async def run():
+            try:
+                return await scenario(client, cache)
+            finally:
+                await client.aclose()
+
+        try:
+            return asyncio.run(run())
+        finally:
+            cache.close()
+
+
+def test_cache_hit():
+    """写入后命中缓存,不再请求网络"""
+    upstream = Upstream()
+    url = 'https://hit.cache.test/HSCN/Code/0808100000'
+
+    async def scenario(client, cache):
+        first = await client.request('GET', url)
+        assert await client.cache_response(first)
+        second = await client.request('GET', url)
+        return second, cache.get_stats()
+
+    response, stats = run_with_cache(upstream, scenario)
+    assert len(upstream.requests) == 1
+    assert response.extensions.get('from_cache') and response.content == upstream.body
+    assert stats['hits'] == 1 and stats['size'] == 1
+    print(f"✅ 缓存命中: {stats}")
+
+
+def test_unconfirmed_not_cached():
+    """未经调用方确认的响应不写入缓存"""
+    upstream = Upstream(body=b'<html>captcha</html>')
+    url = 'https://blocked.cache.test/HSCN/Code/0808100000'
+
+    async def scenario(client, cache):
+        await client.request('GET', url)
+        second = await client.request('GET', url)
+        # 来自缓存的响应不会重复写入
+        return second, cache.get_stats()
+
+    response, stats = run_with_cache(upstream, scenario)
+    assert len(upstream.requests) == 2
+    assert not response.extensions.get('from_cache')
+    assert stats['size'] == 0 and stats['hits'] == 0
+    print(f"✅ 未确认的页面未缓存: {stats}")
+
+
+def test_revalidate_304():
+    """过期条目发送条件请求,304 时复用缓存内容并续期"""
+    upstream = Upstream(etag='"v1"')
+    url = 'https://revalidate.cache.test/hscode/detail/0808100000'
+
+    async def scenario(client, cache):
+        await client.cache_response(await client.request('GET', url))
+        revalidated = await client.request('GET', url)
+        entry = cache.get(cache.make_key('GET', url))
+        return revalidated, entry, cache.get_stats()
+
+    response, entry, stats = run_with_cache(upstream, scenario, ttl=0)
+    assert len(upstream.requests) == 2
+    assert upstream.requests[1].headers['if-none-match'] == '"v1"'
+    assert response.status_code == 200 and response.content == upstream.body
+    assert stats['revalidated'] == 1 and entry.etag == '"v1"'
+    print(f"✅ 304 重新验证: {stats}")
+
+
+def test_expired_refetch():
+    """过期且没有验证头的条目重新请求网络"""
+    upstream = Upstream()
+    url = 'https://expired.cache.test/hscode/detail/0808100000'
+
+    async def scenario(client, cache):
+        await client.cache_response(await client.request('GET', url))
+        upstream.body = b'<html>0808100000 updated</html>'
+        return await client.request('GET', url)
+
+    response = run_with_cache(upstream, scenario, ttl=0)
+    assert len(upstream.requests) == 2
+    assert 'if-none-match' not in upstream.requests[1].headers
+    assert response.content == b'<html>0808100000 updated</html>'
+    print("✅ 过期条目重新请求")
+
+
+def test_purge_expired():
+    """清理过期条目,数据库文件不会无限增长"""
+    def response(url: str, etag: str = '') -> httpx.Response:
+        headers = {'ETag': etag} if etag else {}
+        return httpx.Response(200, headers=headers, content=b'<html>0808100000</html>',
+                              request=httpx.Request('GET', url))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'cache.sqlite3')
+        cache = HTTPCache(path, ttls=[(r'/fresh', 3600)], default_ttl=0, stale_retention=3600)
+        try:
+            for url, etag in [('https://purge.cache.test/fresh', ''),
+                              ('https://purge.cache.test/stale', ''),
+                              ('https://purge.cache.test/stale-etag', '"v1"')]:
+                cache.put(cache.make_key('GET', url), response(url, etag))
+            time.sleep(0.01)
+
+            # 没有验证头的过期条目删除,带 ETag 的保留用于条件请求
+            assert cache.purge_expired() == 1
+            assert cache.get(cache.make_key('GET', 'https://purge.cache.test/stale')) is None
+            assert cache.get(cache.make_key('GET', 'https://purge.cache.test/stale-etag')) is not None
+
+            # 超过保留时长后带 ETag 的条目也删除
+            cache.stale_retention = 0
+            assert cache.purge_expired() == 1
+            stats = cache.get_stats()
+            assert stats['size'] == 1 and stats['purged'] == 2
+        finally:
+            cache.close()
+
+        # 重新打开时清理
+        cache = HTTPCache(path, ttls=[], default_ttl=0, stale_retention=0)
+        try:
+            cache.put(cache.make_key('GET', 'https://purge.cache.test/reopen'),
+                      response('https://purge.cache.test/reopen'))
+        finally:
+            cache.close()
+        time.sleep(0.01)
+        cache = HTTPCache(path, ttls=[], default_ttl=0, stale_retention=0)
+        try:
+            assert cache.get_stats()['purged'] == 1
+        finally:
+            cache.close()
+    print(f"✅ 清理过期条目: {stats}")
+
+
+if __name__ == "__main__":
+    test_cache_hit()
+    test_unconfirmed_not_cached()
+    test_revalidate_304()
+    test_expired_refetch()
+    test_purge_expired()
+    print("\n所有测试通过!")
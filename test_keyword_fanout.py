@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+关键词并发搜索验证脚本（离线运行,使用模拟的搜索请求,不访问网络也不加载模型）
+
+测试场景:
+1. 出现高置信候选时取消其余尚未完成的搜索
+2. 不设置提前结束分数时等待全部搜索,汇总候选按URL去重并保留最高分
+3. HSCIQ 爬虫按汇总后的全局排名获取详情
+"""
+
+import sys
+import os
+import asyncio
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.scraper import HSCodeScraper
+from src.scraper_hsciq import HSCodeScraperHSCIQ
+from src.records import HSRecord, SearchCandidate
+
+
+def item(hs_code: str, score: float = 0.0) -> SearchCandidate:
+    return SearchCandidate(hs_code, f'商品{hs_code}', f'https://www.i5a6.com/hscode/detail/{hs_code}', score)
+
+
+class StubScraper(HSCodeScraper):
+    """只替换搜索请求的 i5a6 爬虫"""
+
+    def __init__(self, pages: dict, early_stop_score=0.95):
+        """
+        Args:
+            pages: {关键词: (耗时秒数, 已打分的候选列表)}
+        """
+        self.early_stop_score = early_stop_score
+        self.pages = pages
+        self.cancelled = []
+
+    async def _search_with_all_candidates(self, keyword, product_name):
+        delay, candidates = self.pages[keyword]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(keyword)
+            raise
+        return candidates
+
+
+def test_early_stop():
+    """高置信候选出现后取消其余搜索"""
+    scraper = StubScraper({
+        '苹果': (0.0, [item('0808100000', 0.97)]),
+        '鲜苹果': (5.0, [item('0808100000', 0.99)]),
+        '水果': (5.0, [item('0810909000', 0.60)]),
+    })
+
+    merged = asyncio.run(asyncio.wait_for(
+        scraper._search_with_keyword_fanout(['苹果', '鲜苹果', '水果'], '苹果'), timeout=2
+    ))
+    assert [c.hs_code for c in merged] == ['0808100000']
+    assert sorted(scraper.cancelled) == ['水果', '鲜苹果']
+    print(f"✅ 提前结束,取消 {len(scraper.cancelled)} 个搜索")
+
+
+def test_wait_for_all():
+    """不提前结束时汇总全部结果,同一URL保留最高分"""
+    scraper = StubScraper({
+        '苹果': (0.02, [item('0808100000', 0.80), item('2009710000', 0.55)]),
+        '鲜苹果': (0.0, [item('0808100000', 0.99)]),
+        '水果': (0.01, []),
+    }, early_stop_score=None)
+
+    merged = asyncio.run(scraper._search_with_keyword_fanout(['苹果', '鲜苹果', '水果'], '苹果'))
+    assert [(c.hs_code, c.score) for c in merged] == [('0808100000', 0.99), ('2009710000', 0.55)]
+    assert scraper.cancelled == []
+    print("✅ 汇总全部搜索结果")
+
+
+class StubOptimizer:
+    """按名称查表打分"""
+
+    def __init__(self, scores: dict):
+        self.scores = scores
+
+    def score_candidates(self, query, names):
+        return [self.scores.get(name, 0.0) for name in names]
+
+
+class StubScraperHSCIQ(HSCodeScraperHSCIQ):
+    """只替换搜索和详情请求的 HSCIQ 爬虫"""
+
+    def __init__(self, pages: dict, scores: dict):
+        self.early_stop_score = 0.95
+        self.optimizer = StubOptimizer(scores)
+        self.pages = pages
+        self.fetched = []
+
+    async def _search_candidates(self, keyword, filter_obsolete=True):
+        delay, results = self.pages[keyword]
+        await asyncio.sleep(delay)
+        return results
+
+    async def _fetch_valid_detail(self, product_name, candidate):
+        self.fetched.append(candidate.hs_code)
+        if candidate.hs_code == '2009710000':
+            return None  # 已作废
+        return HSRecord(hs_code=candidate.hs_code, query_product_name=product_name, search_success=True)
+
+
+def test_hsciq_global_ranking():
+    """HSCIQ 并发搜索: 按全局排名获取详情,跳过无效候选"""
+    scraper = StubScraperHSCIQ(
+        pages={
+            '苹果汁': (0.0, [item('2009710000'), item('2009790000')]),
+            '果汁': (0.01, [item('2009790000'), item('2202990000')]),
+        },
+        scores={'商品2009710000': 0.9, '商品2009790000': 0.8, '商品2202990000': 0.3}
+    )
+
+    detail = asyncio.run(scraper._query_with_keyword_fanout('苹果汁', ['苹果汁', '果汁']))
+    assert detail.hs_code == '2009790000'
+    assert scraper.fetched == ['2009710000', '2009790000']
+    print(f"✅ HSCIQ 按全局排名获取详情: {scraper.fetched}")
+
+
+if __name__ == "__main__":
+    test_early_stop()
+    test_wait_for_all()
+    test_hsciq_global_ranking()
+    print("\n所有测试通过!")
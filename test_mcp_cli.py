@@ -4,6 +4,7 @@ MCP 服务器命令行测试工具
 """
 
 import sys
+import asyncio
 import argparse
 from mcp_hs_code_query.server import (
     query_hs_code,
@@ -26,7 +27,7 @@ def print_result(result, title="查询结果"):
 def cmd_query(args):
     """查询商品"""
     print(f"\n🔍 查询商品: {args.product_name}")
-    result = query_hs_code(args.product_name)
+    result = asyncio.run(query_hs_code(args.product_name))
     print_result(result)
     
     # 显示关键信息
@@ -47,7 +48,7 @@ def cmd_batch(args):
     for i, p in enumerate(products, 1):
         print(f"   {i}. {p}")
     
-    result = batch_query_hs_codes(products)
+    result = asyncio.run(batch_query_hs_codes(products))
     print_result(result, "批量查询结果")
     
     # 显示统计
@@ -62,7 +63,7 @@ def cmd_batch(args):
 def cmd_code(args):
     """按HS编码查询"""
     print(f"\n🔍 查询HS编码: {args.hs_code}")
-    result = query_by_code(args.hs_code)
+    result = asyncio.run(query_by_code(args.hs_code))
     print_result(result)
     
     if result.get('search_success'):
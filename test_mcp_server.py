@@ -3,6 +3,7 @@
 
 import sys
 import os
+import asyncio
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -16,7 +17,7 @@ def test_single_query():
     print("测试1: 单个查询 - 苹果")
     print("=" * 60)
     
-    result = query_hs_code("防白蚁耐候木油")
+    result = asyncio.run(query_hs_code("防白蚁耐候木油"))
     
     if result.get('search_success'):
         print(f"✅ 查询成功!")
@@ -35,7 +36,7 @@ def test_batch_query():
     print("测试2: 批量查询 - 苹果, 香蕉")
     print("=" * 60)
     
-    result = batch_query_hs_codes(["防白蚁耐候木油", "香蕉"])
+    result = asyncio.run(batch_query_hs_codes(["防白蚁耐候木油", "香蕉"]))
     
     print(f"总数: {result.get('total')}")
     print(f"成功: {result.get('successful')}")
@@ -56,7 +57,7 @@ def test_query_by_code():
     print("测试3: 按编码查询 - 08081000.00")
     print("=" * 60)
     
-    result = query_by_code("08081000.00")
+    result = asyncio.run(query_by_code("08081000.00"))
     
     if result.get('search_success'):
         print(f"✅ 查询成功!")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+无结果搜索页识别验证脚本（离线运行,使用 fixtures/pages 中的页面,不访问网络）
+
+测试场景:
+1. 默认不配置无结果文案: 没有结果表格也没有详情链接的页面按结构识别,直接返回空结果; 有侧栏详情链接的页面照常解析
+2. 配置文案后,包含文案且没有结果表格的页面直接返回空结果（UTF-8 和 GBK）
+3. 包含文案但有结果表格的页面照常解析
+"""
+
+import sys
+import os
+import re
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import page_fingerprint
+from src.page_fingerprint import is_empty_result_page
+from src.parser import DataParser
+from src.parser_hsciq import HTMLParserHSCIQ
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+
+# fixtures/pages 中合成的无结果页面使用的文案
+MARKERS = {
+    'i5a6_search': ['未查询到相关结果'],
+    'hsciq_search': ['没有找到相关的商品编码'],
+}
+
+
+def read_page(site: str, name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, site, 'search', f'{name}.html'), 'rb') as f:
+        return f.read()
+
+
+def with_markers(markers: dict, func):
+    """使用指定文案执行,结束后恢复配置"""
+    saved = page_fingerprint.SEARCH_EMPTY_MARKERS
+    page_fingerprint.SEARCH_EMPTY_MARKERS = markers
+    page_fingerprint._encoded_markers.cache_clear()
+    try:
+        return func()
+    finally:
+        page_fingerprint.SEARCH_EMPTY_MARKERS = saved
+        page_fingerprint._encoded_markers.cache_clear()
+
+
+def strip_sidebar(page: bytes) -> bytes:
+    """去掉侧栏（热门查询中的详情链接）"""
+    return re.sub(rb'<aside.*?</aside>', b'', page, flags=re.DOTALL)
+
+
+class NoTreeBackend:
+    """构建文档树时报错的解析后端,用于确认无结果页面没有解析"""
+
+    name = 'lxml'
+
+    def parse(self, *args, **kwargs):
+        raise AssertionError('无结果页面不应构建文档树')
+
+
+def test_structural_empty():
+    """没有结果表格也没有详情链接时不需要文案即可识别"""
+    for site, parser_class in (('i5a6', DataParser), ('hsciq', HTMLParserHSCIQ)):
+        with_sidebar = read_page(site, 'no_result')
+        page = strip_sidebar(with_sidebar)
+        assert page != with_sidebar
+        assert is_empty_result_page(page, f'{site}_search')
+        assert is_empty_result_page(page.decode('utf-8'), f'{site}_search')
+
+        # 与完整解析结果一致,但不构建文档树
+        assert parser_class(backend='lxml').parse_search_results(page, '不存在的商品') == []
+        parser = parser_class(backend='lxml')
+        parser.backend = NoTreeBackend()
+        assert parser.parse_search_results(page, '不存在的商品') == []
+
+        # 侧栏中有详情链接时照常解析（默认不配置文案）
+        assert not is_empty_result_page(with_sidebar, f'{site}_search')
+    print("✅ 按页面结构识别无结果页面")
+
+
+def test_empty_page_short_circuit():
+    """包含文案且没有结果表格时直接返回空结果"""
+    def check():
+        for site, parser_class in (('i5a6', DataParser), ('hsciq', HTMLParserHSCIQ)):
+            page = read_page(site, 'no_result')
+            assert is_empty_result_page(page, f'{site}_search')
+            assert is_empty_result_page(page.decode('utf-8'), f'{site}_search')
+            gbk_page = page.decode('utf-8').replace('charset="utf-8"', 'charset="gbk"').encode('gbk')
+            assert is_empty_result_page(gbk_page, f'{site}_search')
+            assert parser_class(backend='lxml').parse_search_results(page, '不存在的商品') == []
+    with_markers(MARKERS, check)
+    print("✅ 无结果页面直接返回空结果")
+
+
+def test_results_table_not_skipped():
+    """有结果表格的页面即使包含文案也照常解析"""
+    def check():
+        for site, parser_class in (('i5a6', DataParser), ('hsciq', HTMLParserHSCIQ)):
+            page = read_page(site, 'apple')
+            page = page.replace(b'</body>', MARKERS[f'{site}_search'][0].encode('utf-8') + b'</body>')
+            assert not is_empty_result_page(page, f'{site}_search')
+            assert parser_class(backend='lxml').parse_search_results(page, '苹果')
+    with_markers(MARKERS, check)
+    print("✅ 有结果表格的页面照常解析")
+
+
+if __name__ == "__main__":
+    test_structural_empty()
+    test_empty_page_short_circuit()
+    test_results_table_not_skipped()
+    print("\n所有测试通过!")
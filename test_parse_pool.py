@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+HTML解析进程池验证脚本（离线运行,使用 fixtures/pages 中的页面,不访问网络）
+
+测试场景:
+1. 未启动进程池时在当前线程解析
+2. 进程池解析结果与当前线程解析完全一致（记录经过进程间序列化往返）
+3. 子进程异常退出时本次改为当前线程解析,并重建进程池
+4. 进程池多次异常后停用
+5. 子进程中的详情页裁剪统计合并到父进程
+"""
+
+import sys
+import os
+import asyncio
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import html_trim, parse_pool
+from src.parse_pool import ParseService
+from src.parser import DataParser
+from src.parser_hsciq import HTMLParserHSCIQ
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+
+
+def read_page(site: str, kind: str, name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, site, kind, f'{name}.html'), 'rb') as f:
+        return f.read()
+
+
+class CrashingParser(DataParser):
+    """在子进程中直接退出的解析器,用于模拟子进程崩溃"""
+
+    def crash_in_worker(self, parent_pid: int) -> str:
+        if os.getpid() != parent_pid:
+            os._exit(1)
+        return 'inline'
+
+
+def test_inline_without_pool():
+    """未启动进程池时直接调用解析器"""
+    service = ParseService()
+    parser = DataParser(backend='lxml')
+    page = read_page('i5a6', 'search', 'apple')
+
+    result = asyncio.run(service.parse(parser, 'parse_search_results', page, '苹果'))
+    assert result == parser.parse_search_results(page, '苹果')
+    assert service.get_stats() == {'running': False, 'workers': 0, 'pooled': 0, 'inline': 1, 'pool_failures': 0}
+    print("✅ 未启动进程池时在当前线程解析")
+
+
+def test_pool_round_trip():
+    """子进程返回的记录与当前线程解析结果相同"""
+    service = ParseService()
+    service.start(max_workers=1)
+    try:
+        calls = [
+            (HTMLParserHSCIQ(backend='lxml'), 'parse_detail_page',
+             (read_page('hsciq', 'detail', '0808100000'), 'https://hsciq.com/HSCN/Code/0808100000')),
+            (HTMLParserHSCIQ(backend='beautifulsoup'), 'parse_search_results',
+             (read_page('hsciq', 'search', 'apple'), '苹果')),
+            (DataParser(backend='lxml'), 'parse_detail_page', (read_page('i5a6', 'detail', '8517130000'),)),
+        ]
+
+        async def run():
+            return await asyncio.gather(*(
+                service.parse(parser, method, *args, encoding=None) for parser, method, args in calls
+            ))
+
+        results = asyncio.run(run())
+        for (parser, method, args), result in zip(calls, results):
+            expected = getattr(parser, method)(*args, encoding=None)
+            assert result == expected and type(result) is type(expected), method
+        assert service.get_stats()['pooled'] == 3 and service.get_stats()['inline'] == 0
+    finally:
+        service.shutdown()
+    assert not service.running
+    print("✅ 进程池解析结果与当前线程一致")
+
+
+def test_pool_trim_stats():
+    """子进程裁剪详情页的统计在父进程的 get_trim_stats 中可见"""
+    def counts():
+        return html_trim.get_trim_stats().get('hsciq_detail', {'trimmed': 0, 'bytes_before': 0})
+
+    before = counts()
+    page = read_page('hsciq', 'detail', '0808100000')
+    service = ParseService()
+    service.start(max_workers=1)
+    try:
+        record = asyncio.run(service.parse(
+            HTMLParserHSCIQ(backend='lxml'), 'parse_detail_page', page, 'https://hsciq.com/HSCN/Code/0808100000'
+        ))
+        assert record.product_name and service.get_stats()['pooled'] == 1
+    finally:
+        service.shutdown()
+    after = counts()
+    assert after['trimmed'] == before['trimmed'] + 1
+    assert after['bytes_before'] - before['bytes_before'] == len(page)
+    print(f"✅ 子进程裁剪统计已合并: {after}")
+
+
+def test_broken_pool_fallback():
+    """子进程崩溃时改为当前线程解析并重建进程池,多次异常后停用"""
+    service = ParseService()
+    service.start(max_workers=1)
+    parser = CrashingParser(backend='lxml')
+    try:
+        result = asyncio.run(service.parse(parser, 'crash_in_worker', os.getpid()))
+        assert result == 'inline'
+        stats = service.get_stats()
+        assert stats['running'] and stats['pool_failures'] == 1 and stats['inline'] == 1
+
+        for _ in range(parse_pool._MAX_POOL_FAILURES - 1):
+            assert asyncio.run(service.parse(parser, 'crash_in_worker', os.getpid())) == 'inline'
+        stats = service.get_stats()
+        assert not stats['running'] and stats['pool_failures'] == parse_pool._MAX_POOL_FAILURES
+
+        # 停用后直接在当前线程解析
+        assert asyncio.run(service.parse(parser, 'crash_in_worker', os.getpid())) == 'inline'
+        assert service.get_stats()['inline'] == parse_pool._MAX_POOL_FAILURES + 1
+    finally:
+        service.shutdown()
+    print("✅ 子进程崩溃时回退到当前线程解析,多次异常后停用")
+
+
+if __name__ == "__main__":
+    test_inline_without_pool()
+    test_pool_round_trip()
+    test_pool_trim_stats()
+    test_broken_pool_fallback()
+    print("\n所有测试通过!")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+解析器基准输出验证脚本（离线运行,不访问网络）
+
+测试场景:
+1. fixtures/pages 下的每个页面,两种解析后端的输出都与基准输出一致
+"""
+
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_parser import SITES, KINDS, BACKENDS, load_fixtures, check_outputs
+
+
+def test_fixture_outputs():
+    """所有页面的解析结果与基准输出一致"""
+    total = 0
+    for site in SITES:
+        for kind in KINDS:
+            fixtures = load_fixtures(site, kind)
+            assert fixtures, f"{site}/{kind} 没有测试页面"
+            total += len(fixtures)
+
+            for backend in BACKENDS:
+                parser = SITES[site][0](backend=backend)
+                mismatches = check_outputs(parser, site, kind, fixtures)
+                assert not mismatches, (site, kind, backend, mismatches)
+    print(f"✅ {total} 个页面的解析结果与基准输出一致")
+
+
+if __name__ == "__main__":
+    test_fixture_outputs()
+    print("\n所有测试通过!")
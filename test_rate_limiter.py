@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+站点令牌桶限速验证脚本（离线运行,不访问网络）
+
+测试场景:
+1. 桶内有令牌时请求立即放行
+2. 令牌用完后按 rate 排队等待
+3. 同一站点共享限速器,不同站点互不影响
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.rate_limiter import TokenBucket, get_rate_limiter
+
+
+def test_burst_is_free():
+    """突发容量内的请求不等待"""
+    bucket = TokenBucket(rate=1.0, burst=3)
+    
+    async def run():
+        return [await bucket.acquire() for _ in range(3)]
+    
+    waits = asyncio.run(run())
+    assert waits == [0.0, 0.0, 0.0]
+    print(f"✅ 突发请求等待时间: {waits}")
+
+
+def test_waits_when_budget_used():
+    """令牌用完后按速率排队"""
+    bucket = TokenBucket(rate=20.0, burst=1)
+    
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+        return time.monotonic() - start
+    
+    elapsed = asyncio.run(run())
+    # 第1个立即放行,其余4个每个间隔 1/20 秒
+    assert 0.15 <= elapsed < 0.5
+    print(f"✅ 5个并发请求耗时: {elapsed:.3f}秒")
+
+
+def test_limiter_shared_per_host():
+    """同一站点共享限速器"""
+    a = get_rate_limiter("https://hsciq.com/HSCN/Code/0808100000")
+    b = get_rate_limiter("https://hsciq.com/HSCN/Search")
+    c = get_rate_limiter("https://www.i5a6.com/hscode/key/苹果")
+    
+    assert a is b
+    assert a is not c
+    print("✅ 站点限速器共享正确")
+
+
+if __name__ == "__main__":
+    test_burst_is_free()
+    test_waits_when_budget_used()
+    test_limiter_shared_per_host()
+    print("\n所有测试通过!")
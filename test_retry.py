@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+重试策略验证脚本（离线运行,不访问网络）
+
+测试场景:
+1. 4xx 错误不重试
+2. 429 遵循 Retry-After,超过上限时放弃
+3. 5xx 错误按指数退避重试
+4. 重试预算用完后不再重试
+"""
+
+import sys
+import os
+import asyncio
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from src.utils import retry_on_exception, RetryBudget, _plan_retry
+
+
+def make_error(status_code: int, headers: dict = None) -> httpx.HTTPStatusError:
+    """构造带状态码的 httpx 异常"""
+    request = httpx.Request('GET', 'https://hsciq.com/HSCN/Code/0808100000')
+    response = httpx.Response(status_code, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status_code}", request=request, response=response)
+
+
+def test_no_retry_on_4xx():
+    """404 只请求一次"""
+    calls = []
+
+    @retry_on_exception(max_retries=3, delay=0, exceptions=(httpx.HTTPError,))
+    async def fetch():
+        calls.append(1)
+        raise make_error(404)
+
+    try:
+        asyncio.run(fetch())
+    except httpx.HTTPStatusError:
+        pass
+
+    assert len(calls) == 1
+    print("✅ 404 未重试")
+
+
+def test_retry_after():
+    """429 使用 Retry-After 作为等待时间"""
+    wait, reason = _plan_retry(make_error(429, {'Retry-After': '3'}), 0, delay=2, max_delay=30)
+    assert wait == 3.0 and reason is None
+
+    wait, reason = _plan_retry(make_error(503, {'Retry-After': '120'}), 0, delay=2, max_delay=30)
+    assert wait is None
+    print(f"✅ Retry-After 处理正确 ({reason})")
+
+
+def test_retry_on_5xx():
+    """500 重试直到成功,等待时间不超过退避上限"""
+    calls = []
+
+    @retry_on_exception(max_retries=3, delay=0.01, exceptions=(httpx.HTTPError,))
+    def fetch():
+        calls.append(1)
+        if len(calls) < 3:
+            raise make_error(500)
+        return 'ok'
+
+    assert fetch() == 'ok'
+    assert len(calls) == 3
+
+    for attempt in range(5):
+        wait, _ = _plan_retry(make_error(502), attempt, delay=1, max_delay=4)
+        assert 0 <= wait <= min(4, 2 ** attempt)
+    print("✅ 5xx 按指数退避重试")
+
+
+def test_retry_budget():
+    """预算按正常请求数的比例放行重试"""
+    budget = RetryBudget(ratio=0.5, min_retries=1, window=60)
+    for _ in range(4):
+        budget.record_request()
+
+    # 允许 1 + 0.5 × 4 = 3 次重试
+    results = [budget.try_acquire_retry() for _ in range(5)]
+    assert results == [True, True, True, False, False]
+    print(f"✅ 重试预算: {budget.get_stats()}")
+
+
+if __name__ == "__main__":
+    test_no_retry_on_4xx()
+    test_retry_after()
+    test_retry_on_5xx()
+    test_retry_budget()
+    print("\n所有测试通过!")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+爬虫公开接口返回值验证脚本（离线运行,使用 httpx.MockTransport 返回 fixtures/pages 中的页面,不加载模型）
+
+测试场景:
+1. HSCIQ search_products 返回商品字典列表 (name, url, hs_code, obsolete)
+2. HSCIQ get_product_detail 返回详情字典,获取失败时返回空字典
+3. i5a6 get_hs_code_detail 返回详情字典,获取失败时返回带错误信息的字典
+4. HSCIQ 详情地址返回 200 的拦截页（编码只能取自URL）时不算成功,也不写入页面缓存和详情缓存
+5. 两个站点的搜索结果打分在线程池中执行,不在事件循环线程中执行
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from src.detail_cache import DetailCache
+from src.http_cache import HTTPCache
+from src.http_client import AsyncHTTPClient
+from src.parser import DataParser
+from src.parser_hsciq import HTMLParserHSCIQ
+from src.records import SearchCandidate
+from src.scraper import HSCodeScraper
+from src.scraper_hsciq import HSCodeScraperHSCIQ
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+
+
+def read_page(site: str, kind: str, name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, site, kind, f'{name}.html'), 'rb') as f:
+        return f.read()
+
+
+def handler(pages: dict):
+    """按URL路径返回页面,其他路径返回404"""
+    def handle(request: httpx.Request) -> httpx.Response:
+        content = pages.get(request.url.path)
+        if content is None:
+            return httpx.Response(404)
+        return httpx.Response(200, headers={'Content-Type': 'text/html'}, content=content)
+    return handle
+
+
+class ThreadRecordingOptimizer:
+    """记录打分所在线程的匹配器（按名称长度打分,不加载模型）"""
+
+    def __init__(self):
+        self.threads = []
+
+    def search_catalogue(self, query, top_k=None):
+        return []
+
+    def generate_search_keywords(self, product_name):
+        return [product_name]
+
+    def score_candidates(self, query, names):
+        self.threads.append(threading.current_thread())
+        return [1.0 / (1 + len(name)) for name in names]
+
+
+class StubScraperHSCIQ(HSCodeScraperHSCIQ):
+    """使用模拟站点的 HSCIQ 爬虫（不使用页面缓存,不加载匹配模型）"""
+
+    def __init__(self, pages: dict, cache: HTTPCache = None):
+        self.base_url = "https://hsciq.com"
+        self.search_url = f"{self.base_url}/HSCN/Search"
+        self.http = AsyncHTTPClient(
+            cache=cache, use_cache=cache is not None, transport=httpx.MockTransport(handler(pages))
+        )
+        self.parser = HTMLParserHSCIQ()
+        self.detail_cache = DetailCache()
+
+
+class StubScraper(HSCodeScraper):
+    """使用模拟站点的 i5a6 爬虫（不使用页面缓存,不加载匹配模型）"""
+
+    def __init__(self, pages: dict):
+        self.http = AsyncHTTPClient(use_cache=False, transport=httpx.MockTransport(handler(pages)))
+        self.parser = DataParser()
+        self.detail_cache = DetailCache()
+
+
+def test_hsciq_search_products():
+    """搜索结果为字典列表"""
+    scraper = StubScraperHSCIQ({'/HSCN/Search': read_page('hsciq', 'search', 'apple')})
+    try:
+        results = scraper.search_products('苹果')
+    finally:
+        scraper.close()
+
+    assert results and all(isinstance(item, dict) for item in results)
+    assert set(results[0]) == {'name', 'url', 'hs_code', 'obsolete'}
+    assert results[0]['url'].startswith('https://hsciq.com/HSCN/Code/')
+    print(f"✅ search_products 返回 {len(results)} 个商品字典")
+
+
+def test_hsciq_product_detail():
+    """详情为字典,失败时为空字典"""
+    page = read_page('hsciq', 'detail', '0808100000')
+    scraper = StubScraperHSCIQ({'/HSCN/Code/0808100000': page})
+    url = 'https://hsciq.com/HSCN/Code/0808100000'
+
+    async def run():
+        try:
+            return (
+                await scraper.get_product_detail_async(url),
+                await scraper.get_product_detail_async('https://hsciq.com/HSCN/Code/9999999999')
+            )
+        finally:
+            await scraper.aclose()
+
+    detail, missing = asyncio.run(run())
+    assert detail == HTMLParserHSCIQ().parse_detail_page(page, url).to_dict()
+    assert detail['hs_code'] and isinstance(detail['customs_supervision_conditions'], dict)
+    assert missing == {}
+    print("✅ get_product_detail 返回详情字典,失败时返回空字典")
+
+
+def test_i5a6_hs_code_detail():
+    """详情为字典,失败时为带错误信息的字典"""
+    page = read_page('i5a6', 'detail', '0808100000')
+    scraper = StubScraper({'/hscode/detail/0808100000': page})
+
+    async def run():
+        try:
+            return (
+                await scraper.get_hs_code_detail_async('https://www.i5a6.com/hscode/detail/0808100000'),
+                await scraper.get_hs_code_detail_async('https://www.i5a6.com/hscode/detail/9999999999')
+            )
+        finally:
+            await scraper.aclose()
+
+    detail, failed = asyncio.run(run())
+    assert detail == DataParser().parse_detail_page(page).to_dict()
+    assert detail['search_success'] and isinstance(detail['inspection_quarantine'], dict)
+    assert isinstance(failed, dict) and not failed['search_success'] and failed['error_message']
+    print("✅ get_hs_code_detail 返回详情字典")
+
+
+def test_hsciq_block_page_not_cached():
+    """详情地址返回 200 的拦截页: 不算成功,不写入任何缓存"""
+    page = '<html><body><h1>请完成安全验证</h1><form><input name="captcha"></form></body></html>'.encode('utf-8')
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = HTTPCache(os.path.join(directory, 'cache.sqlite3'), ttls=[], default_ttl=3600)
+        scraper = StubScraperHSCIQ({'/HSCN/Code/0808100000': page}, cache=cache)
+
+        async def run():
+            try:
+                return (
+                    await scraper.query_by_hs_code_async('0808100000'),
+                    await scraper._fetch_valid_detail('苹果', SearchCandidate(
+                        '0808100000', '鲜苹果', 'https://hsciq.com/HSCN/Code/0808100000'
+                    ))
+                )
+            finally:
+                await scraper.aclose()
+
+        try:
+            result, candidate = asyncio.run(run())
+            stats = cache.get_stats()
+        finally:
+            cache.close()
+
+    assert not result['search_success'] and result['error_message']
+    assert candidate is None
+    assert stats['size'] == 0
+    assert scraper.detail_cache.get(scraper.source, '0808100000') is None
+    print("✅ 拦截页不算成功,未写入缓存")
+
+
+def test_scoring_off_event_loop():
+    """搜索结果打分不阻塞事件循环"""
+    optimizer = ThreadRecordingOptimizer()
+    scraper = StubScraper({'/hscode/key/苹果': read_page('i5a6', 'search', 'apple')})
+    scraper.search_optimizer = optimizer
+    try:
+        candidates = asyncio.run(scraper._search_with_all_candidates('苹果', '苹果'))
+    finally:
+        scraper.close()
+    assert candidates and optimizer.threads
+    assert threading.main_thread() not in optimizer.threads
+
+    # HSCIQ 依次搜索和并发搜索两条路径
+    for fanout in (False, True):
+        optimizer = ThreadRecordingOptimizer()
+        scraper = StubScraperHSCIQ({'/HSCN/Search': read_page('hsciq', 'search', 'apple')})
+        scraper.optimizer = optimizer
+        scraper.keyword_fanout = fanout
+        scraper.early_stop_score = None
+
+        async def no_detail(product_name, item):
+            return None
+
+        scraper._fetch_valid_detail = no_detail
+        try:
+            asyncio.run(scraper._query_product_record('苹果'))
+        finally:
+            scraper.close()
+        assert optimizer.threads and threading.main_thread() not in optimizer.threads, fanout
+    print("✅ 搜索结果打分在线程池中执行")
+
+
+if __name__ == "__main__":
+    test_hsciq_search_products()
+    test_hsciq_product_detail()
+    test_i5a6_hs_code_detail()
+    test_hsciq_block_page_not_cached()
+    test_scoring_off_event_loop()
+    print("\n所有测试通过!")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+候选详情页投机预取验证脚本（离线运行,使用模拟的详情请求,不访问网络也不加载模型）
+
+测试场景:
+1. 排名靠后的候选先返回时,仍然返回排名最高的有效结果
+2. 排名最高的候选有效时,取消同一批中尚未完成的请求
+3. 已作废或获取失败的候选被跳过,整批无效时继续下一批
+"""
+
+import sys
+import os
+import asyncio
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.scraper import HSCodeScraper
+from src.records import HSRecord, SearchCandidate
+
+
+class StubScraper(HSCodeScraper):
+    """只替换详情请求的 i5a6 爬虫（不创建HTTP客户端和匹配模型）"""
+
+    def __init__(self, speculative_k: int, pages: dict):
+        """
+        Args:
+            speculative_k: 同时预取的候选数
+            pages: {URL: (耗时秒数, 详情记录)}
+        """
+        self.speculative_k = speculative_k
+        self.pages = pages
+        self.started = []
+        self.cancelled = []
+
+    async def _get_detail_record(self, detail_url: str) -> HSRecord:
+        self.started.append(detail_url)
+        delay, record = self.pages[detail_url]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(detail_url)
+            raise
+        return record
+
+
+def candidate(rank: int) -> SearchCandidate:
+    return SearchCandidate(f'000000000{rank}', f'候选{rank}', f'https://www.i5a6.com/hscode/detail/000000000{rank}',
+                           1.0 - rank / 10)
+
+
+def valid(rank: int) -> HSRecord:
+    return HSRecord(hs_code=f'000000000{rank}', search_success=True)
+
+
+OBSOLETE = HSRecord(error_message='该商品编码已作废')
+FAILED = HSRecord(error_message='ConnectError')
+
+
+def test_rank_order():
+    """第2名先返回,仍然返回第1名"""
+    candidates = [candidate(1), candidate(2), candidate(3)]
+    scraper = StubScraper(3, {
+        candidates[0].url: (0.05, valid(1)),
+        candidates[1].url: (0.0, valid(2)),
+        candidates[2].url: (0.0, valid(3)),
+    })
+
+    result = asyncio.run(scraper._fetch_best_candidate_detail(candidates))
+    assert result.hs_code == '0000000001'
+    assert len(scraper.started) == 3  # 同一批并发发出
+    print("✅ 按排名返回结果")
+
+
+def test_cancel_losers():
+    """第1名有效后取消其余未完成的请求"""
+    candidates = [candidate(1), candidate(2), candidate(3)]
+    scraper = StubScraper(3, {
+        candidates[0].url: (0.0, valid(1)),
+        candidates[1].url: (5.0, valid(2)),
+        candidates[2].url: (5.0, valid(3)),
+    })
+
+    result = asyncio.run(asyncio.wait_for(scraper._fetch_best_candidate_detail(candidates), timeout=2))
+    assert result.hs_code == '0000000001'
+    assert sorted(scraper.cancelled) == [candidates[1].url, candidates[2].url]
+    print(f"✅ 取消 {len(scraper.cancelled)} 个不再需要的请求")
+
+
+def test_skip_invalid_windows():
+    """第一批全部无效时获取下一批,第一批之外的候选只在需要时请求"""
+    candidates = [candidate(1), candidate(2), candidate(3), candidate(4)]
+    scraper = StubScraper(2, {
+        candidates[0].url: (0.0, OBSOLETE),
+        candidates[1].url: (0.0, FAILED),
+        candidates[2].url: (0.02, valid(3)),
+        candidates[3].url: (0.0, valid(4)),
+    })
+
+    result = asyncio.run(scraper._fetch_best_candidate_detail(candidates))
+    assert result.hs_code == '0000000003'
+    assert scraper.started == [c.url for c in candidates]
+
+    scraper = StubScraper(2, {c.url: (0.0, OBSOLETE) for c in candidates[:2]})
+    assert asyncio.run(scraper._fetch_best_candidate_detail(candidates[:2])) is None
+    print("✅ 跳过无效候选")
+
+
+if __name__ == "__main__":
+    test_rank_order()
+    test_cancel_losers()
+    test_skip_invalid_windows()
+    print("\n所有测试通过!")